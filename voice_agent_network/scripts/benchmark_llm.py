@@ -0,0 +1,98 @@
+# Measures generation speed (tokens/sec) of the local Gemma / MedGemma variants on this node.
+#
+#   python scripts/benchmark_llm.py --device cpu --precision int8_dynamic --threads 8
+#   python scripts/benchmark_llm.py --device cuda --variants GEMMA_3_1B_IT GEMMA_3_4B_IT
+#
+# Results are printed as a markdown table and appended to docs/llm_benchmarks.md so the
+# numbers of every node type end up in one place.
+import argparse
+import gc
+import os
+import platform
+import statistics
+from datetime import date
+
+import torch
+
+from llm.core.devices import Device, CpuPrecision, resolve_device
+from llm.llm_models.gemma_based_models import Gemma, MedGemma
+
+PROMPT = [
+    {"role": "system", "content": [{"type": "text", "text": "Sen yardımsever bir hastane asistanısın."}]},
+    {"role": "user", "content": [{"type": "text", "text": "İki gündür başım ağrıyor ve ateşim var, ne yapmalıyım?"}]},
+]
+
+DEFAULT_VARIANTS = ["GEMMA_3_1B_IT", "MEDGEMMA_4B_IT"]
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docs", "llm_benchmarks.md")
+
+
+def load(variant_name: str, args):
+    profile = dict(device_map=Device(args.device),
+                   cpu_precision=CpuPrecision(args.precision),
+                   num_threads=args.threads)
+
+    if variant_name in Gemma.Variant.__members__:
+        return Gemma(args.quantized, model_variant=Gemma.Variant[variant_name], **profile)
+    return MedGemma(args.quantized, model_variant=MedGemma.Variant[variant_name], **profile)
+
+
+def benchmark(model, runs: int, max_new_tokens: int) -> dict:
+    # Force a fixed generation length so variants are compared on the same amount of work
+    model.set_model_settings(max_new_tokens=max_new_tokens)
+
+    model.give_prompt(PROMPT)  # warm-up
+    speeds = []
+    for _ in range(runs):
+        model.give_prompt(PROMPT)
+        speeds.append(model.last_generation_stats["tokens_per_second"])
+
+    return {"median": statistics.median(speeds), "min": min(speeds), "max": max(speeds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tokens/sec of local LLM variants.")
+    parser.add_argument("--variants", nargs="+", default=DEFAULT_VARIANTS)
+    parser.add_argument("--device", default=Device.CPU.value, choices=[d.value for d in Device])
+    parser.add_argument("--precision", default=CpuPrecision.FLOAT32.value, choices=[p.value for p in CpuPrecision])
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--quantized", action="store_true", help="4-bit bitsandbytes (CUDA only)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    device = resolve_device(Device(args.device))
+    precision = args.precision if device == Device.CPU else ("4bit" if args.quantized else "bfloat16")
+    threads = args.threads or torch.get_num_threads()
+
+    rows = []
+    for variant_name in args.variants:
+        print(f"--- {variant_name} ---")
+        model = load(variant_name, args)
+        result = benchmark(model, args.runs, args.max_new_tokens)
+        rows.append(f"| {date.today()} | {platform.node()} | {variant_name} | {device.value} | {precision} "
+                    f"| {threads} | {result['median']:.2f} | {result['min']:.2f}-{result['max']:.2f} |")
+        print(rows[-1])
+
+        del model
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    header = ("| date | node | variant | device | precision | threads | tokens/sec (median) | range |\n"
+              "|---|---|---|---|---|---|---|---|")
+    print("\n" + header + "\n" + "\n".join(rows))
+
+    if not args.no_save:
+        new_file = not os.path.exists(OUTPUT_PATH)
+        with open(OUTPUT_PATH, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write("# Local LLM generation speed\n\n"
+                        "Generated by `scripts/benchmark_llm.py`; one row per variant and node profile.\n\n"
+                        + header + "\n")
+            f.write("\n".join(rows) + "\n")
+        print(f"Results appended to {os.path.normpath(OUTPUT_PATH)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.graph import StateGraph
 
@@ -5,6 +11,9 @@ from agentic_network.agents import ClusterAgent, TopicManagerCluster, DiognosisA
 from agentic_network.agents import SmallTalkAgent, OutOfTopicAgent
 from agentic_network.agents.appointment_agent.main import AppointmentAgent
 from agentic_network.core import AgentState, GraphRoutes
+from agentic_network.core.agent_state import TopicSummary
+from agentic_network.core.dialog_summarizer import dialogSummarizer
+from agentic_network.core.speculative_executor import SpeculativeExecutor
 from agentic_network.routing import decide_cluster_agent, decide_topic_manager
 
 
@@ -14,29 +23,144 @@ class AgentGraph:
     This class wires up agent nodes, connects them with edges, and compiles a
     runnable graph. Routing between nodes is delegated to the `decide_*`
     functions imported from `agentic_network.routing`.
+
+    The Topic Manager and Appointment clusters are compiled graphs of their own and are
+    registered as subgraph nodes, so a turn is a single graph execution: `stream` shows the
+    steps inside the clusters too, and no node re-enters the runtime with a copy of the state.
+
+    With a checkpointer, every session is a thread (thread_id = session id) whose state is
+    saved after each step, so any worker sharing the store can resume it. The nested cluster
+    graphs inherit the checkpointer and are saved under their own namespaces.
+
+    `ainvoke` is the coroutine path: agent nodes are registered with both implementations
+    (ClusterAgent.as_node), remote models are awaited and local ones run on worker threads.
+
+    With SPECULATIVE_EXECUTION=1 the current topic's agent starts alongside the Topic Manager
+    and its result is used if routing keeps the topic (see SpeculativeExecutor).
+
+    Summaries the DialogSummarizer finishes in the background are held until the session's next
+    turn and go into the checkpoint with that turn's input, so they are written under the turn
+    lock like any other update. A summary queued on another worker is simply made again.
     """
 
+    SPECULATIVE_EXECUTION = os.getenv("SPECULATIVE_EXECUTION", "0") == "1"
+
     # The compiled, runnable graph (set in _build_graph)
     graph: CompiledStateGraph = None
 
     # Concrete agent instances (all share a common base: ClusterAgent)
-    topic_manager_agent: ClusterAgent = None
+    topic_manager_agent: TopicManagerCluster = None
     diagnosis_agent: ClusterAgent = None
-    appointment_agent: ClusterAgent = None
+    appointment_agent: AppointmentAgent = None
     small_talk_agent: ClusterAgent = None
     out_of_topic_agent: ClusterAgent = None
 
-    def __init__(self):
+    def __init__(self, checkpointer: BaseCheckpointSaver = None):
         """Create agents and build the graph once."""
+        self.checkpointer = checkpointer
+        # session id -> {topic id: summary} finished since the session's last turn
+        self._finished_summaries: dict[str, dict[str, TopicSummary]] = {}
+        self._summaries_lock = threading.Lock()
+        self.speculator = SpeculativeExecutor(int(os.getenv("SPECULATION_WORKERS", "2"))) if self.SPECULATIVE_EXECUTION else None
         self._initialize_agents()
         self._build_graph()
 
     # ---- Public API --------------------------------------------------------------
-    def invoke(self, state: AgentState):
-        """Run the compiled graph."""
-        self.graph.invoke(state=state)
+    def invoke(self, state: AgentState, session_id: str = None) -> AgentState:
+        """Run the compiled graph for one user turn and return the resulting state."""
+        if self.checkpointer is None:
+            with self._dropping_speculation_on_failure(state):
+                result = self.graph.invoke(state)
+            # Compacts the topic in the background once it outgrows its budget; ready by a later turn
+            dialogSummarizer.maybe_summarize(result)
+            return result
+
+        config = {"configurable": {"thread_id": session_id}}
+        # A known session is resumed from its checkpoint, so only the new message goes in
+        saved = self.checkpointer.get_tuple(config)
+        if saved is not None:
+            state = {"current_message": state["current_message"], **self._take_summaries(session_id, saved)}
+
+        with self._dropping_speculation_on_failure(self._values(saved, state)):
+            result = self.graph.invoke(state, config)
+        dialogSummarizer.maybe_summarize(result, on_summary=lambda topic_id, summary: self._queue_summary(session_id, topic_id, summary))
+        return result
+
+    async def ainvoke(self, state: AgentState, session_id: str = None) -> AgentState:
+        """
+        Like `invoke`, as a coroutine: every node runs through its async implementation, so one
+        event loop can carry many sessions while their model calls are in flight.
+        """
+        if self.checkpointer is None:
+            with self._dropping_speculation_on_failure(state):
+                result = await self.graph.ainvoke(state)
+            dialogSummarizer.maybe_summarize(result)
+            return result
+
+        config = {"configurable": {"thread_id": session_id}}
+        saved = await self.checkpointer.aget_tuple(config)
+        if saved is not None:
+            state = {"current_message": state["current_message"], **self._take_summaries(session_id, saved)}
+
+        with self._dropping_speculation_on_failure(self._values(saved, state)):
+            result = await self.graph.ainvoke(state, config)
+        dialogSummarizer.maybe_summarize(result, on_summary=lambda topic_id, summary: self._queue_summary(session_id, topic_id, summary))
+        return result
+
+    def stream(self, state: AgentState, session_id: str = None) -> Iterator[tuple[tuple[str, ...], dict]]:
+        """
+        Runs one user turn like `invoke`, yielding (namespace, {node: update}) after every step,
+        including the steps inside the cluster subgraphs (namespace names the cluster node).
+        """
+        config, saved = None, None
+        if self.checkpointer is not None:
+            config = {"configurable": {"thread_id": session_id}}
+            saved = self.checkpointer.get_tuple(config)
+            if saved is not None:
+                state = {"current_message": state["current_message"], **self._take_summaries(session_id, saved)}
+
+        with self._dropping_speculation_on_failure(self._values(saved, state)):
+            yield from self.graph.stream(state, config, stream_mode="updates", subgraphs=True)
 
     # ---- Internal Methods --------------------------------------------------------
+    @staticmethod
+    def _values(saved: Optional[CheckpointTuple], state: AgentState) -> dict:
+        """The session's state as the turn starts: its checkpoint if it has one, else the given state."""
+        return saved.checkpoint["channel_values"] if saved is not None else state
+
+    @contextmanager
+    def _dropping_speculation_on_failure(self, values: dict):
+        """
+        A turn that fails before its agent node claims the speculation leaves it pending; it was
+        started for the topic that was current as the turn began, so it is dropped by that id.
+        """
+        try:
+            yield
+        except BaseException:
+            if self.speculator is not None and values.get("topic_stack"):
+                self.speculator.abandon(values["topic_stack"][-1]["id"])
+            raise
+
+    def _queue_summary(self, session_id: str, topic_id: str, summary: TopicSummary) -> None:
+        # Called on the summarizer's thread; the summary is written by the session's next turn
+        with self._summaries_lock:
+            self._finished_summaries.setdefault(session_id, {})[topic_id] = summary
+
+    def _take_summaries(self, session_id: str, saved: CheckpointTuple) -> dict:
+        """The summaries finished since the session's last turn, as an update of its saved topic lists."""
+        with self._summaries_lock:
+            summaries = self._finished_summaries.pop(session_id, None)
+        if not summaries: return {}
+
+        values = saved.checkpoint["channel_values"]
+        update = {}
+        for key in ("topic_stack", "disclosed_topics"):
+            topics = values.get(key, [])
+            if any(topic["id"] in summaries for topic in topics):
+                update[key] = [{**topic, "summary": summaries[topic["id"]]} if topic["id"] in summaries else topic
+                               for topic in topics]
+        return update
+
     def _initialize_agents(self) -> None:
         """Instantiate concrete agent nodes.
 
@@ -53,8 +177,9 @@ class AgentGraph:
         """Declare nodes, edges, and routing, then compile the graph.
 
         Structure:
-            - Nodes: one per agent.
-            - Start edge: START → Topic Manager.
+            - Nodes: one per agent (Topic Manager and Appointment as subgraphs).
+            - Start edge: START → Topic Manager (START → Speculate → Topic Manager in
+              speculative mode, with the speculative agents and the cluster router wrapped).
             - Conditional edges:
                 * From Topic Manager → a specific cluster agent or end,
                   decided by `decide_cluster_agent`.
@@ -71,15 +196,29 @@ class AgentGraph:
 
         # ---------------------- Nodes -------------------------------------------------
         # Register each agent under a stable route key from GraphRoutes.
-        graph_builder.add_node(GraphRoutes.TOPIC_MANAGER_AGENT, self.topic_manager_agent)
-        graph_builder.add_node(GraphRoutes.DIAGNOSIS_AGENT, self.diagnosis_agent)
-        graph_builder.add_node(GraphRoutes.APPOINTMENT_AGENT, self.appointment_agent)
-        graph_builder.add_node(GraphRoutes.SMALL_TALK_AGENT, self.small_talk_agent)
-        graph_builder.add_node(GraphRoutes.OUT_OF_TOPIC_AGENT, self.out_of_topic_agent)
+        # The clusters with graphs of their own are added as subgraphs.
+        graph_builder.add_node(GraphRoutes.TOPIC_MANAGER_AGENT, self.topic_manager_agent.graph)
+        graph_builder.add_node(GraphRoutes.APPOINTMENT_AGENT, self.appointment_agent.graph)
+
+        agents = {GraphRoutes.DIAGNOSIS_AGENT: self.diagnosis_agent,
+                  GraphRoutes.SMALL_TALK_AGENT: self.small_talk_agent,
+                  GraphRoutes.OUT_OF_TOPIC_AGENT: self.out_of_topic_agent}
+        speculative = {route: agent for route, agent in agents.items() if agent.SPECULATIVE} if self.speculator else {}
+        for route, agent in agents.items():
+            graph_builder.add_node(route, self.speculator.node(route, agent) if route in speculative else agent.as_node())
+
+        cluster_router = decide_cluster_agent
+        if self.speculator:
+            graph_builder.add_node(GraphRoutes.SPECULATE, lambda state: self.speculator.start(state, speculative))
+            cluster_router = self.speculator.route(decide_cluster_agent)
 
         # ---------------------- Linear Edge(s) ----------------------------------------
-        # Entry point: start the graph at Topic Manager.
-        graph_builder.add_edge(GraphRoutes.START, GraphRoutes.TOPIC_MANAGER_AGENT)
+        # Entry point: start the graph at Topic Manager (after starting the speculation, if on).
+        if self.speculator:
+            graph_builder.add_edge(GraphRoutes.START, GraphRoutes.SPECULATE)
+            graph_builder.add_edge(GraphRoutes.SPECULATE, GraphRoutes.TOPIC_MANAGER_AGENT)
+        else:
+            graph_builder.add_edge(GraphRoutes.START, GraphRoutes.TOPIC_MANAGER_AGENT)
         graph_builder.add_edge(GraphRoutes.SMALL_TALK_AGENT, GraphRoutes.END)
         graph_builder.add_edge(GraphRoutes.OUT_OF_TOPIC_AGENT, GraphRoutes.END)
 
@@ -88,7 +227,9 @@ class AgentGraph:
         #    `decide_cluster_agent(state: AgentState) -> A Cluster Agent | END`
         graph_builder.add_conditional_edges(
             GraphRoutes.TOPIC_MANAGER_AGENT,
-            decide_cluster_agent
+            cluster_router,
+            [GraphRoutes.DIAGNOSIS_AGENT, GraphRoutes.APPOINTMENT_AGENT, GraphRoutes.SMALL_TALK_AGENT,
+             GraphRoutes.OUT_OF_TOPIC_AGENT, GraphRoutes.END]
         )
         # 2) After specialized handling, decide whether to loop back to the Topic Manager
         #    (to reach another agent) or finish. Both diagnosis and appointment reuse
@@ -105,4 +246,4 @@ class AgentGraph:
 
         # ---------------------- Compile -----------------------------------------------
         # Finalize the graph into a runnable pipeline.
-        self.graph = graph_builder.compile()
+        self.graph = graph_builder.compile(checkpointer=self.checkpointer)
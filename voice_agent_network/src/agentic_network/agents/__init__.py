@@ -1,6 +1,6 @@
 from .cluster_agent import ClusterAgent
 from .topic_manager_cluster.topic_manager_cluster import TopicManagerCluster
 from .diagnosis_agent import DiognosisAgent
-from .appointment_agent import AppointmentAgent
+from .appointment_agent.main import AppointmentAgent
 from .small_talk_agent import SmallTalkAgent
 from .out_of_topic_agent import OutOfTopicAgent
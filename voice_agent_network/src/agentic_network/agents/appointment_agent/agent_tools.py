@@ -1,5 +1,5 @@
 # tools.py (Güncellenmiş)
-from mock_data import MOCK_DATA
+from .mock_data import MOCK_DATA
 from typing import Dict
 import json
 
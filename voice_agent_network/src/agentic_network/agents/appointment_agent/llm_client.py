@@ -1,66 +1,24 @@
 # client.py
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from contextlib import aclosing, closing
+from typing import AsyncIterator, Iterator, List, Dict, Optional
 import re
 import json
+import httpx
 import requests
 
+from llm.core.http_pool import httpPool
+from llm.core.llm_client import LlmClient as BaseLlmClient
 
-class LlmClient(ABC):
+
+class LlmClient(BaseLlmClient):
     """
-    Framework-agnostic base client for chat LLMs.
-
-    Standard contract:
-      chat(messages_json) -> {
-        "text": str,         # primary model text (may be "")
-        "raw": dict,         # raw provider response
-        "tool_call": dict|None  # parsed {"name":..., "args": {...}} if model requested a tool
-      }
-
-    Subclasses must implement:
-      - _build_payload(messages_json) -> provider request payload (dict)
-      - _post(payload) -> provider raw response (dict)
-      - _extract_text(resp) -> str
-
-    Optionally override:
-      - _maybe_parse_tool_call(text) if you use a different protocol
+    The LlmClient of llm.core.llm_client (chat, achat, chat_stream, achat_stream and their hooks),
+    with a more lenient tool-call parser: the local models often wrap TOOL_CALL: or its JSON in
+    markdown (**) and may write text before it.
     """
 
-    def __init__(self, *, tool_call_regex: Optional[str] = None):
-        # Default protocol:  TOOL_CALL: {"name":"...","args":{...}}
-        self._tool_call_re = re.compile(
-            tool_call_regex or r'^TOOL_CALL:\s*(\{.*\})\s*$',
-            flags=re.DOTALL,
-        )
-
-    # ---- Public API --------------------------------------------------------
-    def chat(self, messages_json: List[Dict]) -> Dict:
-        """
-        Orchestrates: build -> post -> extract -> parse tool call.
-        Subclasses usually don't override this.
-        """
-        payload = self._build_payload(messages_json)
-        resp = self._post(payload)
-        text = self._extract_text(resp) or ""
-        tool_call = self._maybe_parse_tool_call(text)
-        return {"text": text, "raw": resp, "tool_call": tool_call}
-
-    # ---- Hooks to implement ------------------------------------------------
-    @abstractmethod
-    def _build_payload(self, messages_json: List[Dict]) -> Dict:
-        raise NotImplementedError
-
-    @abstractmethod
-    def _post(self, payload: Dict) -> Dict:
-        raise NotImplementedError
-
-    @abstractmethod
-    def _extract_text(self, resp: Dict) -> str:
-        raise NotImplementedError
-
-    # ---- Optional hook -----------------------------------------------------
     def _maybe_parse_tool_call(self, text: str) -> Optional[Dict]:
         if not text: return None
 
@@ -103,15 +61,41 @@ class GeneralLlmClient(LlmClient):
         }
 
     def _post(self, payload: Dict) -> Dict:
-        url = f"{self.base_url}/api/chat"
+        # Pooled connection instead of a new TCP connection per call; no read timeout, generation may be slow
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()  # HTTP hatalarını kontrol et
-            return response.json()
+            return httpPool.post_json(f"{self.base_url}/api/chat", payload, timeout=None)
         except requests.exceptions.RequestException as e:
             # Daha açıklayıcı hata mesajları
             raise ConnectionError(f"Ollama'ya bağlanılamadı: {e}. Lütfen Ollama'nın çalıştığından ve modelin yüklü olduğundan emin olun.") from e
 
+    async def _apost(self, payload: Dict) -> Dict:
+        try:
+            return await httpPool.apost_json(f"{self.base_url}/api/chat", payload, timeout=None)
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Ollama'ya bağlanılamadı: {e}. Lütfen Ollama'nın çalıştığından ve modelin yüklü olduğundan emin olun.") from e
+
+    def _build_stream_payload(self, messages_json: List[Dict]) -> Dict:
+        return {**self._build_payload(messages_json), "stream": True}
+
+    def _post_stream(self, payload: Dict) -> Iterator[Dict]:
+        # Ollama akışı NDJSON'dır: her satır bir parça ({"message": {"content": ...}, "done": ...})
+        try:
+            lines = httpPool.post_lines(f"{self.base_url}/api/chat", payload, timeout=None)
+            with closing(lines):
+                for line in lines:
+                    yield json.loads(line)
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(f"Ollama'ya bağlanılamadı: {e}. Lütfen Ollama'nın çalıştığından ve modelin yüklü olduğundan emin olun.") from e
+
+    async def _apost_stream(self, payload: Dict) -> AsyncIterator[Dict]:
+        try:
+            lines = httpPool.apost_lines(f"{self.base_url}/api/chat", payload, timeout=None)
+            async with aclosing(lines):
+                async for line in lines:
+                    yield json.loads(line)
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Ollama'ya bağlanılamadı: {e}. Lütfen Ollama'nın çalıştığından ve modelin yüklü olduğundan emin olun.") from e
+
     def _extract_text(self, resp: Dict) -> str:
         # Ollama'dan dönen yanıttaki metni çıkar
         # Yanıt formatı: {"model": "...", "created_at": "...", "message": {"role": "...", "content": "..."}}
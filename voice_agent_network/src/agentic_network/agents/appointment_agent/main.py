@@ -6,16 +6,15 @@ from typing import Optional, Dict
 from langgraph.graph import START, END, StateGraph
 from langgraph.prebuilt import ToolNode
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
-from copy import copy
 import json, uuid
 
 from agentic_network.agents import ClusterAgent
 from agentic_network.core import AgentState
-from agentic_network.core.topic_manager_util import add_message_to_dialogue, get_messages_for_current_topic, get_current_topic
+from agentic_network.core.topic_manager_util import add_message_to_dialogue, add_messages_to_dialogue, get_messages_for_current_topic, get_compacted_messages_for_current_topic, get_current_topic
 from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
-from llm.core.llm_singletons import llmSingleton
-from agent_tools import ToolManager
+from .agent_tools import ToolManager
 
 # 1. ToolManager örneğini oluştur ve araçları tanımla
 tool_manager_instance = ToolManager()
@@ -103,6 +102,7 @@ tools = [
 
 class AppointmentAgent(ClusterAgent):
     def __init__(self):
+        self.tool_node = ToolNode(tools, messages_key="all_dialog")
         self.graph = self._build_graph()
         self.system_prompt = self._get_system_prompt()
 
@@ -140,10 +140,18 @@ class AppointmentAgent(ClusterAgent):
 
     # LLM'in araç çağrıları yapmasını sağlayan özel bir düğüm
     def _call_llm(self, agent_state: AgentState) -> dict:
-        messages = agent_state["all_dialog"]
-        chat = GemmaBasedModelAdapter(llmSingleton.gemma_3_1b_it)
-        response = chat.invoke([SystemMessage(self.system_prompt), messages])
-        
+        messages = get_compacted_messages_for_current_topic(agent_state)
+        chat = GemmaBasedModelAdapter(self._model(), agent="appointment")
+        response = chat.invoke([SystemMessage(self.system_prompt), *messages])
+        return self._to_dialogue(agent_state, response)
+
+    async def _acall_llm(self, agent_state: AgentState) -> dict:
+        messages = get_compacted_messages_for_current_topic(agent_state)
+        chat = GemmaBasedModelAdapter(self._model(), agent="appointment")
+        response = await chat.ainvoke([SystemMessage(self.system_prompt), *messages])
+        return self._to_dialogue(agent_state, response)
+
+    def _to_dialogue(self, agent_state: AgentState, response: str) -> dict:
         tool_call = self._parse_tool_call(response)
         
         if tool_call:
@@ -155,12 +163,19 @@ class AppointmentAgent(ClusterAgent):
                     "id": str(uuid.uuid4())
                 }]
             )
-            add_message_to_dialogue(agent_state, tool_message)
+            return add_message_to_dialogue(agent_state, tool_message)
 
-        else:
-            add_message_to_dialogue(agent_state, AIMessage(content=response))
+        return add_message_to_dialogue(agent_state, AIMessage(content=response))
 
-        return {}
+    # Araç sonuçları da diğer mesajlar gibi mevcut konuya eklenir (topic_index kaydıyla);
+    # aksi halde get_messages_for_current_topic onları göremez.
+    def _run_tools(self, agent_state: AgentState) -> dict:
+        result = self.tool_node.invoke({"all_dialog": [get_messages_for_current_topic(agent_state)[-1]]})
+        return add_messages_to_dialogue(agent_state, result["all_dialog"])
+
+    async def _arun_tools(self, agent_state: AgentState) -> dict:
+        result = await self.tool_node.ainvoke({"all_dialog": [get_messages_for_current_topic(agent_state)[-1]]})
+        return add_messages_to_dialogue(agent_state, result["all_dialog"])
 
     def _should_continue(self, agent_state: AgentState) -> str:
         last_message = get_messages_for_current_topic(agent_state)[-1]
@@ -189,7 +204,6 @@ class AppointmentAgent(ClusterAgent):
                 tool_call_info = messages[-2].tool_calls[0]  # İlk tool_call'ı al
 
             if tool_call_info and tool_call_info.get('name') == 'book_appointment' and isinstance(tool_output, dict) and tool_output.get("status") == "success":
-                new_appointment_data = copy(get_current_topic(agent_state)["appointment_data"])
                 new_appointment_data = {
                     "doctor_name": tool_output.get("randevu", {}).get("doktor"),
                     "date": tool_output.get("randevu", {}).get("tarih"),
@@ -197,8 +211,9 @@ class AppointmentAgent(ClusterAgent):
                     "hospital": tool_output.get("randevu", {}).get("hastane_adi")
                 }
                 print(f"Yeni randevu bilgisi duruma eklendi: {new_appointment_data}")
-                get_current_topic(agent_state)["appointment_data"] = new_appointment_data
-                return {}
+                # Konu yerinde değiştirilmez; güncellenmiş kopyası topic_stack'e yazılır
+                topic = {**get_current_topic(agent_state), "appointment_data": new_appointment_data}
+                return {"topic_stack": [*agent_state["topic_stack"][:-1], topic]}
 
         except (json.JSONDecodeError, KeyError, IndexError) as e:
             print(f"Tool çıktısı işlenirken hata oluştu: {e}")
@@ -208,12 +223,11 @@ class AppointmentAgent(ClusterAgent):
 
     def _build_graph(self):
         graph = StateGraph(AgentState)
-        tool_node = ToolNode(tools)
 
         # Düğümleri ekleme
-        graph.add_node("llm", self._call_llm)
-        graph.add_node("action", tool_node)
-        graph.add_node("update_state", self._update_state_with_appointment)
+        graph.add_node("llm", RunnableLambda(self._call_llm, afunc=self._acall_llm, name="llm"))
+        graph.add_node("action", RunnableLambda(self._run_tools, afunc=self._arun_tools, name="action"))
+        graph.add_node("update_state", self.update_state_with_appointment)
 
         # Geçişleri tanımlama
         graph.add_edge(START, "llm")
@@ -233,11 +247,13 @@ class AppointmentAgent(ClusterAgent):
 
     def _get_node(self, agent_state: AgentState) -> dict:
         conversation_history = [SystemMessage(content=self.system_prompt)]
-        conversation_history.extend(get_messages_for_current_topic(agent_state))
+        conversation_history.extend(get_compacted_messages_for_current_topic(agent_state))
 
         print("Merhaba, ben sizin randevu asistanınızım. Size nasıl yardımcı olabilirim?")
-        self.graph.invoke(agent_state)
-        return {}
+        return self.graph.invoke(agent_state)
+
+    async def _aget_node(self, agent_state: AgentState) -> dict:
+        return await self.graph.ainvoke(agent_state)
 
 
 """
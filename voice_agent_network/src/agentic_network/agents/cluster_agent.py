@@ -1,12 +1,37 @@
 from __future__ import annotations
+import asyncio
 from abc import ABC, abstractmethod
+from langchain_core.runnables import RunnableLambda
 from agentic_network.core import AgentState
+from llm.core.model_tier import ModelTier
+from llm.core.llm_singletons import llmSingleton
 
 
 class ClusterAgent:
+    # The cheapest tier that handles the agent's turns well (see ModelTier)
+    MODEL_TIER: ModelTier = ModelTier.SMALL
+    # Whether a run can be thrown away unseen: no side effects besides the returned patch
+    # (and the current topic). Only such agents are started speculatively.
+    SPECULATIVE: bool = False
+
     def __call__(self, agent_state: AgentState) -> dict:
         return self._get_node(agent_state)
 
+    async def acall(self, agent_state: AgentState) -> dict:
+        return await self._aget_node(agent_state)
+
+    def as_node(self) -> RunnableLambda:
+        """The agent as a graph node: `__call__` under graph.invoke, `acall` under graph.ainvoke."""
+        return RunnableLambda(self.__call__, afunc=self.acall, name=type(self).__name__)
+
     @abstractmethod
     def _get_node(self, agent_state: AgentState) -> dict:
         raise NotImplementedError
+
+    async def _aget_node(self, agent_state: AgentState) -> dict:
+        # Agents without a coroutine of their own run on a worker thread, off the event loop
+        return await asyncio.to_thread(self._get_node, agent_state)
+
+    def _model(self):
+        # Resolved per turn so the registry can load models lazily and evict them when idle
+        return llmSingleton.for_tier(self.MODEL_TIER)
@@ -1,20 +1,23 @@
 # Diagnosis agent logic (Modül 1)
+import asyncio
 import json, re
 from enum import Enum
 from langchain_core.messages import AIMessage, HumanMessage, AnyMessage
 
 from .cluster_agent import ClusterAgent
 from agentic_network.core import AgentState
-from agentic_network.core.topic_manager_util import get_messages_for_current_topic, add_message_to_dialogue, redirect_to_appointment_agent
+from agentic_network.core.topic_manager_util import get_compacted_messages_for_current_topic, add_message_to_dialogue, redirect_to_appointment_agent
 from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
-from llm.core.llm_singletons import llmSingleton
+from llm.core.model_tier import ModelTier
 
 
 class DiognosisAgent(ClusterAgent):
-    def __init__(self):
-        medgemma = llmSingleton.medgemma_27b_text_it
-        self.chat = GemmaBasedModelAdapter(medgemma)
+    MODEL_TIER = ModelTier.LARGE
+    # Not speculated: randevu_al writes report.txt through a second generation on the shared
+    # self.messages, and a speculation that has started cannot be cancelled
+    SPECULATIVE = False
 
+    def __init__(self):
         self.AVAILABLE_TOOLS = {
             "kullanıcı_bilgisi_al": self.kullanıcı_bilgisi_al,
             "randevu_al": self.randevu_al
@@ -98,7 +101,7 @@ class DiognosisAgent(ClusterAgent):
             "role": "system",
             "content": [{"type": "text", "text": system_prompt}]
         }
-        response = self.medgemma.give_prompt(messages=self.messages)
+        response = self._model().give_prompt(messages=self.messages)
         print(self.messages)
         self.messages[0] = {
             "role": "system",
@@ -152,12 +155,24 @@ class DiognosisAgent(ClusterAgent):
 
     # ---- Internal Methods --------------------------------------------------------
     def _get_node(self, agent_state: AgentState) -> dict:
-        topic_messages = get_messages_for_current_topic(agent_state)
+        chat = GemmaBasedModelAdapter(self._model(), agent="diagnosis")
+        topic_messages = get_compacted_messages_for_current_topic(agent_state)
         while True:
-            response = self.chat.invoke(topic_messages)
+            response = chat.invoke(topic_messages)
             topic_messages.append(AIMessage(response))
             print("🤖 Chatbot:", response)
             if not self._detect_function_call(response, topic_messages): break
 
-        add_message_to_dialogue(agent_state, AIMessage(response))
-        return {}
+        return add_message_to_dialogue(agent_state, AIMessage(response))
+
+    async def _aget_node(self, agent_state: AgentState) -> dict:
+        chat = GemmaBasedModelAdapter(self._model(), agent="diagnosis")
+        topic_messages = get_compacted_messages_for_current_topic(agent_state)
+        while True:
+            response = await chat.ainvoke(topic_messages)
+            topic_messages.append(AIMessage(response))
+            print("🤖 Chatbot:", response)
+            # The tools are local, but randevu_al writes the report with the model
+            if not await asyncio.to_thread(self._detect_function_call, response, topic_messages): break
+
+        return add_message_to_dialogue(agent_state, AIMessage(response))
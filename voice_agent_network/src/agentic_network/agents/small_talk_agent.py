@@ -1,23 +1,45 @@
 from .cluster_agent import ClusterAgent
 from agentic_network.core import AgentState
-from llm.core.llm_singletons import llmSingleton
+from agentic_network.core.canned_responses import cannedResponses
+from llm.core.model_tier import ModelTier
 from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
-from agentic_network.core.topic_manager_util import get_messages_for_current_topic
+from agentic_network.core.topic_manager_util import get_compacted_messages_for_current_topic, add_message_to_dialogue
+from langchain_core.messages import SystemMessage, AIMessage
 
 
 class SmallTalkAgent(ClusterAgent):
+    MODEL_TIER = ModelTier.CANNED
+    SPECULATIVE = True
+
     def __init__(self):
         pass
 
     # ---- Internal Methods --------------------------------------------------------
     def _get_node(self, agent_state: AgentState) -> dict:
-        llm = llmSingleton.gemma_3_1b_it
-        chat = GemmaBasedModelAdapter(llm)
+        canned = cannedResponses.lookup(agent_state["current_message"])
+        if canned is not None:
+            print("-small talk: canned reply")
+            return add_message_to_dialogue(agent_state, AIMessage(canned))
 
-        system_message = "You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your task here is to answer to user's messages kindly and remind them you can help them with their hospital appointments."
+        chat = GemmaBasedModelAdapter(self._model(), agent="small_talk")
+        response = chat.invoke(self._build_messages(agent_state))
+
+        return add_message_to_dialogue(agent_state, AIMessage(response))
+
+    async def _aget_node(self, agent_state: AgentState) -> dict:
+        canned = cannedResponses.lookup(agent_state["current_message"])
+        if canned is not None:
+            print("-small talk: canned reply")
+            return add_message_to_dialogue(agent_state, AIMessage(canned))
 
-        messages = [system_message]
-        messages.extend(get_messages_for_current_topic(agent_state))
-        chat.invoke(messages)
+        chat = GemmaBasedModelAdapter(self._model(), agent="small_talk")
+        response = await chat.ainvoke(self._build_messages(agent_state))
+
+        return add_message_to_dialogue(agent_state, AIMessage(response))
+
+    def _build_messages(self, agent_state: AgentState) -> list:
+        system_message = "You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your task here is to answer to user's messages kindly and remind them you can help them with their hospital appointments."
 
-        return {}
+        messages = [SystemMessage(system_message)]
+        messages.extend(get_compacted_messages_for_current_topic(agent_state))
+        return messages
@@ -0,0 +1,112 @@
+import string
+import time
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from agentic_network.agents.topic_manager_cluster.agents import TopicAgent
+from agentic_network.core import AgentState, GraphRoutes
+from agentic_network.core.topic_manager_util import format_dialog, get_compacted_messages_for_topic, create_topic, resurface_topic
+from llm.core.llm_singletons import llmSingleton
+from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
+
+
+class FusedTopicRouterAgent(TopicAgent):
+    """
+    Single-pass alternative to the TopicChangeChecker → PreTopicsChecker → NewTopic chain.
+
+    Every possible outcome of the chain is one option: SAME TOPIC, RESUME TOPIC <n> for each
+    earlier topic, or NEW TOPIC: <agent> for each cluster agent. The options are listed under
+    letters and the model's next-token log-probability of each letter is its score, so every
+    option costs one token whatever the length of its label, and the prompt is prefilled once.
+    The best one is applied to the topic stack directly.
+    """
+
+    # The cluster agents a new topic can be assigned to
+    ROUTES = [GraphRoutes.DIAGNOSIS_AGENT, GraphRoutes.APPOINTMENT_AGENT,
+              GraphRoutes.SMALL_TALK_AGENT, GraphRoutes.OUT_OF_TOPIC_AGENT]
+
+    def __init__(self):
+        pass
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _get_node(self, agent_state: AgentState) -> dict:
+        print("-FUSED TOPIC ROUTER AGENT-")
+
+        topic_stack = agent_state["topic_stack"]
+        current_topic = topic_stack[-1] if topic_stack else None
+        # Earlier topics, most recent first, as many as there are letters left for
+        previous_topics = list(reversed(topic_stack[:-1] + agent_state["disclosed_topics"]))
+        previous_topics = previous_topics[:len(string.ascii_uppercase) - len(self.ROUTES) - 1]
+
+        labels = {"SAME TOPIC": None} if current_topic else {}
+        for n, topic in enumerate(previous_topics, start=1):
+            labels[f"RESUME TOPIC {n}"] = topic
+        for route in self.ROUTES:
+            labels[f"NEW TOPIC: {route.upper()}"] = route
+        # option letter -> label
+        options = dict(zip(string.ascii_uppercase, labels))
+
+        chat = GemmaBasedModelAdapter(llmSingleton.gemma_3_1b_it, agent="topic_router")
+        input_message = self._build_input_message(agent_state, current_topic, previous_topics, options)
+
+        start = time.perf_counter()
+        scores = chat.score([self._build_system_message(), input_message], list(options))
+        ranked = sorted(zip(scores, options.values()), reverse=True)
+        best_score, best_label = ranked[0]
+        margin = best_score - ranked[1][0] if len(ranked) > 1 else float("inf")
+        print(f"-fused routing: {best_label} (margin {margin:.2f}) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        if best_label == "SAME TOPIC":
+            return {}
+        if best_label.startswith("RESUME"):
+            return resurface_topic(agent_state, labels[best_label]["id"])
+        return create_topic(agent_state, labels[best_label])
+
+    # The instructions are static so that the model can reuse their prefilled KV cache every turn;
+    # everything that changes per turn goes into the input message.
+    def _build_system_message(self) -> SystemMessage:
+        system_message = SystemMessage(content=(
+            """You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your task is **topic routing**: decide where the latest user input belongs in the ongoing dialog.
+
+    ANSWERS
+    The user message lists the possible answers as OPTIONS, each under a letter. They are of these kinds:
+    - SAME TOPIC — the input continues the current topic (adds details, answers a question, clarifies, adjusts logistics of the same task, or is a brief acknowledgment).
+    - RESUME TOPIC [n] — the input clearly returns to earlier topic number n (same condition, appointment, test, medication or clinician).
+    - NEW TOPIC: DIAGNOSIS_AGENT — a new clinical question: symptoms, causes, severity, medications, test results.
+    - NEW TOPIC: APPOINTMENT_AGENT — a new scheduling or visit-admin request: book, reschedule, cancel, refills, referrals.
+    - NEW TOPIC: SMALL_TALK_AGENT — greetings, thanks, acknowledgments or meta-chat with no current topic to continue.
+    - NEW TOPIC: OUT_OF_TOPIC_AGENT — unrelated to healthcare tasks, spam, or not actionable.
+
+    RULES
+    - Prefer SAME TOPIC when there is clear linkage to the current topic.
+    - Prefer RESUME TOPIC only on a strong match with an earlier topic; otherwise start a NEW TOPIC.
+    - If a new message has both clinical details and an explicit scheduling action, choose APPOINTMENT_AGENT.
+    - Apply the same rules for any language. You are not giving medical advice.
+    - Reply with the letter of the chosen option only.
+    """
+        ))
+        return system_message
+
+    def _build_input_message(self, agent_state: AgentState, current_topic, previous_topics, options: dict) -> HumanMessage:
+        current_dialog = format_dialog(get_compacted_messages_for_topic(agent_state, current_topic)) if current_topic else "(none)"
+        previous = "\n".join(
+            f"    TOPIC {n} ({topic['agent']}):\n    {format_dialog(get_compacted_messages_for_topic(agent_state, topic))}"
+            for n, topic in enumerate(previous_topics, start=1)
+        ) or "    (none)"
+        choices = "\n".join(f"    {letter}) {label}" for letter, label in options.items())
+
+        return HumanMessage(content=(
+            f"""CURRENT TOPIC:
+    {current_dialog}
+
+    EARLIER TOPICS:
+{previous}
+
+    user_input:
+    {agent_state["current_message"]}
+
+    OPTIONS:
+{choices}
+
+    Answer with the letter of exactly one of the OPTIONS."""
+        ))
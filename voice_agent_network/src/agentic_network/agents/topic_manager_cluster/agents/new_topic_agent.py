@@ -1,13 +1,18 @@
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from agentic_network.agents.topic_manager_cluster.agents import TopicAgent
-from agentic_network.core.topic_manager_util import format_dialog
+from agentic_network.agents.topic_manager_cluster.routing.new_topic_condition import parse_new_topic_route
+from agentic_network.core.topic_manager_util import format_dialog, create_topic
 from agentic_network.core import AgentState, GraphRoutes
 from llm.core.llm_singletons import llmSingleton
 from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
 
 
 class NewTopicAgent(TopicAgent):
+    # The cluster agents a new topic can be assigned to
+    ROUTES = [GraphRoutes.DIAGNOSIS_AGENT, GraphRoutes.APPOINTMENT_AGENT,
+              GraphRoutes.SMALL_TALK_AGENT, GraphRoutes.OUT_OF_TOPIC_AGENT]
+
     def __init__(self):
         pass
 
@@ -16,16 +21,25 @@ class NewTopicAgent(TopicAgent):
         print("-NEW TOPIC AGENT-")
 
         llm = llmSingleton.gemma_3_1b_it
-        chat = GemmaBasedModelAdapter(llm)
+        chat = GemmaBasedModelAdapter(llm, agent="topic_router")
         current_message = agent_state["current_message"]
-        thoughts = format_dialog(agent_state["thoughts"])
-        system_message = self._build_system_message(current_message, thoughts)
+        thoughts = format_dialog(self._own_thoughts(agent_state))
+        input_message = self._build_input_message(current_message, thoughts)
+
+        answer = self._answer(chat, [self._build_system_message(), input_message],
+                              [route.upper() for route in self.ROUTES])
+
+        # A valid answer opens the topic here; decide_new_topic_found then ends the cluster
+        route = parse_new_topic_route(answer)
+        if route is None:
+            return {"thoughts": [self._thought(answer)]}
 
-        return {
-            "thoughts": [chat.invoke([system_message, HumanMessage(content="Follow the instruction above and answer.")])]
-        }
+        print("-info: new topic is created with agent:", route)
+        return {"thoughts": [self._thought(answer)], **create_topic(agent_state, route)}
 
-    def _build_system_message(self, message: str, thoughts: str) -> SystemMessage:
+    # The instructions are static so that the model can reuse their prefilled KV cache every turn;
+    # everything that changes per turn goes into the input message.
+    def _build_system_message(self) -> SystemMessage:
         system_message = SystemMessage(content=(
             f"""You are part of a medical assistant. Your sole task is **agent routing for a new topic**: based ONLY on the latest user message, choose which specialized agent should handle it.
 
@@ -63,9 +77,8 @@ class NewTopicAgent(TopicAgent):
       • Is administrative/billing not tied to a specific visit and cannot be addressed by scheduling logistics (e.g., “explain my insurance plan in general”).
       Examples: “Write me a Python script.” / “Plan my vacation.” / “What’s the stock price of XYZ?”
     
-    INPUT
-    - user_input — the latest user message (string):
-    {message}
+    INPUT (given in the user message)
+    - user_input — the latest user message (string)
     
     DECISION RULES
     - Classify the **single best agent** for this new topic. Do not assume continuity with prior topics.
@@ -101,10 +114,19 @@ class NewTopicAgent(TopicAgent):
     4) “Can you explain my BluePlus plan in general?” → FINAL ANSWER: OUT_OF_TOPIC_AGENT
     5) “Refill my amoxicillin to Walgreens on 5th.” → FINAL ANSWER: APPOINTMENT_AGENT
     6) “Is it safe to take ibuprofen with amoxicillin?” → FINAL ANSWER: DIAGNOSIS_AGENT
+    """
+        ))
+        return system_message
+
+    def _build_input_message(self, message: str, thoughts: str) -> HumanMessage:
+        return HumanMessage(content=(
+            f"""INPUT:
+    user_input:
+    {message}
     
     THOUGHTS:
     These are your lates thoughts on this task if you've had any:
     {thoughts}
-    """
+
+    Follow the instruction above and answer."""
         ))
-        return system_message
@@ -1,8 +1,9 @@
-from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage
 
 from agentic_network.agents.topic_manager_cluster.agents import TopicAgent
 from agentic_network.core import AgentState
-from agentic_network.core.topic_manager_util import format_dialog_with_topics, format_dialog
+from agentic_network.agents.topic_manager_cluster.routing.pre_topic_found_condition import parse_pre_topic_id
+from agentic_network.core.topic_manager_util import format_dialog_with_topics, format_dialog, resurface_topic, get_compacted_messages_for_topic
 from llm.core.llm_singletons import llmSingleton
 from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
 
@@ -19,28 +20,38 @@ class PreTopicsCheckerAgent(TopicAgent):
         disclosed_topics = agent_state["disclosed_topics"]
         if not topic_stack and not disclosed_topics:
             return {
-                "all_dialog": AIMessage("FINAL ANSWER: NEW TOPIC")
+                "thoughts": [self._thought("FINAL ANSWER: NEW TOPIC")]
             }
 
         llm = llmSingleton.gemma_3_1b_it
-        chat = GemmaBasedModelAdapter(llm)
-        dialog = format_dialog_with_topics(agent_state["all_dialog"])
-        thoughts = format_dialog(agent_state["thoughts"])
+        chat = GemmaBasedModelAdapter(llm, agent="topic_router")
+        # Each topic's summary and verbatim tail, so the prompt stays bounded on long calls
+        dialog = format_dialog_with_topics(message for topic in topic_stack + disclosed_topics
+                                           for message in get_compacted_messages_for_topic(agent_state, topic))
+        thoughts = format_dialog(self._own_thoughts(agent_state))
         current_message = agent_state["current_message"]
-        system_message = self._build_system_message(dialog, current_message, thoughts)
+        input_message = self._build_input_message(dialog, current_message, thoughts)
 
-        return {
-            "thoughts": [chat.invoke([system_message, HumanMessage(content="Follow the instruction above and answer.")])]
-        }
+        answer = self._answer(chat, [self._build_system_message(), input_message],
+                              [topic["id"] for topic in topic_stack + disclosed_topics] + ["NEW TOPIC"])
 
-    def _build_system_message(self, dialog: str, message: str, thoughts: str) -> SystemMessage:
+        # An earlier topic is brought back to the top here; decide_pre_topic_found then ends the cluster
+        topic_id = parse_pre_topic_id(agent_state, answer)
+        if topic_id is None:
+            return {"thoughts": [self._thought(answer)]}
+
+        return {"thoughts": [self._thought(answer)], **resurface_topic(agent_state, topic_id)}
+
+    # The instructions are static so that the model can reuse their prefilled KV cache every turn;
+    # everything that changes per turn goes into the input message.
+    def _build_system_message(self) -> SystemMessage:
         system_message = SystemMessage(content=(
-            f"""You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your task here is **topic attribution**: decide which existing topic in the full dialog the latest user input belongs to, or declare that it should start a new topic.
+            """You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your task here is **topic attribution**: decide which existing topic in the full dialog the latest user input belongs to, or declare that it should start a new topic.
 
     TASK
     Choose the single best topic for the latest user input, or output NEW TOPIC if no clear match exists.
     
-    INPUTS
+    INPUTS (given in the user message)
     - user_input — the latest user message (string)
     
     - dialog_with_topics — the entire dialog so far, ordered, each turn annotated with a topic id (string) beside it. Each item includes: role, content, topic_id.
@@ -86,8 +97,13 @@ class PreTopicsCheckerAgent(TopicAgent):
     Optionally reflect first using:
     THOUGHT: [brief reasoning about candidate topics and why]
     Then output exactly one final line as specified in STRICT OUTPUT.
-    
-    INPUTS:
+    """
+        ))
+        return system_message
+
+    def _build_input_message(self, dialog: str, message: str, thoughts: str) -> HumanMessage:
+        return HumanMessage(content=(
+            f"""INPUTS:
     user_input:
     {message}
     
@@ -97,9 +113,9 @@ class PreTopicsCheckerAgent(TopicAgent):
     THOUGHTS:
     These are your lates thoughts on this task if you've had any:
     {thoughts}
-    """
+
+    Follow the instruction above and answer."""
         ))
-        return system_message
 
 
 # Test the AI
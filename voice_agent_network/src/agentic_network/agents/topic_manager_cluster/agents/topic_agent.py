@@ -1,12 +1,47 @@
 from __future__ import annotations
+import asyncio
+import os
 from abc import ABC, abstractmethod
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.runnables import RunnableLambda
+
 from agentic_network.core import AgentState
+from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
 
 
 class TopicAgent:
+    # With constrained decoding the model can only emit one of the agent's FINAL ANSWER lines,
+    # so the routers never see THOUGHT or malformed output. TOPIC_CONSTRAINED_DECODING=0 turns it off.
+    constrained_decoding: bool = os.getenv("TOPIC_CONSTRAINED_DECODING", "1") == "1"
+
     def __call__(self, agent_state: AgentState) -> dict:
         return self._get_node(agent_state)
 
+    async def acall(self, agent_state: AgentState) -> dict:
+        # The routing agents make one short local-model call each; it runs on a worker thread
+        return await asyncio.to_thread(self._get_node, agent_state)
+
+    def as_node(self) -> RunnableLambda:
+        """The agent as a graph node: `__call__` under graph.invoke, `acall` under graph.ainvoke."""
+        return RunnableLambda(self.__call__, afunc=self.acall, name=type(self).__name__)
+
     @abstractmethod
     def _get_node(self, agent_state: AgentState) -> dict:
         raise NotImplementedError
+
+    def _answer(self, chat: GemmaBasedModelAdapter, messages: List[BaseMessage], final_answers: List[str]) -> str:
+        """Asks the model, restricting the reply to `final_answers` when constrained decoding is on."""
+        choices = [f"FINAL ANSWER: {answer}" for answer in final_answers]
+        if self.constrained_decoding:
+            return chat.choose(messages, choices)
+        return chat.invoke(messages)
+
+    def _thought(self, answer: str) -> AIMessage:
+        """The answer as a thought, named after the agent so that its own retries can tell it apart."""
+        return AIMessage(answer, name=type(self).__name__)
+
+    def _own_thoughts(self, agent_state: AgentState) -> List[BaseMessage]:
+        # The agent's earlier answers this turn; the cluster drops all thoughts once the topic is settled
+        return [thought for thought in agent_state["thoughts"] if thought.name == type(self).__name__]
@@ -1,8 +1,8 @@
-from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage
 
 from agentic_network.agents.topic_manager_cluster.agents import TopicAgent
 from agentic_network.core import AgentState
-from agentic_network.core.topic_manager_util import get_messages_for_current_topic, format_dialog
+from agentic_network.core.topic_manager_util import get_compacted_messages_for_current_topic, format_dialog
 from llm.core.gemma_based_model_adapter import GemmaBasedModelAdapter
 from llm.core.llm_singletons import llmSingleton
 
@@ -20,33 +20,34 @@ class TopicChangeCheckerAgent(TopicAgent):
             print("--there was no topic in stack, redirect to: PRE TOPIC CHECKER AGENT")
 
             return {
-                "thoughts": AIMessage("FINAL ANSWER: DIFFERENT TOPIC")
+                "thoughts": [self._thought("FINAL ANSWER: DIFFERENT TOPIC")]
             }
 
         llm = llmSingleton.gemma_3_1b_it
-        chat = GemmaBasedModelAdapter(llm)
-        dialog = format_dialog(get_messages_for_current_topic(agent_state))
-        thoughts = format_dialog(agent_state["thoughts"])
+        chat = GemmaBasedModelAdapter(llm, agent="topic_router")
+        dialog = format_dialog(get_compacted_messages_for_current_topic(agent_state))
+        thoughts = format_dialog(self._own_thoughts(agent_state))
         current_message = agent_state["current_message"]
-        system_message = self._build_system_message(dialog, current_message, thoughts)
+        input_message = self._build_input_message(dialog, current_message, thoughts)
 
         return {
-            "thoughts": [chat.invoke([system_message, HumanMessage(content="Follow the instruction above and answer.")])]
+            "thoughts": [self._thought(self._answer(chat, [self._build_system_message(), input_message],
+                                                    ["SAME TOPIC", "DIFFERENT TOPIC"]))]
         }
 
-    def _build_system_message(self, dialog: str, message: str, thoughts: str) -> SystemMessage:
+    # The instructions are static so that the model can reuse their prefilled KV cache every turn;
+    # everything that changes per turn goes into the input message.
+    def _build_system_message(self) -> SystemMessage:
         system_message = SystemMessage(content=(
-            f"""You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your primary goal is to provide helpful, precise, and clear responses.
+            """You are part of an AI assistant designed to help users with medical conditions get diagnosed and get hospital appointments. Your primary goal is to provide helpful, precise, and clear responses.
 
     TASK
     Decide if the latest user input continues the current topic in the ongoing medical-assistant dialog.
 
-    INPUTS
-    - user_input - the latest user message (string):
-    {message}
+    INPUTS (given in the user message)
+    - user_input - the latest user message (string)
 
-    - messages - prior turns for the current topic (array of [role, content], ordered):
-    {dialog}
+    - messages - prior turns for the current topic (array of [role, content], ordered)
 
     STRICT OUTPUT (ONLY ONE LINE)
     Always print EXACTLY one of:
@@ -99,13 +100,25 @@ class TopicChangeCheckerAgent(TopicAgent):
     You should first reflect on the current situation using 'THOUGHT: [your_thoughts]'.
     When you decide on an answer, print exactly one of these two answers:
     'FINAL ANSWER: SAME TOPIC' or 'FINAL ANSWER: DIFFERENT TOPIC'
-    
+    """
+        ))
+        return system_message
+
+    def _build_input_message(self, dialog: str, message: str, thoughts: str) -> HumanMessage:
+        return HumanMessage(content=(
+            f"""INPUTS:
+    user_input:
+    {message}
+
+    messages:
+    {dialog}
+
     THOUGHTS:
     These are your lates thoughts on this task if you've had any:
     {thoughts}
-    """
+
+    Follow the instruction above and answer."""
         ))
-        return system_message
 
 
 # Test the AI
@@ -9,3 +9,12 @@ class TopicManagerRoutes(StrEnum):
     TOPIC_CHANGE_CHECKER_AGENT = auto()
     PRE_TOPICS_AGENT = auto()
     NEW_TOPIC_AGENT = auto()
+    FUSED_ROUTER_AGENT = auto()
+
+    # Outcome of the fast path: hand the turn to the LLM topic agents of the current mode
+    LLM_ROUTING = auto()
+    # Outcome of the fast path on a confident first turn: open a topic for the classified agent
+    FIRST_TOPIC = auto()
+
+    # Last step once the topic is settled: the user's message joins that topic's dialog
+    ATTACH_MESSAGE = auto()
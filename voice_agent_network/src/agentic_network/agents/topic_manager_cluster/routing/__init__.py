@@ -1,3 +1,4 @@
 from .topic_changed_condition import decide_topic_has_changed
 from .pre_topic_found_condition import decide_pre_topic_found
 from .new_topic_condition import decide_new_topic_found
+from .fast_path_condition import decide_fast_path
@@ -1,6 +1,3 @@
-from agentic_network.core import AgentState
-
-
 def strip_braces(s: str) -> str:
     s = s.strip()
 
@@ -15,7 +12,3 @@ def strip_braces(s: str) -> str:
     elif s.endswith("]"): s = s[:-1].strip()
 
     return s
-
-
-def clean_thoughts(agent_state: AgentState):
-    agent_state["thoughts"].clear()
\ No newline at end of file
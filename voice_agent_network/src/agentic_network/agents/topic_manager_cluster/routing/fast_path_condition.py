@@ -0,0 +1,41 @@
+import os
+
+from agentic_network.core import AgentState
+from agentic_network.agents.topic_manager_cluster.core import TopicManagerRoutes
+from agentic_network.core.intent_classifier import intentClassifier
+from agentic_network.core.topic_manager_util import get_current_topic
+
+
+# Minimum classifier confidence for skipping the LLM topic agents
+FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.75"))
+
+
+def decide_fast_path(agent_state: AgentState) -> TopicManagerRoutes:
+    """
+    Entry router of the topic manager cluster. Settles the obvious turns with the keyword
+    classifier and sends everything it is unsure about to the LLM topic agents:
+       - an acknowledgment, or a confident intent matching the current topic's agent → same topic
+       - a confident intent on the very first turn → FIRST_TOPIC, which opens a topic for that agent
+    A change cue ("başka", "bir de" ...) always goes to the LLM, since it may start a new topic.
+    """
+    print("-decide: FAST PATH CONDITION-")
+
+    prediction = intentClassifier.classify(agent_state["current_message"])
+    current_topic = get_current_topic(agent_state)
+    confident = prediction.route is not None and prediction.confidence >= FAST_PATH_THRESHOLD
+
+    if prediction.has_change_cue:
+        print("-change cue found, redirect to: LLM_ROUTING")
+        return TopicManagerRoutes.LLM_ROUTING
+
+    if current_topic:
+        if prediction.is_acknowledgment or (confident and prediction.route == current_topic["agent"]):
+            print(f"-same topic ({prediction.route}, {prediction.confidence:.2f}), redirect to: END")
+            return TopicManagerRoutes.END
+
+    elif confident and not agent_state["disclosed_topics"]:
+        print(f"-first topic is {prediction.route} ({prediction.confidence:.2f}), redirect to: FIRST_TOPIC")
+        return TopicManagerRoutes.FIRST_TOPIC
+
+    print(f"-not confident ({prediction.route}, {prediction.confidence:.2f}), redirect to: LLM_ROUTING")
+    return TopicManagerRoutes.LLM_ROUTING
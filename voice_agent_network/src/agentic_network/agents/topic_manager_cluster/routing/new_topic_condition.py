@@ -1,8 +1,9 @@
+from typing import Optional
+
 from agentic_network.core import AgentState
 from agentic_network.core import GraphRoutes
 from agentic_network.agents.topic_manager_cluster.core import TopicManagerRoutes
-from agentic_network.agents.topic_manager_cluster.routing.condition_util import strip_braces, clean_thoughts
-from agentic_network.core.topic_manager_util import create_topic
+from agentic_network.agents.topic_manager_cluster.routing.condition_util import strip_braces
 
 
 _allowed_agents = {
@@ -22,12 +23,13 @@ def _strip_prefix_graphroutes(s: str) -> str:
     return s.strip()
 
 
-def _parse_router_output(agent_state: AgentState, text: str) -> bool:
+def parse_new_topic_route(text: str) -> Optional[GraphRoutes]:
     """Parses:
        - FINAL ANSWER: {GraphRoutes.NAME}
        - FINAL ANSWER: NAME
        - THOUGHT: anything...
-       Returns FINAL / THOUGHT / MALFORMED without using regex.
+       Returns the agent of a valid FINAL ANSWER, None for a THOUGHT or malformed answer.
+       The NewTopicAgent opens the topic with it; this router only follows the same answer.
     """
     text = (text or "").strip()
     text = text.upper()
@@ -40,22 +42,17 @@ def _parse_router_output(agent_state: AgentState, text: str) -> bool:
         route = route.upper()
 
         if route in _allowed_agents:
-            create_topic(agent_state, GraphRoutes[route])
-            print("-info: new topic is created with agent:", route)
-            return True
+            return GraphRoutes[route]
 
-        return False
+    return None
 
 
 def decide_new_topic_found(agent_state: AgentState) -> TopicManagerRoutes:
     print("-decide: NEW TOPIC CONDITION-")
 
     ai_message = agent_state["thoughts"][-1].content
-    new_topic_is_found = _parse_router_output(agent_state, ai_message)
-
-    if new_topic_is_found:
+    if parse_new_topic_route(ai_message) is not None:
         print("-new topic is found, redirect to: END")
-        clean_thoughts(agent_state)
         return TopicManagerRoutes.END
 
     print("-new topic is not found or malformed, redirect to: NEW_TOPIC_AGENT")
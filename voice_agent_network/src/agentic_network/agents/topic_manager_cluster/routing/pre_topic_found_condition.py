@@ -1,9 +1,10 @@
 import uuid
+from typing import Optional
 
 from agentic_network.core import AgentState
 from agentic_network.agents.topic_manager_cluster.core import TopicManagerRoutes
-from agentic_network.agents.topic_manager_cluster.routing.condition_util import strip_braces, clean_thoughts
-from agentic_network.core.topic_manager_util import find_topic_index, resurface_topic
+from agentic_network.agents.topic_manager_cluster.routing.condition_util import strip_braces
+from agentic_network.core.topic_manager_util import find_topic_index
 
 
 def _is_valid_uuid(value, version=4):
@@ -16,6 +17,31 @@ def _is_valid_uuid(value, version=4):
     return str(uuid_obj) == value.lower()
 
 
+def parse_pre_topic_id(agent_state: AgentState, text: str) -> Optional[str]:
+    """
+    Returns the earlier topic a `FINAL ANSWER: [topic_id]` points to, or None when the answer
+    is NEW TOPIC, a THOUGHT, or an id that is malformed or names no known topic.
+    The PreTopicsCheckerAgent resurfaces the topic with it; the router only follows the same answer.
+    """
+    text = (text or "").upper()
+    if "FINAL ANSWER" not in text or "NEW" in text: return None
+
+    topic_id = text.split("FINAL ANSWER:")[1].strip()
+    topic_id = strip_braces(topic_id)
+    topic_id = topic_id.lower()
+
+    if not _is_valid_uuid(topic_id):
+        print("-the topic id is not a valid uuid")
+        return None  # TODO: add the thought that the topic_id is not a valid uuid
+
+    known_topics = agent_state["topic_stack"] + agent_state["disclosed_topics"]
+    if find_topic_index(known_topics, topic_id) == -1:
+        print("-the topic id could not be found in the topic stack")
+        return None  # TODO: add the thought that the topic_id cannot be found
+
+    return topic_id
+
+
 def decide_pre_topic_found(agent_state: AgentState) -> TopicManagerRoutes:
     """Parses:
        - FINAL ANSWER: [topic_id]
@@ -24,31 +50,19 @@ def decide_pre_topic_found(agent_state: AgentState) -> TopicManagerRoutes:
    """
     print("-decide: PRE TOPIC FOUND CONDITION-")
 
-    ai_message = agent_state["all_dialog"][-1].content.upper()  # TODO: this should change to thought dialog
+    ai_message = agent_state["thoughts"][-1].content.upper()
 
     if "FINAL ANSWER" in ai_message:
         if "NEW" in ai_message:
             print("-this is a new topic, redirect to: NEW_TOPIC_AGENT")
-            clean_thoughts(agent_state)
             return TopicManagerRoutes.NEW_TOPIC_AGENT
 
-        else:
-            topic_id = ai_message.split("FINAL ANSWER:")[1].strip()
-            topic_id = strip_braces(topic_id)
-            topic_id = topic_id.lower()
-
-            if not _is_valid_uuid(topic_id):
-                print("-the topic id is not a valid uuid, redirect to: PRE_TOPICS_AGENT")
-                return TopicManagerRoutes.PRE_TOPICS_AGENT  # TODO: add the thought that the topic_id is not a valid uuid
-
-            if find_topic_index(agent_state, topic_id):
-                print("-the topic id could not be found in the topic stack, redirect to: PRE_TOPICS_AGENT")
-                return TopicManagerRoutes.PRE_TOPICS_AGENT  # TODO: add the thought that the topic_id cannot be found
+        if parse_pre_topic_id(agent_state, ai_message) is None:
+            print("-the topic id is not a known topic, redirect to: PRE_TOPICS_AGENT")
+            return TopicManagerRoutes.PRE_TOPICS_AGENT
 
-            print("-this is an older topic, redirect to: END")
-            resurface_topic(agent_state, topic_id)
-            clean_thoughts(agent_state)
-            return TopicManagerRoutes.END
+        print("-this is an older topic, redirect to: END")
+        return TopicManagerRoutes.END
 
     print("-final answer is malformed, redirect to: PRE_TOPICS_AGENT")
     return TopicManagerRoutes.PRE_TOPICS_AGENT
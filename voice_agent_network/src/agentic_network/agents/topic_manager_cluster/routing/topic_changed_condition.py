@@ -1,6 +1,5 @@
 from agentic_network.core import AgentState
 from agentic_network.agents.topic_manager_cluster.core import TopicManagerRoutes
-from agentic_network.agents.topic_manager_cluster.routing.condition_util import clean_thoughts
 
 
 def decide_topic_has_changed(agent_state: AgentState) -> TopicManagerRoutes:
@@ -21,12 +20,10 @@ def decide_topic_has_changed(agent_state: AgentState) -> TopicManagerRoutes:
     if "FINAL ANSWER" in ai_message:
         if "SAME" in ai_message:
             print("-same topic, redirect to: END")
-            clean_thoughts(agent_state)
             return TopicManagerRoutes.END
 
         elif "DIFFERENT" in ai_message:
             print("-different topic, redirect to: PRE_TOPICS_AGENT")
-            clean_thoughts(agent_state)
             return TopicManagerRoutes.PRE_TOPICS_AGENT
 
     print("-final message malformed, redirect to: TOPIC_CHANGE_CHECKER_AGENT")
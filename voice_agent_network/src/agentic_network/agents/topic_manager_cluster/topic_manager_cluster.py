@@ -1,14 +1,28 @@
+import os
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph.state import CompiledStateGraph, StateGraph
 
 from agentic_network.agents.cluster_agent import ClusterAgent
 from agentic_network.agents.topic_manager_cluster.core import TopicManagerRoutes
 from agentic_network.agents.topic_manager_cluster.routing import decide_topic_has_changed, decide_pre_topic_found, decide_new_topic_found
+from agentic_network.agents.topic_manager_cluster.routing import decide_fast_path
 from agentic_network.agents.topic_manager_cluster.agents import TopicAgent, TopicChangeCheckerAgent
-from agentic_network.agents.topic_manager_cluster.agents import PreTopicsCheckerAgent, NewTopicAgent
+from agentic_network.agents.topic_manager_cluster.agents import PreTopicsCheckerAgent, NewTopicAgent, FusedTopicRouterAgent
 from agentic_network.core import AgentState
+from agentic_network.core.intent_classifier import intentClassifier
+from agentic_network.core.topic_manager_util import add_message_to_dialogue, create_topic
+from langchain_core.messages import HumanMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 
 
 class TopicManagerCluster(ClusterAgent):
+    # "chain": change checker → previous topics checker → new topic agent, one generation each.
+    # "fused": a single forward pass scores every outcome at once (see FusedTopicRouterAgent).
+    ROUTING_MODE = os.getenv("TOPIC_ROUTING_MODE", "chain")
+    # Let the keyword intent classifier skip the LLM agents on confident turns (INTENT_FAST_PATH=0 disables)
+    FAST_PATH = os.getenv("INTENT_FAST_PATH", "1") == "1"
+
     # The compiled, runnable graph (set in _build_graph)
     graph: CompiledStateGraph = None
 
@@ -16,16 +30,40 @@ class TopicManagerCluster(ClusterAgent):
     topic_change_checker_agent: TopicAgent = None
     pre_topics_checker_agent: TopicAgent = None
     new_topic_agent: TopicAgent = None
+    fused_router_agent: TopicAgent = None
 
-    def __init__(self):
-        """Create agents and build the graph once."""
+    def __init__(self, checkpointer: BaseCheckpointSaver = None):
+        """
+        Create agents and build the graph once. Without a checkpointer of its own the cluster
+        inherits the one of the graph it runs in (AgentGraph), under its node's namespace.
+        """
+        self.checkpointer = checkpointer
         self._initialize_agents()
         self._build_graph()
 
     # ---- Internal Methods --------------------------------------------------------
     def _get_node(self, agent_state: AgentState) -> dict:
-        self.graph.invoke(state=agent_state)
-        return {}
+        # Standalone use only; AgentGraph registers `self.graph` itself as a subgraph node
+        return self.graph.invoke(agent_state)
+
+    async def _aget_node(self, agent_state: AgentState) -> dict:
+        return await self.graph.ainvoke(agent_state)
+
+    def _open_first_topic(self, agent_state: AgentState) -> dict:
+        # The fast path only sends a confident first turn here; the classifier is deterministic,
+        # so it names the same agent the router saw.
+        return create_topic(agent_state, intentClassifier.classify(agent_state["current_message"]).route)
+
+    def _attach_user_message(self, agent_state: AgentState) -> dict:
+        # The user's turn belongs to whichever topic the cluster settled on. The routing agents'
+        # thoughts were only for this turn, so they are dropped rather than returned and checkpointed.
+        return {**add_message_to_dialogue(agent_state, HumanMessage(agent_state["current_message"])),
+                "thoughts": [RemoveMessage(id=REMOVE_ALL_MESSAGES)]}
+
+    @staticmethod
+    def _settled(*routes: TopicManagerRoutes) -> dict:
+        """Path map for a router: its routes as they are, except that END (topic settled) attaches the message first."""
+        return {**{route: route for route in routes}, TopicManagerRoutes.END: TopicManagerRoutes.ATTACH_MESSAGE}
 
     def _initialize_agents(self) -> None:
         """Instantiate concrete agent nodes.
@@ -36,15 +74,26 @@ class TopicManagerCluster(ClusterAgent):
         self.topic_change_checker_agent = TopicChangeCheckerAgent()
         self.pre_topics_checker_agent = PreTopicsCheckerAgent()
         self.new_topic_agent = NewTopicAgent()
+        self.fused_router_agent = FusedTopicRouterAgent()
 
     def _build_graph(self) -> None:
         """Declare nodes, edges, and routing, then compile the graph.
 
-        Structure:
+        Structure ("chain" mode):
             - Nodes: one per agent.
-            - Start edge: START → TopicChangeCheckerAgent.
-            - Conditional edges:
-        #     todo: add these
+            - Start edge: START → (fast path →) TopicChangeCheckerAgent.
+            - Conditional edges: each agent's decide_* router either ends the cluster or
+              moves on to the next agent (or re-asks the same one).
+
+        Structure ("fused" mode):
+            - START → (fast path →) FusedTopicRouterAgent → END.
+
+        The fast path (decide_fast_path) may settle the topic right at START, through the
+        FIRST_TOPIC node on a confident first turn. However the topic is settled, the
+        ATTACH_MESSAGE node then adds the user's message to its dialog and clears the thoughts.
+
+        Routers only decide: topic changes are returned by nodes (FIRST_TOPIC, the previous
+        topics and new topic agents, the fused router), so the checkpointer records them.
 
         Notes:
             - `TopicManagerRoutes` values are used as node identifiers to keep routing
@@ -56,28 +105,51 @@ class TopicManagerCluster(ClusterAgent):
 
         # ---------------------- Nodes -------------------------------------------------
         # Register each agent under a stable route key from GraphRoutes.
-        graph_builder.add_node(TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT, self.topic_change_checker_agent)
-        graph_builder.add_node(TopicManagerRoutes.PRE_TOPICS_AGENT, self.pre_topics_checker_agent)
-        graph_builder.add_node(TopicManagerRoutes.NEW_TOPIC_AGENT, self.new_topic_agent)
-
-        # ---------------------- Linear Edge(s) ----------------------------------------
-        # Entry point: start the graph at TopicChangeCheckerAgent.
-        graph_builder.add_edge(TopicManagerRoutes.START, TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT)
-
-        # ---------------------- Conditional Routing -----------------------------------
-        graph_builder.add_conditional_edges(
-            TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT,
-            decide_topic_has_changed
-        )
-        graph_builder.add_conditional_edges(
-            TopicManagerRoutes.PRE_TOPICS_AGENT,
-            decide_pre_topic_found
-        )
-        graph_builder.add_conditional_edges(
-            TopicManagerRoutes.NEW_TOPIC_AGENT,
-            decide_new_topic_found
-        )
+        if self.ROUTING_MODE == "fused":
+            entry = TopicManagerRoutes.FUSED_ROUTER_AGENT
+            graph_builder.add_node(TopicManagerRoutes.FUSED_ROUTER_AGENT, self.fused_router_agent.as_node())
+        else:
+            entry = TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT
+            graph_builder.add_node(TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT, self.topic_change_checker_agent.as_node())
+            graph_builder.add_node(TopicManagerRoutes.PRE_TOPICS_AGENT, self.pre_topics_checker_agent.as_node())
+            graph_builder.add_node(TopicManagerRoutes.NEW_TOPIC_AGENT, self.new_topic_agent.as_node())
+        graph_builder.add_node(TopicManagerRoutes.ATTACH_MESSAGE, self._attach_user_message)
+
+        # ---------------------- Entry -------------------------------------------------
+        # The keyword classifier settles obvious turns; the rest start at the LLM agents.
+        if self.FAST_PATH:
+            graph_builder.add_node(TopicManagerRoutes.FIRST_TOPIC, self._open_first_topic)
+            graph_builder.add_conditional_edges(
+                TopicManagerRoutes.START,
+                decide_fast_path,
+                {TopicManagerRoutes.END: TopicManagerRoutes.ATTACH_MESSAGE, TopicManagerRoutes.LLM_ROUTING: entry,
+                 TopicManagerRoutes.FIRST_TOPIC: TopicManagerRoutes.FIRST_TOPIC}
+            )
+            graph_builder.add_edge(TopicManagerRoutes.FIRST_TOPIC, TopicManagerRoutes.ATTACH_MESSAGE)
+        else:
+            graph_builder.add_edge(TopicManagerRoutes.START, entry)
+
+        # ---------------------- Routing -----------------------------------------------
+        if self.ROUTING_MODE == "fused":
+            graph_builder.add_edge(TopicManagerRoutes.FUSED_ROUTER_AGENT, TopicManagerRoutes.ATTACH_MESSAGE)
+        else:
+            graph_builder.add_conditional_edges(
+                TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT,
+                decide_topic_has_changed,
+                self._settled(TopicManagerRoutes.TOPIC_CHANGE_CHECKER_AGENT, TopicManagerRoutes.PRE_TOPICS_AGENT)
+            )
+            graph_builder.add_conditional_edges(
+                TopicManagerRoutes.PRE_TOPICS_AGENT,
+                decide_pre_topic_found,
+                self._settled(TopicManagerRoutes.PRE_TOPICS_AGENT, TopicManagerRoutes.NEW_TOPIC_AGENT)
+            )
+            graph_builder.add_conditional_edges(
+                TopicManagerRoutes.NEW_TOPIC_AGENT,
+                decide_new_topic_found,
+                self._settled(TopicManagerRoutes.NEW_TOPIC_AGENT)
+            )
+        graph_builder.add_edge(TopicManagerRoutes.ATTACH_MESSAGE, TopicManagerRoutes.END)
 
         # ---------------------- Compile -----------------------------------------------
         # Finalize the graph into a runnable pipeline.
-        self.graph = graph_builder.compile()
+        self.graph = graph_builder.compile(checkpointer=self.checkpointer)
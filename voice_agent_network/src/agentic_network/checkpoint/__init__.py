@@ -0,0 +1,21 @@
+import os
+from typing import Optional
+
+from .delta_saver import DeltaCheckpointSaver
+from .sqlite_saver import SQLiteCheckpointSaver
+from .file_saver import FileCheckpointSaver
+
+
+def create_checkpointer() -> Optional[DeltaCheckpointSaver]:
+    """
+    Checkpointer selected by CHECKPOINT_BACKEND ("sqlite", "file", or unset for none), stored
+    at CHECKPOINT_PATH. Workers pointed at the same path can resume each other's sessions.
+    """
+    backend = os.getenv("CHECKPOINT_BACKEND", "").lower()
+    if backend == "sqlite":
+        return SQLiteCheckpointSaver(os.getenv("CHECKPOINT_PATH", "checkpoints.sqlite"))
+    if backend == "file":
+        return FileCheckpointSaver(os.getenv("CHECKPOINT_PATH", "checkpoints"))
+    if backend:
+        raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
+    return None
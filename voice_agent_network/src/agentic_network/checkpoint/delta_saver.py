@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata,
+                                       CheckpointTuple, WRITES_IDX_MAP)
+
+# (type, bytes) as produced by the serializer's dumps_typed
+Typed = tuple[str, bytes]
+
+_MISSING = object()
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpoint saver that stores every channel separately and only when it changed.
+
+    A checkpoint row holds the checkpoint without its channel values; each channel value is a
+    blob keyed by (thread, namespace, channel, version), and `put` only writes the channels in
+    `new_versions`. A turn that only touched `current_message` and `all_dialog` therefore
+    writes two blobs, not the whole AgentState.
+
+    List channels that only grew since the version this process last wrote (all_dialog and
+    thoughts, through add_messages) are stored as a delta: the appended items plus the version
+    they extend. Reading a channel follows that chain back to a full value; every
+    MAX_DELTA_CHAIN deltas a full value is written again, so loads stay cheap. The deltas only
+    reference blobs, so any worker can resume a session; a worker that did not write the
+    previous version simply writes a full value.
+
+    Subclasses provide the storage (SQLiteCheckpointSaver, FileCheckpointSaver).
+    """
+
+    MAX_DELTA_CHAIN = 16
+
+    def __init__(self, *, serde=None, max_tracked_channels: int = 10_000):
+        super().__init__(serde=serde)
+        self.max_tracked_channels = max_tracked_channels
+
+        # (thread, namespace, channel) -> (version, value, delta chain length) of the last list this process wrote
+        self._last_lists: OrderedDict[tuple[str, str, str], tuple[str, list, int]] = OrderedDict()
+        self._lists_lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        row = self._read_checkpoint(thread_id, checkpoint_ns, config["configurable"].get("checkpoint_id"))
+        if row is None: return None
+        return self._to_tuple(thread_id, checkpoint_ns, *row)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        configurable = (config or {}).get("configurable", {})
+        before_id = (before or {}).get("configurable", {}).get("checkpoint_id")
+
+        for thread_id, checkpoint_ns, checkpoint_id in self._list_checkpoints(
+                configurable.get("thread_id"), configurable.get("checkpoint_ns"), before_id):
+            if configurable.get("checkpoint_id") and checkpoint_id != configurable["checkpoint_id"]: continue
+            if limit is not None and limit <= 0: break
+
+            row = self._read_checkpoint(thread_id, checkpoint_ns, checkpoint_id)
+            if row is None: continue
+            checkpoint_tuple = self._to_tuple(thread_id, checkpoint_ns, *row)
+            if filter and any(checkpoint_tuple.metadata.get(k) != v for k, v in filter.items()): continue
+
+            if limit is not None: limit -= 1
+            yield checkpoint_tuple
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        stripped = checkpoint.copy()
+        values = stripped.pop("channel_values")
+        blobs = [(channel, version, *self._dump_channel(thread_id, checkpoint_ns, channel, version, values))
+                 for channel, version in new_versions.items()]
+
+        self._write_checkpoint(thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                               self.serde.dumps_typed(stripped),
+                               self.serde.dumps_typed({**config.get("metadata", {}), **metadata}),
+                               blobs)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = [(task_id, WRITES_IDX_MAP.get(channel, idx), channel, self.serde.dumps_typed(value), task_path)
+                for idx, (channel, value) in enumerate(writes)]
+        self._write_pending(thread_id, checkpoint_ns, checkpoint_id, rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lists_lock:
+            for key in [key for key in self._last_lists if key[0] == thread_id]:
+                del self._last_lists[key]
+        self._delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        # "<counter>.<random>": increasing, and unique across workers writing the same thread
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # The storage calls are short and local, so the async API runs them on a worker thread
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield checkpoint_tuple
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # ---- Storage (implemented by the backends) -----------------------------------
+    @abstractmethod
+    def _write_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_id: Optional[str],
+                          checkpoint: Typed, metadata: Typed,
+                          blobs: list[tuple[str, str, str, bytes, Optional[str]]]) -> None:
+        """Stores a checkpoint with its new channel blobs: (channel, version, type, bytes, base version)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_pending(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                       rows: list[tuple[str, int, str, Typed, str]]) -> None:
+        """
+        Stores pending writes: (task id, index, channel, value, task path). A write already stored
+        under the same (task id, index) is kept, except for the special channels (errors,
+        interrupts ...), which have negative indexes and replace it.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _read_checkpoint(self, thread_id: str, checkpoint_ns: str,
+                         checkpoint_id: Optional[str]) -> Optional[tuple[str, Optional[str], Typed, Typed]]:
+        """Returns (checkpoint id, parent id, checkpoint, metadata), the latest one if `checkpoint_id` is None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _read_blob(self, thread_id: str, checkpoint_ns: str, channel: str,
+                   version: str) -> Optional[tuple[str, bytes, Optional[str]]]:
+        """Returns (type, bytes, base version) of one channel blob."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _read_pending(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[tuple[str, str, Typed]]:
+        """Returns the pending writes of a checkpoint as (task id, channel, value), in order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _list_checkpoints(self, thread_id: Optional[str], checkpoint_ns: Optional[str],
+                          before_id: Optional[str]) -> Iterator[tuple[str, str, str]]:
+        """Yields (thread id, namespace, checkpoint id), newest first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _delete_thread(self, thread_id: str) -> None:
+        raise NotImplementedError
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _dump_channel(self, thread_id: str, checkpoint_ns: str, channel: str, version: str,
+                      values: dict) -> tuple[str, bytes, Optional[str]]:
+        key = (thread_id, checkpoint_ns, channel)
+        if channel not in values:
+            with self._lists_lock:
+                self._last_lists.pop(key, None)
+            return "empty", b"", None
+
+        value = values[channel]
+        if not isinstance(value, list):
+            return *self.serde.dumps_typed(value), None
+
+        with self._lists_lock:
+            last = self._last_lists.get(key)
+
+        base_version, depth, tail = None, 0, value
+        if last is not None:
+            last_version, last_value, last_depth = last
+            if (last_depth < self.MAX_DELTA_CHAIN and len(last_value) <= len(value)
+                    and all(a is b or a == b for a, b in zip(last_value, value))):
+                base_version, depth, tail = last_version, last_depth + 1, value[len(last_value):]
+
+        with self._lists_lock:
+            self._last_lists[key] = (version, list(value), depth)
+            self._last_lists.move_to_end(key)
+            if len(self._last_lists) > self.max_tracked_channels:
+                self._last_lists.popitem(last=False)
+
+        return *self.serde.dumps_typed(tail), base_version
+
+    def _load_channel(self, thread_id: str, checkpoint_ns: str, channel: str, version: str):
+        """Returns the channel value, or _MISSING if it is empty or missing."""
+        chain = []
+        while version is not None:
+            blob = self._read_blob(thread_id, checkpoint_ns, channel, version)
+            if blob is None:
+                if chain: print(f"-checkpoint: delta base of {channel}@{version} is missing")
+                return _MISSING
+            type_, data, version = blob
+            if type_ == "empty": return _MISSING
+            chain.append((type_, data))
+
+        value = self.serde.loads_typed(chain[-1])
+        for delta in reversed(chain[:-1]):
+            value = value + self.serde.loads_typed(delta)
+        return value
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_id: Optional[str],
+                  checkpoint: Typed, metadata: Typed) -> CheckpointTuple:
+        checkpoint = self.serde.loads_typed(checkpoint)
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            value = self._load_channel(thread_id, checkpoint_ns, channel, version)
+            if value is not _MISSING:
+                channel_values[channel] = value
+
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed(metadata),
+            parent_config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+            if parent_id else None,
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value))
+                            for task_id, channel, value in self._read_pending(thread_id, checkpoint_ns, checkpoint_id)],
+        )
@@ -0,0 +1,152 @@
+import os
+import shutil
+import struct
+import threading
+from typing import Iterator, Optional
+from urllib.parse import quote, unquote
+
+from agentic_network.checkpoint.delta_saver import DeltaCheckpointSaver, Typed
+
+
+class FileCheckpointSaver(DeltaCheckpointSaver):
+    """
+    DeltaCheckpointSaver on a directory tree, for a shared volume without a database:
+
+        <root>/<thread>/<namespace>/checkpoints/<checkpoint id>
+        <root>/<thread>/<namespace>/blobs/<channel>/<version>
+        <root>/<thread>/<namespace>/writes/<checkpoint id>/<task id>.<index>
+
+    Every file is written to a temporary name and renamed into place, so readers in other
+    processes never see a partial record. Blobs are written before the checkpoint that uses them.
+    """
+
+    def __init__(self, root: str, *, serde=None):
+        super().__init__(serde=serde)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    # ---- Storage -----------------------------------------------------------------
+    def _write_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_id: Optional[str],
+                          checkpoint: Typed, metadata: Typed,
+                          blobs: list[tuple[str, str, str, bytes, Optional[str]]]) -> None:
+        base = self._dir(thread_id, checkpoint_ns)
+        for channel, version, type_, data, base_version in blobs:
+            path = os.path.join(base, "blobs", _name(channel), version)
+            if not os.path.exists(path):
+                _write(path, _pack(type_, data, base_version))
+        _write(os.path.join(base, "checkpoints", checkpoint_id), _pack(parent_id, *checkpoint, *metadata))
+
+    def _write_pending(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                       rows: list[tuple[str, int, str, Typed, str]]) -> None:
+        directory = os.path.join(self._dir(thread_id, checkpoint_ns), "writes", checkpoint_id)
+        for task_id, idx, channel, value, task_path in rows:
+            path = os.path.join(directory, f"{_name(task_id)}.{idx}")
+            if idx >= 0 and os.path.exists(path): continue
+            _write(path, _pack(task_id, channel, *value, task_path))
+
+    def _read_checkpoint(self, thread_id: str, checkpoint_ns: str,
+                         checkpoint_id: Optional[str]) -> Optional[tuple[str, Optional[str], Typed, Typed]]:
+        directory = os.path.join(self._dir(thread_id, checkpoint_ns), "checkpoints")
+        if checkpoint_id is None:
+            ids = _listdir(directory)
+            if not ids: return None
+            checkpoint_id = max(ids)
+
+        record = _read(os.path.join(directory, checkpoint_id))
+        if record is None: return None
+        parent_id, type_, data, metadata_type, metadata = record
+        return checkpoint_id, parent_id, (type_, data), (metadata_type, metadata)
+
+    def _read_blob(self, thread_id: str, checkpoint_ns: str, channel: str,
+                   version: str) -> Optional[tuple[str, bytes, Optional[str]]]:
+        record = _read(os.path.join(self._dir(thread_id, checkpoint_ns), "blobs", _name(channel), version))
+        return tuple(record) if record is not None else None
+
+    def _read_pending(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[tuple[str, str, Typed]]:
+        directory = os.path.join(self._dir(thread_id, checkpoint_ns), "writes", checkpoint_id)
+        pending = []
+        for name in _listdir(directory):
+            record = _read(os.path.join(directory, name))
+            if record is None: continue
+            task_id, channel, type_, value, _ = record
+            pending.append((task_id, int(name.rsplit(".", 1)[1]), channel, (type_, value)))
+
+        pending.sort(key=lambda write: write[:2])
+        return [(task_id, channel, value) for task_id, _, channel, value in pending]
+
+    def _list_checkpoints(self, thread_id: Optional[str], checkpoint_ns: Optional[str],
+                          before_id: Optional[str]) -> Iterator[tuple[str, str, str]]:
+        found = []
+        for thread in [_name(thread_id)] if thread_id is not None else _listdir(self.root):
+            namespaces = [_name(checkpoint_ns)] if checkpoint_ns is not None else _listdir(os.path.join(self.root, thread))
+            for namespace in namespaces:
+                for checkpoint_id in _listdir(os.path.join(self.root, thread, namespace, "checkpoints")):
+                    if before_id is None or checkpoint_id < before_id:
+                        found.append((_unname(thread), _unname(namespace), checkpoint_id))
+
+        found.sort(key=lambda entry: entry[2], reverse=True)
+        yield from found
+
+    def _delete_thread(self, thread_id: str) -> None:
+        shutil.rmtree(os.path.join(self.root, _name(thread_id)), ignore_errors=True)
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _dir(self, thread_id: str, checkpoint_ns: str) -> str:
+        return os.path.join(self.root, _name(thread_id), _name(checkpoint_ns))
+
+
+# ----- Helpers -----
+def _name(key: str) -> str:
+    # Namespaces contain "|" and ":", channels "branch:to:..."; "" is the root namespace,
+    # stored under a name quote() never produces
+    return quote(key, safe="") or "%root"
+
+
+def _unname(name: str) -> str:
+    return "" if name == "%root" else unquote(name)
+
+
+def _listdir(directory: str) -> list[str]:
+    try:
+        return [name for name in os.listdir(directory) if not name.endswith(".tmp")]
+    except FileNotFoundError:
+        return []
+
+
+def _pack(*fields) -> bytes:
+    """Length-prefixed fields; str and bytes round-trip as themselves, None as None."""
+    parts = []
+    for field in fields:
+        if field is None:
+            parts.append(struct.pack(">bI", 0, 0))
+            continue
+        kind, data = (1, field.encode("utf-8")) if isinstance(field, str) else (2, bytes(field))
+        parts.append(struct.pack(">bI", kind, len(data)) + data)
+    return b"".join(parts)
+
+
+def _unpack(record: bytes) -> list:
+    fields, offset = [], 0
+    while offset < len(record):
+        kind, size = struct.unpack_from(">bI", record, offset)
+        offset += 5
+        data = record[offset:offset + size]
+        offset += size
+        fields.append(None if kind == 0 else data.decode("utf-8") if kind == 1 else data)
+    return fields
+
+
+def _write(path: str, record: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(record)
+    os.replace(tmp, path)
+
+
+def _read(path: str) -> Optional[list]:
+    try:
+        with open(path, "rb") as f:
+            return _unpack(f.read())
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+from typing import Iterator, Optional
+
+from agentic_network.checkpoint.delta_saver import DeltaCheckpointSaver, Typed
+
+
+class SQLiteCheckpointSaver(DeltaCheckpointSaver):
+    """
+    DeltaCheckpointSaver on a SQLite database (WAL mode, so several worker processes on one
+    host can share the file). Checkpoints, channel blobs and pending writes are separate tables;
+    a checkpoint and its blobs are written in one transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT,
+            type TEXT,
+            checkpoint BLOB,
+            metadata_type TEXT,
+            metadata BLOB,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+        );
+        CREATE TABLE IF NOT EXISTS blobs (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            channel TEXT NOT NULL,
+            version TEXT NOT NULL,
+            type TEXT NOT NULL,
+            blob BLOB,
+            base_version TEXT,
+            PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+        );
+        CREATE TABLE IF NOT EXISTS writes (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            type TEXT,
+            value BLOB,
+            task_path TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+        );
+    """
+
+    def __init__(self, path: str, *, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    # ---- Storage -----------------------------------------------------------------
+    def _write_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_id: Optional[str],
+                          checkpoint: Typed, metadata: Typed,
+                          blobs: list[tuple[str, str, str, bytes, Optional[str]]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(thread_id, checkpoint_ns, channel, version, type_, data, base)
+                     for channel, version, type_, data, base in blobs])
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, parent_id, *checkpoint, *metadata))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _write_pending(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                       rows: list[tuple[str, int, str, Typed, str]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, *value, task_path)
+                 for task_id, idx, channel, value, task_path in rows if idx < 0])
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, *value, task_path)
+                 for task_id, idx, channel, value, task_path in rows if idx >= 0])
+
+    def _read_checkpoint(self, thread_id: str, checkpoint_ns: str,
+                         checkpoint_id: Optional[str]) -> Optional[tuple[str, Optional[str], Typed, Typed]]:
+        query = ("SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                 "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?")
+        if checkpoint_id:
+            row = self._fetchone(query + " AND checkpoint_id = ?", (thread_id, checkpoint_ns, checkpoint_id))
+        else:
+            row = self._fetchone(query + " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns))
+        if row is None: return None
+        return row[0], row[1], (row[2], row[3]), (row[4], row[5])
+
+    def _read_blob(self, thread_id: str, checkpoint_ns: str, channel: str,
+                   version: str) -> Optional[tuple[str, bytes, Optional[str]]]:
+        return self._fetchone(
+            "SELECT type, blob, base_version FROM blobs "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            (thread_id, checkpoint_ns, channel, version))
+
+    def _read_pending(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[tuple[str, str, Typed]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, channel, type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        return [(task_id, channel, (type_, value)) for task_id, channel, type_, value in rows]
+
+    def _list_checkpoints(self, thread_id: Optional[str], checkpoint_ns: Optional[str],
+                          before_id: Optional[str]) -> Iterator[tuple[str, str, str]]:
+        conditions, params = [], []
+        if thread_id is not None:
+            conditions.append("thread_id = ?"); params.append(thread_id)
+        if checkpoint_ns is not None:
+            conditions.append("checkpoint_ns = ?"); params.append(checkpoint_ns)
+        if before_id is not None:
+            conditions.append("checkpoint_id < ?"); params.append(before_id)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params).fetchall()
+        yield from rows
+
+    def _delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _fetchone(self, query: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()
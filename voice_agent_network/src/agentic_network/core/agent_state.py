@@ -1,12 +1,30 @@
-from typing import Annotated, TypedDict
+from typing import Annotated, Optional, TypedDict, NotRequired
 from langchain_core.messages import AnyMessage, HumanMessage
 from langgraph.graph.message import add_messages
 
 
+class TopicSummary(TypedDict):
+    text: str
+    message_count: int  # number of the topic's first messages the summary stands for
+
+
 class Topic(TypedDict):
     id: str
     agent: str
     appointment_data: dict
+    # Written by the DialogSummarizer once the topic's history outgrows its token budget
+    summary: NotRequired[TopicSummary]
+
+
+def merge_topic_index(left: dict[str, list[int]], right: dict[str, list[int]]) -> dict[str, list[int]]:
+    """Reducer for `topic_index`: appends the new offsets of each topic (offsets only ever grow)."""
+    merged = {topic_id: list(offsets) for topic_id, offsets in (left or {}).items()}
+    for topic_id, offsets in (right or {}).items():
+        known = merged.setdefault(topic_id, [])
+        for offset in offsets:
+            if not known or offset > known[-1]:
+                known.append(offset)
+    return merged
 
 
 class AgentState(TypedDict):
@@ -15,3 +33,7 @@ class AgentState(TypedDict):
     thoughts: Annotated[list[AnyMessage], add_messages]
     topic_stack: list[Topic]
     disclosed_topics: list[Topic]
+    # topic_id -> offsets of the topic's messages in all_dialog (maintained by add_message_to_dialogue)
+    topic_index: Annotated[dict[str, list[int]], merge_topic_index]
+    # Topic whose agent was started speculatively this turn (speculative mode only, see SpeculativeExecutor)
+    speculative_topic: NotRequired[Optional[str]]
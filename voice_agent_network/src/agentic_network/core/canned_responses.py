@@ -0,0 +1,61 @@
+from typing import Optional
+
+from agentic_network.core.intent_classifier import normalize
+
+
+class CannedResponses:
+    """
+    Fixed replies for messages that are nothing but a greeting, thanks or goodbye.
+
+    A message matches when every one of its (folded) words belongs to one category's
+    vocabulary or to FILLER ("merhaba", "selam hocam", "çok teşekkürler"); anything with
+    content beyond that goes to the model. Replies are keyed by the message's folded words,
+    so repeated greetings cost a dictionary lookup.
+    """
+
+    CATEGORIES: dict[str, tuple[set[str], str]] = {
+        "greeting": ({"merhaba", "merhabalar", "selam", "selamlar", "slm", "mrb", "gunaydin", "hello", "hi",
+                      "nasilsin", "nasilsiniz", "naber", "nbr"},
+                     "Merhaba! Ben hastane asistanınızım. Şikayetlerinizi dinleyebilir ya da randevu almanıza "
+                     "yardımcı olabilirim. Nasıl yardımcı olabilirim?"),
+        "thanks": ({"tesekkur", "tesekkurler", "tesekkurederim", "ederim", "sag", "ol", "olun", "sagol", "sagolun",
+                    "eyvallah", "thanks", "thank", "you"},
+                   "Rica ederim! Başka bir konuda yardımcı olabileceğim bir şey var mı?"),
+        "goodbye": ({"hosca", "kal", "kalin", "gorusuruz", "gorusmek", "uzere", "bye"},
+                    "Geçmiş olsun, sağlıklı günler dilerim! İhtiyacınız olursa yine buradayım."),
+    }
+
+    # Words that may accompany any category without changing it
+    FILLER = {"cok", "size", "sana", "hocam", "efendim", "de", "da", "ve", "tekrar", "hepinize", "oncelikle"}
+
+    def __init__(self, max_cached: int = 4096):
+        self.max_cached = max_cached
+        # folded words -> reply (None for messages that need the model)
+        self._cache: dict[tuple[str, ...], Optional[str]] = {}
+
+    # ---- Public API --------------------------------------------------------------
+    def lookup(self, text: str) -> Optional[str]:
+        """Returns the canned reply for `text`, or None if the message needs the model."""
+        words = tuple(normalize(text))
+        if words in self._cache:
+            return self._cache[words]
+
+        reply = self._match(words)
+        if len(self._cache) >= self.max_cached:
+            self._cache.clear()
+        self._cache[words] = reply
+        return reply
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _match(self, words: tuple[str, ...]) -> Optional[str]:
+        content = [word for word in words if word not in self.FILLER]
+        if not content or len(words) > 6: return None
+
+        # "iyi günler" is left to the model: it opens calls as often as it closes them
+        for vocabulary, reply in self.CATEGORIES.values():
+            if all(word in vocabulary for word in content):
+                return reply
+        return None
+
+
+cannedResponses = CannedResponses()
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+from langchain_core.messages import AnyMessage
+
+
+class DialogRenderer:
+    """
+    Append-only rendering of dialogs into prompt text.
+
+    Each message's rendered line is cached by (format, message id), and the joined text of a
+    dialog is kept as a running buffer keyed by (format, id of its first message). Dialogs only
+    ever grow at the end (all_dialog and the per-topic views of it), so rendering one again only
+    formats and appends the messages added since the last call.
+
+    A message replaced under the same id (ToolParser does that for the last message) is
+    detected by comparing its content, and its line or the buffer ending in it is rebuilt.
+    """
+
+    def __init__(self, max_lines: int = 50_000, max_buffers: int = 5_000):
+        self.max_lines = max_lines
+        self.max_buffers = max_buffers
+
+        # (format, message id) -> (content, rendered line)
+        self._lines: OrderedDict[tuple[str, str], tuple[object, object]] = OrderedDict()
+        # (format, first message id) -> (message count, last message id, last content, joined text)
+        self._buffers: OrderedDict[tuple[str, str], tuple[int, str, object, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    def render_line(self, fmt: str, message: AnyMessage, render: Callable[[AnyMessage], object]):
+        """Returns `render(message)`, computed once per message id and content."""
+        if message.id is None: return render(message)
+
+        key = (fmt, message.id)
+        with self._lock:
+            cached = self._lines.get(key)
+            if cached is not None and (cached[0] is message.content or cached[0] == message.content):
+                self._lines.move_to_end(key)
+                return cached[1]
+
+        line = render(message)
+        with self._lock:
+            self._lines[key] = (message.content, line)
+            if len(self._lines) > self.max_lines:
+                self._lines.popitem(last=False)
+        return line
+
+    def render(self, fmt: str, messages: Sequence[AnyMessage], render: Callable[[AnyMessage], str]) -> str:
+        """Returns the lines of `messages` joined with newlines, appending to the cached buffer when possible."""
+        messages = list(messages)
+        if not messages or messages[0].id is None:
+            return "\n".join(self.render_line(fmt, m, render) for m in messages)
+
+        key = (fmt, messages[0].id)
+        with self._lock:
+            buffer = self._buffers.get(key)
+
+        text, start = "", 0
+        if buffer is not None:
+            count, last_id, last_content, joined = buffer
+            if count <= len(messages):
+                last = messages[count - 1]
+                if last.id == last_id and (last.content is last_content or last.content == last_content):
+                    text, start = joined, count
+
+        new_lines = [self.render_line(fmt, m, render) for m in messages[start:]]
+        if new_lines:
+            text = "\n".join([text, *new_lines]) if start else "\n".join(new_lines)
+
+        if messages[-1].id is None: return text
+
+        with self._lock:
+            self._buffers[key] = (len(messages), messages[-1].id, messages[-1].content, text)
+            self._buffers.move_to_end(key)
+            if len(self._buffers) > self.max_buffers:
+                self._buffers.popitem(last=False)
+        return text
+
+
+dialogRenderer = DialogRenderer()
@@ -0,0 +1,106 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from langchain_core.messages import HumanMessage
+
+from agentic_network.core import AgentState
+from agentic_network.core.agent_state import Topic, TopicSummary
+from agentic_network.core.topic_manager_util import get_messages_for_topic, format_dialog, estimate_tokens
+from llm.core.llm_singletons import llmSingleton
+
+
+class DialogSummarizer:
+    """
+    Keeps the prompt size of long topics flat by compacting their older turns into a summary.
+
+    After every turn `maybe_summarize` checks the current topic: once the messages that are not
+    summarized yet, minus the last `keep_last` ones, exceed `token_budget`, a job on a single
+    background thread folds them (and the previous summary) into a new summary and stores it on
+    the Topic entry. The turn itself never waits for it; agents read the compacted history
+    through `get_compacted_messages_for_current_topic`.
+    """
+
+    SYSTEM_PROMPT = ("Aşağıdaki hasta-asistan konuşmasını, sonraki yanıtlar için gereken tüm tıbbi "
+                     "detayları (şikayetler, belirtiler, süreleri, ilaçlar, alerjiler) ve randevu "
+                     "bilgilerini (klinik, doktor, tarih, saat) koruyarak kısa ve maddeler halinde özetle. "
+                     "Yeni bilgi ekleme.")
+
+    def __init__(self, token_budget: int = 1500, keep_last: int = 6):
+        self.token_budget = token_budget
+        # At least the latest message stays verbatim, so the cut is always a message of the topic
+        self.keep_last = max(1, keep_last)
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        # ids of the topics with a summary job queued or running
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    def maybe_summarize(self, agent_state: AgentState,
+                        on_summary: Optional[Callable[[str, TopicSummary], None]] = None) -> bool:
+        """
+        Queues a summary of the current topic if it is over budget; returns True if a job was queued.
+        The summary is set on the topic in `agent_state`, and passed to `on_summary(topic id, summary)`
+        for states that live elsewhere too (a checkpoint).
+        """
+        if not agent_state.get("topic_stack"): return False
+
+        topic = agent_state["topic_stack"][-1]
+        messages = get_messages_for_topic(agent_state, topic["id"])
+        summary = topic.get("summary")
+        covered = summary["message_count"] if summary else 0
+
+        cut = self._cut_point(messages, covered)
+        if cut is None: return False
+        if estimate_tokens(format_dialog(messages[covered:cut])) <= self.token_budget: return False
+
+        with self._lock:
+            if topic["id"] in self._pending: return False
+            self._pending.add(topic["id"])
+
+        self._pool.submit(self._summarize, topic, messages[:cut], summary, on_summary)
+        return True
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _cut_point(self, messages: list, covered: int):
+        """
+        The summary ends right before a user message, so the verbatim history that follows it
+        still starts with a user turn (Gemma's chat template requires user/assistant alternation).
+        """
+        for cut in range(len(messages) - self.keep_last, covered, -1):
+            if isinstance(messages[cut], HumanMessage):
+                return cut
+        return None
+
+    def _summarize(self, topic: Topic, messages: list, previous: TopicSummary,
+                   on_summary: Optional[Callable[[str, TopicSummary], None]]) -> None:
+        try:
+            covered = previous["message_count"] if previous else 0
+            dialog = format_dialog(messages[covered:])
+            if previous:
+                dialog = f"Önceki özet:\n{previous['text']}\n\nDevamı:\n{dialog}"
+
+            prompt = [
+                {"role": "system", "content": [{"type": "text", "text": self.SYSTEM_PROMPT}]},
+                {"role": "user", "content": [{"type": "text", "text": dialog}]},
+            ]
+            text = llmSingleton.gemma_3_1b_it.give_prompt(prompt).strip()
+
+            # A single assignment, so readers never see a summary with the wrong message count
+            topic["summary"] = TopicSummary(text=text, message_count=len(messages))
+            if on_summary is not None:
+                on_summary(topic["id"], topic["summary"])
+            print(f"-summarizer: topic {topic['id']} compacted to {len(messages)} messages in summary")
+
+        except Exception as e:
+            print(f"-summarizer: summarizing topic {topic['id']} failed: {e}")
+
+        finally:
+            with self._lock:
+                self._pending.discard(topic["id"])
+
+
+dialogSummarizer = DialogSummarizer(token_budget=int(os.getenv("SUMMARY_TOKEN_BUDGET", "1500")),
+                                    keep_last=int(os.getenv("SUMMARY_KEEP_LAST", "6")))
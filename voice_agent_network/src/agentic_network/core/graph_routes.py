@@ -7,6 +7,7 @@ class GraphRoutes(StrEnum):
     END = END
 
     TOOLS = auto()
+    SPECULATE = auto()
 
     TOPIC_MANAGER_AGENT = auto()
     DIAGNOSIS_AGENT = auto()
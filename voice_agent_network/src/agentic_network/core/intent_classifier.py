@@ -1 +1,121 @@
 # Intent classification logic
+import re
+from typing import NamedTuple, Optional
+
+from agentic_network.core.graph_routes import GraphRoutes
+
+
+# Turkish-aware folding: ASR output is inconsistent about diacritics, so "ağrı" == "agri"
+_TR_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> list[str]:
+    """Lowercases with Turkish casing rules, folds diacritics and splits into words."""
+    text = text.replace("İ", "i").replace("I", "ı").lower().translate(_TR_FOLD)
+    return _WORD.findall(text)
+
+
+class IntentPrediction(NamedTuple):
+    route: Optional[GraphRoutes]  # best cluster agent, None if nothing matched
+    confidence: float  # 0..1, share of the evidence that points at `route`
+    is_acknowledgment: bool  # the message is only "evet", "tamam", "olur" ...
+    has_change_cue: bool  # "başka", "ayrıca", "bir de" ... announce a new subject
+
+
+class IntentClassifier:
+    """
+    Keyword index over Turkish medical / appointment / small-talk vocabulary.
+
+    Every entry is a folded word stem (matched as a prefix, since Turkish words carry their
+    suffixes: "randevumu", "ağrıyor"), a whole word marked with a trailing "$" (forms whose stem
+    would also match unrelated words once folded: "sızı" is "sizi", as in "sizi aradım") or a
+    multi-word phrase, with an idf-like weight: words that only ever mean one intent weigh more
+    than ambiguous ones. A message is scored per cluster agent and the confidence is the winner's
+    share of the total evidence, smoothed so that a single weak hit is never confident.
+    Classifying a turn takes microseconds.
+    """
+
+    VOCABULARY: dict[GraphRoutes, dict[str, float]] = {
+        GraphRoutes.APPOINTMENT_AGENT: {
+            "randevu": 2.0, "rezervasyon": 2.0, "iptal": 2.0, "ertele": 2.0, "poliklinik": 2.0,
+            "klinik": 1.5, "hastane": 1.0, "doktor": 1.0, "hekim": 1.0, "muayene": 1.0,
+            "sevk": 1.5, "recete": 1.0, "musait": 1.5, "uygun": 1.0, "bos": 1.0, "sira": 1.0,
+            "saat": 1.0, "tarih": 1.0, "yarin": 1.0, "bugun": 0.5, "haftaya": 1.0,
+            "pazartesi": 1.0, "sali": 1.0, "carsamba": 1.0, "persembe": 1.0, "cuma": 1.0,
+            "cumartesi": 1.0, "pazar": 1.0, "sabah": 0.5, "ogleden": 1.0, "aksam": 0.5,
+            "appointment": 2.0, "book": 1.5, "reschedule": 2.0, "cancel": 2.0,
+        },
+        GraphRoutes.DIAGNOSIS_AGENT: {
+            "agri": 2.0, "bir sizi": 2.0, "sizim$": 2.0, "sizisi$": 2.0, "sizla": 2.0, "sizli": 2.0,
+            "ates": 2.0, "oksur": 2.0, "bulanti": 2.0, "kusm": 1.5, "kust": 1.5,
+            "ishal": 2.0, "kabiz": 2.0, "bas donme": 2.0, "basim": 1.5, "bogaz": 1.5,
+            "mide": 1.5, "karin": 1.5, "gogus": 1.5, "sirt": 1.0, "eklem": 1.5,
+            "kasin": 2.0, "dokuntu": 2.0, "kizar": 1.5, "sismis": 1.5, "sisti": 1.5, "sisl": 1.5,
+            "sisk": 1.5, "yara": 1.5, "kanam": 2.0,
+            "nefes": 1.5, "tansiyon": 2.0, "seker": 1.0, "halsiz": 2.0, "yorgun": 1.5,
+            "uyku": 1.0, "grip": 2.0, "nezle": 2.0, "burnum": 1.5, "belirti": 2.0, "sikayet": 1.5,
+            "semptom": 2.0, "ilac": 1.5, "yan etki": 2.0, "tahlil": 1.0,
+            "pain": 2.0, "fever": 2.0, "cough": 2.0, "symptom": 2.0, "headache": 2.0,
+        },
+        GraphRoutes.SMALL_TALK_AGENT: {
+            "merhaba": 2.0, "selam": 2.0, "gunaydin": 2.0, "iyi aksamlar": 2.0, "iyi gunler": 1.5,
+            "nasilsin": 2.0, "naber": 2.0, "tesekkur": 2.0, "sag ol": 2.0, "sagol": 2.0,
+            "eyvallah": 2.0, "hosca kal": 2.0, "gorusuruz": 2.0, "kimsin": 2.0, "adin ne": 2.0,
+            "hello": 2.0, "thanks": 2.0, "thank you": 2.0,
+        },
+    }
+
+    ACKNOWLEDGMENTS = {"evet", "hayir", "tamam", "olur", "peki", "anladim", "tabi", "tabii", "aynen",
+                       "yok", "dogru", "oldu", "tamamdir", "ok", "okay", "yes", "no"}
+
+    # Whole words (or phrases), so that "yeniden" is not the cue "yeni"
+    CHANGE_CUES = ("baska", "ayrica", "bir de", "yeni", "farkli", "diger", "onun disinda", "another")
+
+    SMOOTHING = 0.5
+
+    def __init__(self, vocabulary: dict[GraphRoutes, dict[str, float]] = None):
+        vocabulary = vocabulary or self.VOCABULARY
+        self._change_cues = re.compile(r"\b(?:" + "|".join(map(re.escape, self.CHANGE_CUES)) + r")\b")
+
+        # Single-word stems are indexed by their first two letters so each word checks only a few stems
+        self._stems: dict[str, list[tuple[str, GraphRoutes, float]]] = {}
+        self._phrases: list[tuple[str, GraphRoutes, float]] = []
+        self._words: dict[str, list[tuple[GraphRoutes, float]]] = {}
+        for route, entries in vocabulary.items():
+            for entry, weight in entries.items():
+                if " " in entry:
+                    self._phrases.append((entry, route, weight))
+                elif entry.endswith("$"):
+                    self._words.setdefault(entry[:-1], []).append((route, weight))
+                else:
+                    self._stems.setdefault(entry[:2], []).append((entry, route, weight))
+
+    # ---- Public API --------------------------------------------------------------
+    def classify(self, text: str) -> IntentPrediction:
+        words = normalize(text)
+        joined = " ".join(words)
+
+        scores: dict[GraphRoutes, float] = {}
+        for word in words:
+            for stem, route, weight in self._stems.get(word[:2], ()):
+                if word.startswith(stem):
+                    scores[route] = scores.get(route, 0.0) + weight
+            for route, weight in self._words.get(word, ()):
+                scores[route] = scores.get(route, 0.0) + weight
+        for phrase, route, weight in self._phrases:
+            if phrase in joined:
+                scores[route] = scores.get(route, 0.0) + weight
+
+        is_acknowledgment = bool(words) and len(words) <= 4 and all(word in self.ACKNOWLEDGMENTS for word in words)
+        has_change_cue = self._change_cues.search(joined) is not None
+
+        if not scores:
+            return IntentPrediction(None, 0.0, is_acknowledgment, has_change_cue)
+
+        route = max(scores, key=scores.get)
+        confidence = scores[route] / (sum(scores.values()) + self.SMOOTHING)
+        return IntentPrediction(route, confidence, is_acknowledgment, has_change_cue)
+
+
+intentClassifier = IntentClassifier()
@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Union
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from agentic_network.core import AgentState, GraphRoutes
+from agentic_network.core.agent_state import merge_topic_index
+from agentic_network.core.topic_manager_util import add_message_to_dialogue, get_current_topic
+
+if TYPE_CHECKING:
+    from agentic_network.agents import ClusterAgent
+
+
+class _Speculation(NamedTuple):
+    route: GraphRoutes
+    dialog_length: int  # length of all_dialog once the user's message is attached
+    topic: dict  # the copy of the current topic the agent ran on
+    future: Future  # of (patch, finished_at)
+    started_at: float
+
+
+class SpeculativeExecutor:
+    """
+    Runs the current topic's cluster agent while the Topic Manager is still routing the turn.
+
+    Most turns continue the current topic, so at the start of a turn (`start`, the SPECULATE
+    node) the agent of the current topic is run on a thread against the state the Topic
+    Manager would produce for "same topic": the user's message attached to the current topic.
+    When routing ends, the wrapped router (`route`) discards the speculation if the turn went
+    elsewhere, and the wrapped agent node (`node`) commits its result if the topic and the
+    dialog are exactly the predicted ones, or runs the agent as usual otherwise.
+
+    Only agents that are safe to run and throw away are speculated (ClusterAgent.SPECULATIVE):
+    the appointment agent books and cancels through its tools and the diagnosis agent writes
+    its report, so they never are.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculation")
+        # topic id -> speculation started for it this turn
+        self._pending: dict[str, _Speculation] = {}
+        self._lock = threading.Lock()
+        self._stats = dict(started=0, hits=0, misses=0, failed=0, saved_seconds=0.0, wasted_seconds=0.0)
+
+    # ---- Public API --------------------------------------------------------------
+    def start(self, agent_state: AgentState, agents: dict[GraphRoutes, Callable[[AgentState], dict]]) -> dict:
+        """SPECULATE node: starts the current topic's agent if it is one of `agents`."""
+        topic = get_current_topic(agent_state) if agent_state.get("topic_stack") else None
+        if topic is None or topic["agent"] not in agents:
+            return {"speculative_topic": None}
+
+        route = GraphRoutes(topic["agent"])
+        predicted, topic_copy = self._predict(agent_state, topic)
+        speculation = _Speculation(route, len(predicted["all_dialog"]), topic_copy,
+                                   self._pool.submit(self._run, agents[route], predicted), time.perf_counter())
+
+        with self._lock:
+            self._pending[topic["id"]] = speculation
+            self._stats["started"] += 1
+        print(f"-speculation: started {route} for topic {topic['id']}")
+        return {"speculative_topic": topic["id"]}
+
+    def route(self, router: Callable[[AgentState], GraphRoutes]) -> Callable[[AgentState], GraphRoutes]:
+        """Wraps the cluster router so that a speculation for a route not taken is discarded."""
+        def speculative_router(agent_state: AgentState) -> GraphRoutes:
+            decision = router(agent_state)
+            topic_id = agent_state.get("speculative_topic")
+            with self._lock:
+                speculation = self._pending.get(topic_id) if topic_id else None
+            if speculation is not None and (decision != speculation.route or get_current_topic(agent_state)["id"] != topic_id):
+                self._discard(topic_id, f"routed to {decision}")
+            return decision
+        return speculative_router
+
+    def node(self, route: GraphRoutes, agent: "ClusterAgent") -> RunnableLambda:
+        """
+        Wraps a cluster agent so that it commits a matching speculation instead of running again.
+        Under graph.ainvoke the wait for the speculation and the fallback run are awaited.
+        """
+        def speculative_node(agent_state: AgentState) -> dict:
+            speculation = self._claim(agent_state, route)
+            if speculation is not None:
+                routed_at = time.perf_counter()
+                try:
+                    result = speculation.future.result()
+                except Exception as e:
+                    result = e
+                patch = self._commit(agent_state, speculation, routed_at, result)
+                if patch is not None: return patch
+            return agent(agent_state)
+
+        async def aspeculative_node(agent_state: AgentState) -> dict:
+            speculation = self._claim(agent_state, route)
+            if speculation is not None:
+                routed_at = time.perf_counter()
+                try:
+                    result = await asyncio.wrap_future(speculation.future)
+                except Exception as e:
+                    result = e
+                patch = self._commit(agent_state, speculation, routed_at, result)
+                if patch is not None: return patch
+            return await agent.acall(agent_state)
+
+        return RunnableLambda(speculative_node, afunc=aspeculative_node, name=route)
+
+    def abandon(self, topic_id: str) -> None:
+        """Drops the speculation started for `topic_id`, if still pending (its turn failed)."""
+        self._discard(topic_id, "turn failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            resolved = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "saved_seconds": round(self._stats["saved_seconds"], 3),
+                "wasted_seconds": round(self._stats["wasted_seconds"], 3),
+                "hit_rate": round(self._stats["hits"] / resolved, 3) if resolved else 0.0,
+                "pending": len(self._pending),
+            }
+
+    # ---- Internal Methods --------------------------------------------------------
+    @staticmethod
+    def _predict(agent_state: AgentState, topic: dict) -> tuple[dict, dict]:
+        """The state after a "same topic" routing, with its own copy of the current topic."""
+        attach = add_message_to_dialogue(agent_state, HumanMessage(agent_state["current_message"]))
+        topic_copy = dict(topic)
+        predicted = {
+            **agent_state,
+            "all_dialog": list(agent_state["all_dialog"]) + attach["all_dialog"],
+            "topic_index": merge_topic_index(agent_state.get("topic_index"), attach["topic_index"]),
+            "topic_stack": agent_state["topic_stack"][:-1] + [topic_copy],
+        }
+        return predicted, topic_copy
+
+    def _claim(self, agent_state: AgentState, route: GraphRoutes) -> Optional[_Speculation]:
+        """Takes the turn's speculation if the routed state is exactly the predicted one."""
+        topic_id = agent_state.get("speculative_topic")
+        if not topic_id: return None
+        with self._lock:
+            speculation = self._pending.pop(topic_id, None)
+        if speculation is None: return None
+
+        topic = get_current_topic(agent_state)
+        dialog = agent_state["all_dialog"]
+        last = dialog[-1] if dialog else None
+        if (route != speculation.route or topic["id"] != topic_id or len(dialog) != speculation.dialog_length
+                or not isinstance(last, HumanMessage) or last.content != agent_state["current_message"]):
+            speculation.future.cancel()
+            self._record_miss(speculation, "state differs from the prediction")
+            return None
+        return speculation
+
+    def _commit(self, agent_state: AgentState, speculation: _Speculation, routed_at: float,
+                result: Union[tuple[dict, float], Exception]) -> Optional[dict]:
+        """The claimed speculation's patch, or None if the speculative run failed (`result` is its error)."""
+        if isinstance(result, Exception):
+            with self._lock:
+                self._stats["failed"] += 1
+            print(f"-speculation: {speculation.route} failed ({result}), running it again")
+            return None
+
+        patch, finished_at = result
+
+        # The agent's run time that overlapped with routing
+        saved = min(finished_at, routed_at) - speculation.started_at
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["saved_seconds"] += saved
+        print(f"-speculation: hit on {speculation.route}, saved {saved * 1000:.0f} ms (hit rate {self.stats()['hit_rate']:.0%})")
+
+        # Changes the agent made to its copy of the topic (e.g. a redirect) are carried over
+        if speculation.topic != get_current_topic(agent_state):
+            patch = {**patch, "topic_stack": agent_state["topic_stack"][:-1] + [speculation.topic]}
+        return patch
+
+    def _discard(self, topic_id: str, reason: str) -> None:
+        with self._lock:
+            speculation = self._pending.pop(topic_id, None)
+        if speculation is not None:
+            speculation.future.cancel()
+            self._record_miss(speculation, reason)
+
+    def _record_miss(self, speculation: _Speculation, reason: str) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["wasted_seconds"] += time.perf_counter() - speculation.started_at
+        print(f"-speculation: miss on {speculation.route} ({reason})")
+
+    @staticmethod
+    def _run(agent: Callable[[AgentState], dict], agent_state: AgentState) -> tuple[dict, float]:
+        return agent(agent_state), time.perf_counter()
+
@@ -4,6 +4,7 @@ from uuid import uuid4
 from agentic_network.core import AgentState
 from agentic_network.core import GraphRoutes
 from agentic_network.core.agent_state import Topic
+from agentic_network.core.dialog_renderer import dialogRenderer
 from langchain_core.messages import AnyMessage, HumanMessage, AIMessage, SystemMessage
 
 
@@ -12,6 +13,10 @@ def _new_id() -> str:
     return str(uuid4())
 
 
+def _topic_of(msg: AnyMessage) -> str | None:
+    return (getattr(msg, "metadata", {}) or {}).get("topic_id")
+
+
 # ----- API -----
 def find_topic_index(topics: list[Topic], topic_id: str) -> int:
     for i, topic in enumerate(topics):
@@ -116,21 +121,37 @@ def add_topic_id_to_message(msg: AnyMessage, topic_id: str | None) -> AnyMessage
 
 
 def add_message_to_dialogue(state: AgentState, message: AnyMessage) -> dict:
+    return add_messages_to_dialogue(state, [message])
+
+
+def add_messages_to_dialogue(state: AgentState, messages: list[AnyMessage]) -> dict:
+    """Like add_message_to_dialogue, for several messages appended to the current topic in order."""
     stack = state.get("topic_stack") or []
     topic_id = stack[-1]["id"] if stack else None
 
     if topic_id is None:
         raise RuntimeError("Topic Stack is somehow empty.")
 
-    msg = add_topic_id_to_message(message, topic_id)
-    return {"all_dialog": [msg]}
+    # add_messages appends the new messages, so they land at the current end of all_dialog
+    offset = len(state.get("all_dialog") or [])
+    return {"all_dialog": [add_topic_id_to_message(m, topic_id) for m in messages],
+            "topic_index": {topic_id: list(range(offset, offset + len(messages)))}}
 
 
 def get_messages_for_topic(state: AgentState, topic_id: str) -> list[AnyMessage]:
-    return [
-        m for m in state.get("all_dialog", [])
-        if (getattr(m, "metadata", {}) or {}).get("topic_id") == topic_id
-    ]
+    """
+    Returns the topic's messages in dialog order, in O(k) for a topic with k messages.
+    States without a `topic_index` (or with one that no longer matches all_dialog) are scanned.
+    """
+    dialog = state.get("all_dialog", [])
+    index = state.get("topic_index")
+
+    if index is not None:
+        offsets = index.get(topic_id, [])
+        if all(offset < len(dialog) and _topic_of(dialog[offset]) == topic_id for offset in offsets):
+            return [dialog[offset] for offset in offsets]
+
+    return [m for m in dialog if _topic_of(m) == topic_id]
 
 
 def get_messages_for_current_topic(state: AgentState) -> list[AnyMessage]:
@@ -143,6 +164,40 @@ def get_messages_for_current_topic(state: AgentState) -> list[AnyMessage]:
     return get_messages_for_topic(state, topic_id)
 
 
+def get_compacted_messages_for_current_topic(state: AgentState) -> list[AnyMessage]:
+    """
+    Like get_messages_for_current_topic, but the messages the DialogSummarizer already folded into
+    the topic's summary are left out and the summary is prepended to the first remaining user turn,
+    so the prompt stays bounded while the user/assistant alternation is kept.
+    """
+    topic = get_current_topic(state)
+    if topic is None:
+        raise RuntimeError("Topic Stack is somehow empty.")
+
+    return get_compacted_messages_for_topic(state, topic)
+
+
+def get_compacted_messages_for_topic(state: AgentState, topic: Topic) -> list[AnyMessage]:
+    """get_compacted_messages_for_current_topic for any topic, e.g. the earlier ones the routers list."""
+    messages = get_messages_for_topic(state, topic["id"])
+    summary = topic.get("summary")
+    if not summary or summary["message_count"] >= len(messages): return messages
+
+    rest = messages[summary["message_count"]:]
+    first = rest[0]
+    # A fresh id, so the renderer does not mistake the merged copy for the original message
+    merged = first.model_copy(update={
+        "id": None,
+        "content": f"[Önceki konuşmanın özeti]\n{summary['text']}\n\n{_content_str(first)}",
+    })
+    return [merged, *rest[1:]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgets."""
+    return len(text) // 4
+
+
 def _role_of(msg: AnyMessage) -> str:
     # "human" -> "user" for friendlier logs
     t = getattr(msg, "type", "") or msg.__class__.__name__.lower()
@@ -163,18 +218,24 @@ def _content_str(msg: AnyMessage) -> str:
         return "\n".join(parts)
     return str(c)
 
+def _line_with_topic(m: AnyMessage) -> str:
+    topic_id = _topic_of(m)
+    topic_tag = f"[topic:{topic_id}] " if topic_id else ""
+    return f"{topic_tag}{_role_of(m)}: {_content_str(m)}"
+
+
+def _line(m: AnyMessage) -> str:
+    return f"{_role_of(m)}: {_content_str(m)}"
+
+
 def format_dialog_with_topics(messages: Iterable[AnyMessage]) -> str:
     """Format messages as lines that include [topic:<id>] when present."""
-    lines = []
-    for m in messages:
-        topic_id = (getattr(m, "metadata", {}) or {}).get("topic_id")
-        topic_tag = f"[topic:{topic_id}] " if topic_id else ""
-        lines.append(f"{topic_tag}{_role_of(m)}: {_content_str(m)}")
-    return "\n".join(lines)
+    return dialogRenderer.render("topics", messages, _line_with_topic)
 
 
 def format_dialog_to_json(messages: Iterable[AnyMessage]) -> list:
-    return [format_message_to_json(message) for message in messages]
+    # The dicts are cached per message; treat them as read-only
+    return [dialogRenderer.render_line("json", message, format_message_to_json) for message in messages]
 
 
 def format_message_to_json(message: AnyMessage) -> dict:
@@ -183,7 +244,7 @@ def format_message_to_json(message: AnyMessage) -> dict:
 
 def format_dialog(messages: Iterable[AnyMessage]) -> str:
     """Format messages as lines without topic IDs."""
-    return "\n".join(f"{_role_of(m)}: {_content_str(m)}" for m in messages)
+    return dialogRenderer.render("plain", messages, _line)
 
 
 def redirect_to_appointment_agent(agent_state: AgentState):
@@ -1,3 +1,3 @@
-from tools_condition import decide_tools
-from cluster_agent_condition import decide_cluster_agent
-from topic_manager_condition import decide_topic_manager
+from .tools_condition import decide_tools
+from .cluster_agent_condition import decide_cluster_agent
+from .topic_manager_condition import decide_topic_manager
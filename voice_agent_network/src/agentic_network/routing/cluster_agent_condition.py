@@ -26,11 +26,11 @@ def decide_cluster_agent(agent_state: AgentState) -> GraphRoutes:
 
     elif cluster_agent == GraphRoutes.SMALL_TALK_AGENT:
         print("Decision: Call Small Talk Agent.")
-        return GraphRoutes.DIAGNOSIS_AGENT
+        return GraphRoutes.SMALL_TALK_AGENT
 
     elif cluster_agent == GraphRoutes.OUT_OF_TOPIC_AGENT:
         print("Decision: Call Out Of Topic Agent.")
-        return GraphRoutes.DIAGNOSIS_AGENT
+        return GraphRoutes.OUT_OF_TOPIC_AGENT
 
     else:
         # TODO: We can make the Topic Manager Agent roll back to itself if it fails to call other agents
@@ -1,91 +1,316 @@
 import io
 import os
+import asyncio
 import numpy as np
-import librosa
 from scipy.io.wavfile import write as write_wav
 from pathlib import Path
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
 from faster_whisper import WhisperModel
-from src.llm.core.devices import Device
-from TTS.api import TTS
+from langchain_core.messages import AIMessage, HumanMessage
+from llm.core.devices import Device
+from llm.core.http_pool import httpPool
+from llm.core.llm_singletons import llmSingleton
+from llm.core.prompt_builder import promptBuilder
+from tts.synthesizer import CoquiTRTTS
+from tts.utils import streaming_wav_header, float_to_pcm16
+from stt.stream_stt import StreamSTT
 
+from agentic_network.agent_graph import AgentGraph
+from agentic_network.checkpoint import create_checkpointer
+from agentic_network.core import AgentState
+from session_store import SessionStore
+from audio_ingest import load_audio, decode_stats
+from stage_executor import StageExecutor, StageSaturatedError, StageSlot
+
+
+TTS_DIR = Path(__file__).resolve().parent.parent / "tts"
+REFERENCE_AUDIO_PATH = str(TTS_DIR / "ref_tr.wav")
 
 print("AI Modelleri yükleniyor...")
 try:
     DEVICE = Device.CUDA.value
     whisper_model = WhisperModel("medium", device=DEVICE, compute_type="float16")
 
-    tts_model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-    tts_model = TTS(tts_model_name).to(DEVICE)
+    # CoquiTRTTS cümle bölme ve önbelleği sağlar; ham XTTS modeli tek parça sentez için kullanılır.
+    tts_engine = CoquiTRTTS(output_dir=str(TTS_DIR / "tts_out"), use_gpu=True,
+                            speaker_wav=REFERENCE_AUDIO_PATH, language="tr")
+    tts_model = tts_engine.tts
 
     # TTS modelinin orijinal örnekleme oranını alalım.
     TTS_SAMPLERATE = tts_model.synthesizer.output_sample_rate
 
+    # Ajan ağı bir kez derlenir; her oturumun AgentState'i bellekte tutulur. CHECKPOINT_BACKEND
+    # ayarlıysa durum her adımda kalıcı depoya da yazılır ve oturumu herhangi bir worker sürdürebilir.
+    agent_graph = AgentGraph(checkpointer=create_checkpointer())
+    session_store = SessionStore(ttl_seconds=30 * 60)
+
 except Exception as e:
     print(f"Modeller yüklenirken kritik bir hata oluştu: {e}")
     raise e
 
 print("AI Modelleri başarıyla yüklendi ve sunucu hazır.")
 
+# Bloklayan işler (ses çözme + Whisper, TTS) event loop dışında, aşama başına sınırlı thread
+# havuzlarında çalışır. Ajan ağı ise event loop üzerinde ainvoke ile koşar; LLM_WORKERS aynı anda
+# işlenen tur sayısıdır. Kuyruk dolduğunda istek 503 ile reddedilir.
+stt_stage = StageExecutor("stt", max_workers=int(os.getenv("STT_WORKERS", "1")), max_queue=int(os.getenv("STT_QUEUE", "4")))
+llm_stage = StageExecutor("llm", max_workers=int(os.getenv("LLM_WORKERS", "16")), max_queue=int(os.getenv("LLM_QUEUE", "64")))
+tts_stage = StageExecutor("tts", max_workers=int(os.getenv("TTS_WORKERS", "1")), max_queue=int(os.getenv("TTS_QUEUE", "4")))
+
 app = FastAPI(
     title="Uçtan Uca Sesli Asistan",
     description="Ses alır, işler ve sesli yanıt verir."
 )
 
 
+@app.exception_handler(StageSaturatedError)
+async def stage_saturated_handler(request, exc: StageSaturatedError):
+    print(f"Aşama dolu, istek reddedildi: {exc.stage}")
+    return JSONResponse(status_code=503, content={"detail": f"Sunucu meşgul ({exc.stage})."},
+                        headers={"Retry-After": "1"})
+
+
+@app.on_event("shutdown")
+async def shutdown_stages():
+    for stage in (stt_stage, llm_stage, tts_stage):
+        stage.shutdown()
+    await httpPool.aclose()
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "sessions": len(session_store),
+        "decode": decode_stats.snapshot(),
+        "llm": llmSingleton.registry.stats(),
+        "llm_batching": {name: scheduler.stats() for name, scheduler in llmSingleton.schedulers.items()},
+        "http": httpPool.stats(),
+        "speculation": agent_graph.speculator.stats() if agent_graph.speculator else None,
+        "prompt_tokens": {agent: report._asdict() for agent, report in promptBuilder.reports().items()},
+        "stages": {stage.name: stage.stats() for stage in (stt_stage, llm_stage, tts_stage)},
+    }
+
+
+STREAM_SILENCE_MS = 120
+
+
+def _extract_reply(agent_state: AgentState) -> str:
+    """Return the last assistant message produced after the latest user message."""
+    for message in reversed(agent_state.get("all_dialog", [])):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.content and not message.tool_calls:
+            return message.content
+    return ""
+
+
+def transcribe(audio_bytes: bytes) -> str:
+    # Whisper'ın istediği 16kHz mono formata getir (WAV ise librosa'ya hiç uğramadan).
+    input_waveform = load_audio(audio_bytes)
+    segments, _ = whisper_model.transcribe(input_waveform, beam_size=10, language="tr",vad_filter=True, vad_parameters=dict(min_silence_duration_ms=800, max_speech_duration_s=15))     # eğer yavaşsa beam_size=5
+    # segments bir generator'dır; asıl çözümleme burada, STT havuzunun thread'inde yapılır.
+    return " ".join([segment.text for segment in segments]).strip()
+
+
+async def run_agent_graph(session_id: str, transcript: str) -> str:
+    """Runs one user turn through the agent network using the session's resident state."""
+    async with session_store.turn_lock(session_id):
+        agent_state = session_store.get(session_id)
+        agent_state["current_message"] = transcript
+
+        agent_state = await agent_graph.ainvoke(agent_state, session_id=session_id)
+        session_store.save(session_id, agent_state)
+
+    return _extract_reply(agent_state)
+
+
+def synthesize_wav(text: str) -> io.BytesIO:
+    # PERFORMANS: Diske yazmak yerine doğrudan bellekte numpy array olarak al.
+    tts_output_waveform = tts_model.tts(
+        text=text,
+        language="tr",
+        speaker_wav=REFERENCE_AUDIO_PATH
+    )
+
+    # Bellek içi bir byte buffer oluştur
+    wav_buffer = io.BytesIO()
+    # NumPy array'ini WAV formatında bu buffer'a yaz
+    # DİKKAT: tts_model'in kendi örnekleme oranını kullanıyoruz (örn: 22050 Hz)
+    write_wav(wav_buffer, TTS_SAMPLERATE, np.array(tts_output_waveform))
+    wav_buffer.seek(0)  # Buffer'ın başına dön
+    return wav_buffer
+
+
+async def stream_speech(text: str, slot: StageSlot):
+    """
+    Yields a WAV stream sentence by sentence: the header first, then each sentence's PCM
+    as soon as it is synthesized, so the client can start playback after the first sentence.
+    Every sentence is synthesized on the TTS stage's pool through `slot`, which was reserved
+    (tts_stage.reserve) before the stream started and is released when it ends.
+    """
+    try:
+        yield streaming_wav_header(TTS_SAMPLERATE)
+
+        silence = float_to_pcm16(np.zeros(int(TTS_SAMPLERATE * STREAM_SILENCE_MS / 1000), dtype=np.float32))
+        sentences = tts_engine.synthesize_stream(text)
+        first = True
+        while True:
+            chunk = await slot.run(next, sentences, None)
+            if chunk is None: break
+
+            sentence, waveform = chunk
+            if not first: yield silence
+            first = False
+
+            print(f"Cümle sentezlendi: {sentence}")
+            yield float_to_pcm16(waveform)
+
+    finally:
+        slot.release()
+
+
 @app.post("/of68s90/process_audio_endpoint")
-async def process_audio_endpoint(audio_file: UploadFile = File(...)):
+async def process_audio_endpoint(audio_file: UploadFile = File(...),
+                                 session_id: Optional[str] = Form(None),
+                                 stream: bool = Form(False)):
     """
     Bu endpoint ses dosyasını işler ve yanıtı ses olarak stream eder.
+    Aynı görüşmeye ait istekler `session_id` ile gönderilir; yoksa yeni bir oturum açılır
+    ve kimliği `X-Session-Id` başlığında döner.
+    `stream=true` gönderilirse yanıt cümle cümle sentezlenip chunked HTTP ile akıtılır.
+    Aşama havuzlarından biri doluysa 503 döner.
     """
+    session_id = session_id or session_store.new_session_id()
     try:
-        # --- ADIM 1: Gelen Sesi Güvenli Bir Şekilde Oku ve Hazırla ---
-        # Gelen dosyayı doğrudan librosa ile oku. Bu, formatı otomatik olarak algılar.
-        # audio_file.file -> file-like object'i temsil eder.
-        input_waveform, original_sr = librosa.load(audio_file.file, sr=None, mono=True)
-        print(f"Gelen ses dosyası okundu. Orijinal Örnekleme Oranı: {original_sr} Hz")
-
-        # Whisper'ın istediği 16kHz formatına yeniden örnekle (resample).
-        target_sr = 16000
-        if original_sr != target_sr:
-            input_waveform = librosa.resample(input_waveform, orig_sr=original_sr, target_sr=target_sr)
-            print(f"Ses {target_sr} Hz'e yeniden örneklendi.")
-
-        # --- ADIM 2: Faster-Whisper ile Metne Çevir ---         
-        segments, _ = whisper_model.transcribe(input_waveform, beam_size=10, language="tr",vad_filter=True, vad_parameters=dict(min_silence_duration_ms=800, max_speech_duration_s=15))     # eğer yavaşsa beam_size=5
-        transkript = " ".join([segment.text for segment in segments]).strip()
+        # --- ADIM 1-2: Gelen Sesi Oku, Hazırla ve Faster-Whisper ile Metne Çevir ---
+        audio_bytes = await audio_file.read()
+        transkript = await stt_stage.run(transcribe, audio_bytes)
         print(f"Transkripsiyon Sonucu: {transkript}")
 
         if not transkript:
             raise HTTPException(status_code=400, detail="Seste konuşma tespit edilemedi.")
 
-        # --- ADIM 3: LLM ile Metni İşle (Sizin Projenize Özel Kısım) ---
-        # Bu kısmı kendi LangGraph veya LLM çağrınızla değiştirin.
-        response_text = f"Bana şunu söyledin: {transkript}. Harika bir analiz."
+        # --- ADIM 3: Ajan Ağı ile Metni İşle ---
+        # Oturumun AgentState'i (topic_stack, disclosed_topics, all_dialog) korunur.
+        response_text = await llm_stage.run_async(run_agent_graph, session_id, transkript)
         print(f"LLM Yanıtı: {response_text}")
 
-        # --- ADIM 4: CoquiTTS ile Yanıtı Sese Çevir (Bellekte) ---
-        # PERFORMANS: Diske yazmak yerine doğrudan bellekte numpy array olarak al.
-        reference_audio_path= "../tts/ref_tr.wav"
-        tts_output_waveform = tts_model.tts(
-            text=response_text,
-            language="tr",
-            speaker_wav=reference_audio_path
-        )
-
-        # --- ADIM 5: Ses Verisini WAV Formatında Hazırla ve Gönder ---
-        # Bellek içi bir byte buffer oluştur
-        wav_buffer = io.BytesIO()
-        # NumPy array'ini WAV formatında bu buffer'a yaz
-        # DİKKAT: tts_model'in kendi örnekleme oranını kullanıyoruz (örn: 22050 Hz)
-        write_wav(wav_buffer, TTS_SAMPLERATE, np.array(tts_output_waveform))
-        wav_buffer.seek(0)  # Buffer'ın başına dön
-
-        return StreamingResponse(wav_buffer, media_type="audio/wav")
+        if not response_text:
+            raise HTTPException(status_code=500, detail="Ajan ağı bir yanıt üretmedi.")
+
+        headers = {"X-Session-Id": session_id}
+
+        # --- ADIM 4 (stream): Her cümle sentezlenir sentezlenmez gönderilir ---
+        # TTS yeri yanıt başlamadan ayrılır: aşama doluysa ses yarıda kesilmez, 503 döner.
+        if stream:
+            slot = tts_stage.reserve()
+            return StreamingResponse(stream_speech(response_text, slot), media_type="audio/wav", headers=headers,
+                                     background=BackgroundTask(slot.release))
+
+        # --- ADIM 4-5: CoquiTTS ile Yanıtı Sese Çevir (Bellekte) ve WAV olarak Gönder ---
+        wav_buffer = await tts_stage.run(synthesize_wav, response_text)
+        return StreamingResponse(wav_buffer, media_type="audio/wav", headers=headers)
+
+    except (HTTPException, StageSaturatedError):
+        raise
 
     except Exception as e:
         print(f"İşlem sırasında bir hata oluştu: {e}")
         raise HTTPException(status_code=500, detail=f"Sunucu hatası: {str(e)}")
 
+@app.websocket("/of68s90/process_audio_stream_endpoint")
+async def process_audio_stream_endpoint(websocket: WebSocket, session_id: Optional[str] = None):
+    """
+    Full-duplex sesli görüşme. İstemci konuşurken 16 kHz mono int16 PCM frame'lerini binary
+    mesaj olarak gönderir. Sunucu JSON olaylarıyla cevap verir:
+      {"type": "session", "session_id": ...}   bağlantı açılınca
+      {"type": "partial", "text": ...}         konuşma sürerken ara transkript
+      {"type": "final", "text": ...}           sözce bitince (sessizlik algılanınca)
+      {"type": "reply", "text": ...}           ajan ağının yanıtı
+    ardından yanıtın sesi binary WAV chunk'ları olarak akar ve {"type": "audio_end"} gelir.
+    Bir yanıt hata ile biterse audio_end yerine {"type": "error", "detail": ...} gönderilir.
+    Yanıt çalınırken kullanıcı yeniden konuşursa önceki yanıtın sesi kesilir; ajan ağının turu
+    yine de tamamlanıp kaydedilir, böylece yeni tur onun üzerine kurulur.
+    """
+    await websocket.accept()
+    session_id = session_id or session_store.new_session_id()
+    stt = StreamSTT(model=whisper_model)
+    send_lock = asyncio.Lock()
+    reply_task: Optional[asyncio.Task] = None
+    # Süren ajan turları: yanıtı iptal edilse de tur bitene kadar burada tutulur
+    turns: set[asyncio.Task] = set()
+
+    async def send_json(event: dict):
+        async with send_lock:
+            await websocket.send_json(event)
+
+    async def respond(transcript: str):
+        try:
+            turn = asyncio.create_task(llm_stage.run_async(run_agent_graph, session_id, transcript))
+            turns.add(turn)
+            turn.add_done_callback(turns.discard)
+            # Araya girme bu yanıtı iptal eder, turu değil: yarıda kesilen bir tur oturumun
+            # durumunu kaydetmeden bırakırdı. Sonraki tur, oturum kilidinde bunun bitmesini bekler.
+            response_text = await asyncio.shield(turn)
+            await send_json({"type": "reply", "text": response_text})
+
+            if response_text:
+                slot = tts_stage.reserve()
+                try:
+                    async for chunk in stream_speech(response_text, slot):
+                        async with send_lock:
+                            await websocket.send_bytes(chunk)
+                finally:
+                    # Also covers a cancellation before the stream's first step
+                    slot.release()
+            await send_json({"type": "audio_end"})
+
+        except StageSaturatedError as e:
+            await send_json({"type": "error", "detail": f"Sunucu meşgul ({e.stage})."})
+
+        except Exception as e:
+            # Görev içindeki hata sessizce kaybolmasın; istemci yanıtın bittiğini error olayıyla öğrenir.
+            print(f"Yanıt üretilirken bir hata oluştu: {e}")
+            try:
+                await send_json({"type": "error", "detail": f"Sunucu hatası: {str(e)}"})
+            except Exception:
+                pass  # bağlantı zaten kapanmış
+
+    await send_json({"type": "session", "session_id": session_id})
+    try:
+        while True:
+            action = stt.push(await websocket.receive_bytes())
+            if action is None: continue
+
+            try:
+                if action == StreamSTT.PARTIAL:
+                    await send_json({"type": "partial", "text": await stt_stage.run(stt.partial)})
+                    continue
+
+                transcript = await stt_stage.run(stt.finalize)
+
+            except StageSaturatedError as e:
+                await send_json({"type": "error", "detail": f"Sunucu meşgul ({e.stage})."})
+                continue
+
+            print(f"Transkripsiyon Sonucu: {transcript}")
+            await send_json({"type": "final", "text": transcript})
+            if not transcript: continue
+
+            # Kullanıcı yeniden konuştu: eski yanıtın sesini kes (ajan turu arkada tamamlanır).
+            if reply_task and not reply_task.done():
+                reply_task.cancel()
+            reply_task = asyncio.create_task(respond(transcript))
+
+    except WebSocketDisconnect:
+        print(f"WebSocket bağlantısı kapandı: {session_id}")
+
+    finally:
+        if reply_task and not reply_task.done():
+            reply_task.cancel()
+
 # Sunucuyu çalıştırmak için terminalde: uvicorn dosya_adi:app --reload
\ No newline at end of file
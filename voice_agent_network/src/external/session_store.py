@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from agentic_network.core import AgentState
+
+
+def create_agent_state() -> AgentState:
+    """Return an empty AgentState for a brand-new caller session."""
+    return {
+        "current_message": "",
+        "all_dialog": [],
+        "thoughts": [],
+        "topic_stack": [],
+        "disclosed_topics": [],
+        "topic_index": {},
+    }
+
+
+class SessionStore:
+    """
+    In-process store that keeps one AgentState per caller session.
+
+    Sessions are kept in least-recently-used order. A session that has not been
+    touched for `ttl_seconds` is evicted on the next access to the store, and the
+    oldest sessions are dropped once `max_sessions` is exceeded. A session whose turn
+    is running is never evicted.
+    """
+
+    def __init__(self, ttl_seconds: float = 30 * 60, max_sessions: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+
+        # session_id -> (last_access_time, AgentState)
+        self._sessions: OrderedDict[str, tuple[float, AgentState]] = OrderedDict()
+        # session_id -> lock that serializes the turns of one session (held on the event loop)
+        self._turn_locks: dict[str, asyncio.Lock] = {}
+        self._lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    def new_session_id(self) -> str:
+        return str(uuid4())
+
+    def get(self, session_id: str) -> AgentState:
+        """Return the state of the session, creating a fresh one if it is unknown or expired."""
+        with self._lock:
+            self._evict_expired(time.monotonic())
+
+            entry = self._sessions.get(session_id)
+            state = entry[1] if entry else create_agent_state()
+            self._touch(session_id, state)
+            return state
+
+    def save(self, session_id: str, state: AgentState) -> None:
+        """Store the state produced by the latest turn of the session."""
+        with self._lock:
+            self._touch(session_id, state)
+            self._evict_expired(time.monotonic())
+
+    def turn_lock(self, session_id: str) -> asyncio.Lock:
+        """Lock to hold while a turn of the session runs, so concurrent requests of one caller don't interleave."""
+        with self._lock:
+            return self._turn_locks.setdefault(session_id, asyncio.Lock())
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._turn_locks.pop(session_id, None)
+
+    def evict_expired(self) -> int:
+        """Remove every expired session and return how many were removed."""
+        with self._lock:
+            return self._evict_expired(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _touch(self, session_id: str, state: AgentState) -> None:
+        self._sessions[session_id] = (time.monotonic(), state)
+        self._sessions.move_to_end(session_id)
+
+    def _evict_expired(self, now: float) -> int:
+        evicted = 0
+
+        # The dict is kept in access order, so expired sessions are always at the front.
+        for session_id, (last_access, _) in list(self._sessions.items()):
+            if now - last_access < self.ttl_seconds and len(self._sessions) <= self.max_sessions:
+                break
+
+            # A session whose turn is running keeps its lock, or a new request of the caller
+            # would get a fresh one and interleave with it; the turn's save touches it again.
+            lock = self._turn_locks.get(session_id)
+            if lock is not None and lock.locked(): continue
+
+            del self._sessions[session_id]
+            self._turn_locks.pop(session_id, None)
+            evicted += 1
+
+        if evicted:
+            print(f"-session store: {evicted} session(s) evicted, {len(self._sessions)} active")
+        return evicted
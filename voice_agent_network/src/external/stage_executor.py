@@ -0,0 +1,128 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class StageSaturatedError(RuntimeError):
+    """Raised when a stage already has as many in-flight jobs as it is allowed to queue."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"{stage} stage is saturated")
+        self.stage = stage
+
+
+class StageExecutor:
+    """
+    A bounded worker pool for one blocking pipeline stage (STT, LLM or TTS).
+
+    Jobs run on a dedicated thread pool so the asyncio event loop stays free for other
+    requests and health checks. At most `max_workers` jobs run at once and at most
+    `max_queue` more may wait; beyond that `run` raises StageSaturatedError immediately
+    instead of piling up latency.
+
+    A stage whose work is already a coroutine (the agent graph's `ainvoke`) uses `run_async`
+    instead: same limits and stats, but no thread is held while the job waits on I/O.
+
+    Work made of several jobs (a reply synthesized sentence by sentence) takes one `reserve`d
+    slot up front, so it is rejected before it starts rather than cut off half way.
+    """
+
+    def __init__(self, name: str, max_workers: int = 1, max_queue: int = 4):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-stage")
+        # Only touched from the event loop thread, so no lock is needed.
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+        # Concurrency limit of run_async, created inside the event loop on first use
+        self._slots: asyncio.Semaphore | None = None
+
+    # ---- Public API --------------------------------------------------------------
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the stage's pool and await its result."""
+        self._admit()
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, partial(fn, *args, **kwargs))
+
+        finally:
+            self._done(start)
+
+    async def run_async(self, fn, *args, **kwargs):
+        """
+        Await the coroutine `fn(*args, **kwargs)` on the event loop itself, under the same limits:
+        at most `max_workers` run at once, the next `max_queue` wait for a slot.
+        """
+        self._admit()
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_workers)
+            async with self._slots:
+                return await fn(*args, **kwargs)
+
+        finally:
+            self._done(start)
+
+    def reserve(self) -> "StageSlot":
+        """
+        Admit a multi-job piece of work now, raising StageSaturatedError if the stage is full.
+        Its jobs then run through the returned slot without being admitted again; the slot
+        counts as one in-flight job until it is released.
+        """
+        self._admit()
+        self._in_flight += 1
+        return StageSlot(self, time.perf_counter())
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.max_workers),
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_seconds": round(self._busy_seconds / self._completed, 3) if self._completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _admit(self) -> None:
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise StageSaturatedError(self.name)
+
+    def _done(self, start: float) -> None:
+        self._in_flight -= 1
+        self._completed += 1
+        self._busy_seconds += time.perf_counter() - start
+
+
+class StageSlot:
+    """A place reserved in a StageExecutor (see `reserve`)."""
+
+    def __init__(self, stage: StageExecutor, start: float):
+        self._stage = stage
+        self._start = start
+        self._released = False
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the stage's pool without a new admission check."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._stage._pool, partial(fn, *args, **kwargs))
+
+    def release(self) -> None:
+        # Safe to call more than once (the stream's own cleanup and the response's background task)
+        if self._released: return
+        self._released = True
+        self._stage._done(self._start)
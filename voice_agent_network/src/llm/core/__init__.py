@@ -1,4 +1,6 @@
 from .devices import Device
+from .model_tier import ModelTier
 from .llm_adapter import LlmAdapter
 from .llm_client import LlmClient
+from .model_registry import ModelRegistry
 from .llm_singletons import LlmSingleton
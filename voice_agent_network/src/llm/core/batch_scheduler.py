@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+from llm.llm_models import GemmaBasedModel
+
+
+class BatchScheduler:
+    """
+    Collects `give_prompt` calls from concurrent sessions into batches for one model.
+
+    Each call is queued and gets a Future. A worker thread takes the first waiting request,
+    keeps collecting for at most `max_wait_ms` (or until `max_batch_size` requests are
+    waiting) and answers the whole batch with a single `give_prompt_batch`. Callers block on
+    their own future only, so the scheduler is a drop-in replacement for the model: every
+    other attribute (stream_prompt, set_model_settings, ...) is forwarded to it.
+
+    The model is resolved through `get_model` for every batch, so a model that the registry
+    evicted and reloaded in the meantime is picked up.
+    """
+
+    def __init__(self, get_model: Callable[[], GemmaBasedModel], name: str,
+                 max_batch_size: int = 8, max_wait_ms: float = 10):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+
+        self._get_model = get_model
+        self._queue: queue.Queue[tuple[List[Dict], Future]] = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = dict(requests=0, batches=0, max_batch=0, failed_batches=0)
+
+        self._worker = threading.Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._worker.start()
+
+    # ---- Public API --------------------------------------------------------------
+    def submit(self, messages: List[Dict[str, str]]) -> Future:
+        """Queues one chat and returns the future of its response."""
+        future = Future()
+        self._queue.put((messages, future))
+        return future
+
+    def give_prompt(self, messages: List[Dict[str, str]]) -> str:
+        return self.submit(messages).result()
+
+    async def agive_prompt(self, messages: List[Dict[str, str]]) -> str:
+        # Awaits the batch without holding a thread of the caller's
+        return await asyncio.wrap_future(self.submit(messages))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            batches = self._stats["batches"]
+            return {
+                **self._stats,
+                "waiting": self._queue.qsize(),
+                "avg_batch": round(self._stats["requests"] / batches, 2) if batches else 0.0,
+            }
+
+    def __getattr__(self, item):
+        # Only called for attributes the scheduler itself doesn't have
+        return getattr(self._get_model(), item)
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_seconds
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # Requests whose caller already gave up are not generated
+            batch = [(messages, future) for messages, future in batch if future.set_running_or_notify_cancel()]
+            if not batch: continue
+
+            try:
+                responses = self._get_model().give_prompt_batch([messages for messages, _ in batch])
+            except Exception as e:
+                print(f"-batch scheduler ({self.name}): batch of {len(batch)} failed: {e}")
+                with self._stats_lock:
+                    self._stats["failed_batches"] += 1
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            with self._stats_lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+            for (_, future), response in zip(batch, responses):
+                future.set_result(response)
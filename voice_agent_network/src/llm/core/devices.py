@@ -1,5 +1,8 @@
 from enum import Enum
 
+import torch
+
+
 class Device(Enum):
     """
     Represents different device types for model loading.
@@ -7,4 +10,44 @@ class Device(Enum):
     CUDA = "cuda"  # NVIDIA GPUs
     MPS = "mps"  # Apple Silicon GPUs
     AUTO = "auto"  # Let Hugging Face determine the best device
-    CPU = "cpu"  # CPU only
\ No newline at end of file
+    CPU = "cpu"  # CPU only
+
+
+class CpuPrecision(Enum):
+    """
+    Weight precision used when a model ends up on the CPU.
+    """
+    FLOAT32 = "float32"  # full precision; bfloat16 matmuls are slow on most CPUs
+    INT8_DYNAMIC = "int8_dynamic"  # Linear layers dynamically quantized to int8
+
+
+def resolve_device(device: Device) -> Device:
+    """Falls back to the CPU when the requested accelerator is not available on this node."""
+    if device == Device.CUDA and not torch.cuda.is_available():
+        print("-device: CUDA is not available, falling back to CPU")
+        return Device.CPU
+
+    if device == Device.MPS and not torch.backends.mps.is_available():
+        print("-device: MPS is not available, falling back to CPU")
+        return Device.CPU
+
+    if device == Device.AUTO and not torch.cuda.is_available() and not torch.backends.mps.is_available():
+        return Device.CPU
+
+    return device
+
+
+def torch_dtype_for(device: Device) -> torch.dtype:
+    return torch.float32 if device == Device.CPU else torch.bfloat16
+
+
+def prepare_for_cpu(model, precision: CpuPrecision, num_threads: int = None):
+    """Applies the CPU execution profile to a model that was loaded on the CPU."""
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    if precision == CpuPrecision.INT8_DYNAMIC:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    print(f"-device: CPU profile {precision.value}, {torch.get_num_threads()} threads")
+    return model
@@ -1,7 +1,11 @@
+import asyncio
+import json
+
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, AIMessage, ToolMessage
-from typing import List
+from typing import List, Iterator
 
 from llm.llm_models import GemmaBasedModel
+from llm.core.prompt_builder import promptBuilder
 
 
 # Assume your Gemma class is defined elsewhere
@@ -12,26 +16,80 @@ class GemmaBasedModelAdapter:
     """
     A LangChain-compatible wrapper for the custom Gemma client.
     Handles System, Human, AI, and Tool message types.
+
+    With `agent` set, every prompt is first fitted into that agent's token budget by the PromptBuilder.
+
+    The a-prefixed methods are for the async graph path: the model generates on a worker thread
+    (or, behind a BatchScheduler, the call just awaits its batch), so the event loop stays free.
     """
-    def __init__(self, gemma_based_model: GemmaBasedModel):
+    def __init__(self, gemma_based_model: GemmaBasedModel, agent: str | None = None):
         self.gemma_based_client = gemma_based_model
+        self.agent = agent
 
     def invoke(self, messages: List[BaseMessage], stop: List[str] | None = None, **kwargs) -> str:
         """
         The core method that LangChain will invoke.
         """
+        return self.gemma_based_client.give_prompt(self._to_prompt_messages(messages))
+
+    async def ainvoke(self, messages: List[BaseMessage], stop: List[str] | None = None, **kwargs) -> str:
+        """
+        Like `invoke`, as a coroutine.
+        """
+        agive_prompt = getattr(self.gemma_based_client, "agive_prompt", None)
+        if agive_prompt is None:
+            return await asyncio.to_thread(self.invoke, messages)
+        # Fitting the prompt may load the tokenizer (and the model), so only the wait for the batch stays on the loop
+        prompt_messages = await asyncio.to_thread(self._to_prompt_messages, messages)
+        return await agive_prompt(prompt_messages)
+
+    def choose(self, messages: List[BaseMessage], choices: List[str]) -> str:
+        """
+        Like `invoke`, but the response is constrained to exactly one of `choices`.
+        """
+        return self.gemma_based_client.give_choice(self._to_prompt_messages(messages), choices)
+
+    async def achoose(self, messages: List[BaseMessage], choices: List[str]) -> str:
+        """
+        Like `choose`, as a coroutine.
+        """
+        return await asyncio.to_thread(self.choose, messages, choices)
+
+    def score(self, messages: List[BaseMessage], choices: List[str]) -> List[float]:
+        """
+        Returns the log-probability of each of `choices` being the response.
+        """
+        return self.gemma_based_client.score_choices(self._to_prompt_messages(messages), choices)
+
+    def stream(self, messages: List[BaseMessage], stop: List[str] | None = None, **kwargs) -> Iterator[str]:
+        """
+        Like `invoke`, but yields the response as text deltas while the model generates it.
+        """
+        yield from self.gemma_based_client.stream_prompt(self._to_prompt_messages(messages))
+
+    def _to_prompt_messages(self, messages: List[BaseMessage]) -> List[dict]:
+        if self.agent is not None:
+            messages = promptBuilder.build(self.agent, self.gemma_based_client, messages)
+
         prompt_messages = []
         for msg in messages:
+            text = msg.content
             if isinstance(msg, SystemMessage):
                 role = 'system'
             elif isinstance(msg, HumanMessage):
                 role = 'user'
             elif isinstance(msg, AIMessage):
                 role = 'assistant'
+                # Tool calls are written back in the TOOL_CALL format the model was asked to use
+                for call in msg.tool_calls:
+                    text += f"TOOL_CALL: {json.dumps({'name': call['name'], 'args': call['args']}, ensure_ascii=False)}"
+            elif isinstance(msg, ToolMessage):
+                # The chat template has no tool role; the result answers the call as the next user turn
+                role = 'user'
+                text = f"TOOL_RESULT: {msg.content}"
             else:
                 raise ValueError(f"Unsupported message type: {type(msg).__name__}")
 
-            prompt_messages.append({"role": role, "content": [{"type": "text", "text": msg.content}]})
+            prompt_messages.append({"role": role, "content": [{"type": "text", "text": text}]})
 
-        response = self.gemma_based_client.give_prompt(prompt_messages)
-        return response
+        return prompt_messages
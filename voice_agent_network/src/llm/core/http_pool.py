@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpPool:
+    """
+    Connection pool shared by the remote LLM clients (Gemini, Ollama).
+
+    The async side is one httpx.AsyncClient with keep-alive connections, speaking HTTP/2 when
+    the `h2` package is installed; the blocking side is one requests.Session with a pooled
+    adapter. Both limit the requests in flight per host (`per_host_limit`), retry 429 and 5xx
+    answers and connection failures up to `max_retries` times with jittered exponential
+    backoff (honouring Retry-After), and record every request's latency per host.
+
+    `post_lines` / `apost_lines` stream the answer line by line (SSE, NDJSON). They retry only
+    until the response headers arrive, hold the host's slot until the stream is closed, and
+    record the time to the headers as the request's latency.
+
+    The async client and its semaphores belong to the event loop that first used them; a
+    different loop (e.g. a script calling asyncio.run twice) gets fresh ones, and the old
+    client is closed on its own loop if that loop is still open.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20, per_host_limit: int = 16,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 connect_timeout: float = 5.0, http2: Optional[bool] = None):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self.http2 = _h2_available() if http2 is None else http2
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._async_limits: Dict[str, asyncio.Semaphore] = {}
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=per_host_limit, pool_maxsize=max_connections)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._sync_limits: Dict[str, threading.BoundedSemaphore] = {}
+
+        # host -> counters and the latencies (seconds) of its latest requests
+        self._metrics: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    async def apost_json(self, url: str, payload: Dict, *, params: Optional[Dict] = None,
+                         headers: Optional[Dict] = None, timeout: Optional[float] = 30.0) -> Dict:
+        """POSTs `payload` as JSON and returns the decoded JSON answer; raises httpx.HTTPStatusError on failure."""
+        host = urlsplit(url).netloc
+        client, limit = self._async_client(), self._async_limit(host)
+        attempt = 0
+        while True:
+            async with limit:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json=payload, params=params, headers=headers,
+                                                 timeout=self._timeout(timeout))
+                except httpx.TransportError:
+                    self._record(host, time.perf_counter() - start, ok=False)
+                    if attempt >= self.max_retries: raise
+                    response = None
+                else:
+                    self._record(host, time.perf_counter() - start, ok=response.status_code < 400)
+
+            if response is not None and (response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries):
+                response.raise_for_status()
+                return response.json()
+
+            attempt += 1
+            await asyncio.sleep(self._backoff(attempt, response, host))
+
+    def post_json(self, url: str, payload: Dict, *, params: Optional[Dict] = None,
+                  headers: Optional[Dict] = None, timeout: Optional[float] = 30.0) -> Dict:
+        """Blocking `apost_json`; raises requests.HTTPError on failure."""
+        host = urlsplit(url).netloc
+        limit = self._sync_limit(host)
+        attempt = 0
+        while True:
+            with limit:
+                start = time.perf_counter()
+                try:
+                    response = self._session.post(url, json=payload, params=params, headers=headers,
+                                                  timeout=(self.connect_timeout, timeout))
+                except (requests.ConnectionError, requests.Timeout):
+                    self._record(host, time.perf_counter() - start, ok=False)
+                    if attempt >= self.max_retries: raise
+                    response = None
+                else:
+                    self._record(host, time.perf_counter() - start, ok=response.status_code < 400)
+
+            if response is not None and (response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries):
+                response.raise_for_status()
+                return response.json()
+
+            attempt += 1
+            time.sleep(self._backoff(attempt, response, host))
+
+    def post_lines(self, url: str, payload: Dict, *, params: Optional[Dict] = None,
+                   headers: Optional[Dict] = None, timeout: Optional[float] = 30.0) -> Iterator[str]:
+        """POSTs `payload` as JSON and yields the non-empty lines of the streamed answer."""
+        host = urlsplit(url).netloc
+        limit = self._sync_limit(host)
+        attempt = 0
+        while True:
+            with limit:
+                start = time.perf_counter()
+                try:
+                    response = self._session.post(url, json=payload, params=params, headers=headers,
+                                                  timeout=(self.connect_timeout, timeout), stream=True)
+                except (requests.ConnectionError, requests.Timeout):
+                    self._record(host, time.perf_counter() - start, ok=False)
+                    if attempt >= self.max_retries: raise
+                    response = None
+                else:
+                    self._record(host, time.perf_counter() - start, ok=response.status_code < 400)
+
+                if response is not None and (response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries):
+                    with response:
+                        response.raise_for_status()
+                        # SSE and NDJSON are UTF-8 whether or not the server names a charset
+                        response.encoding = response.encoding or "utf-8"
+                        # chunk_size=None hands over each transfer chunk as it arrives instead of waiting for 512 bytes
+                        lines = response.iter_lines(chunk_size=None, decode_unicode=True)
+                        yield from (line for line in lines if line)
+                    return
+                if response is not None: response.close()
+
+            attempt += 1
+            time.sleep(self._backoff(attempt, response, host))
+
+    async def apost_lines(self, url: str, payload: Dict, *, params: Optional[Dict] = None,
+                          headers: Optional[Dict] = None, timeout: Optional[float] = 30.0) -> AsyncIterator[str]:
+        """Async `post_lines`; close it (contextlib.aclosing) when stopping early to free the connection."""
+        host = urlsplit(url).netloc
+        client, limit = self._async_client(), self._async_limit(host)
+        attempt = 0
+        while True:
+            async with limit:
+                start = time.perf_counter()
+                try:
+                    request = client.build_request("POST", url, json=payload, params=params, headers=headers,
+                                                   timeout=self._timeout(timeout))
+                    response = await client.send(request, stream=True)
+                except httpx.TransportError:
+                    self._record(host, time.perf_counter() - start, ok=False)
+                    if attempt >= self.max_retries: raise
+                    response = None
+                else:
+                    self._record(host, time.perf_counter() - start, ok=response.status_code < 400)
+
+                if response is not None and (response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries):
+                    try:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if line: yield line
+                    finally:
+                        await response.aclose()
+                    return
+                if response is not None: await response.aclose()
+
+            attempt += 1
+            await asyncio.sleep(self._backoff(attempt, response, host))
+
+    def stats(self) -> dict:
+        """Per host: requests, retries, errors, requests in flight and latency percentiles (ms)."""
+        with self._lock:
+            stats = {}
+            for host, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies"])
+                stats[host] = {
+                    "requests": metrics["requests"],
+                    "retries": metrics["retries"],
+                    "errors": metrics["errors"],
+                    "p50_ms": _percentile_ms(latencies, 0.50),
+                    "p95_ms": _percentile_ms(latencies, 0.95),
+                    "avg_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+                }
+            return {"http2": self.http2, "hosts": stats}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client, self._loop = None, None
+            self._async_limits.clear()
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._close_stale_client()
+            self._loop = loop
+            self._async_limits = {}
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_keepalive),
+            )
+        return self._client
+
+    def _close_stale_client(self) -> None:
+        """
+        Closes the client of the loop used before, on that loop. A loop that is already closed
+        (asyncio.run returned) can no longer close its connections; they are released when the
+        client is collected, which is why rebinding is only meant for scripts and tests.
+        """
+        if self._client is None or self._loop.is_closed(): return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop)
+
+    def _async_limit(self, host: str) -> asyncio.Semaphore:
+        # Only touched from the event loop thread, so no lock is needed
+        if host not in self._async_limits:
+            self._async_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._async_limits[host]
+
+    def _sync_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._sync_limits.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+
+    def _timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        # No read timeout (None) for local servers that may generate for minutes
+        return httpx.Timeout(timeout, connect=self.connect_timeout)
+
+    def _backoff(self, attempt: int, response, host: str) -> float:
+        """Seconds to wait before retry `attempt`: Retry-After if the server sent one, else full-jitter backoff."""
+        with self._lock:
+            self._metrics[host]["retries"] += 1
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass  # an HTTP date; fall back to the backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _record(self, host: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(host, dict(requests=0, retries=0, errors=0, latencies=deque(maxlen=512)))
+            metrics["requests"] += 1
+            metrics["errors"] += 0 if ok else 1
+            metrics["latencies"].append(seconds)
+
+
+# ----- Helpers -----
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _percentile_ms(latencies: list, q: float) -> float:
+    if not latencies: return 0.0
+    return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+
+
+httpPool = HttpPool(max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+                    per_host_limit=int(os.getenv("HTTP_PER_HOST_LIMIT", 16)),
+                    max_retries=int(os.getenv("HTTP_MAX_RETRIES", 3)),
+                    http2=None if os.getenv("HTTP_HTTP2", "auto") == "auto" else os.getenv("HTTP_HTTP2") == "1")
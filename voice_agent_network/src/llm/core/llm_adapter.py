@@ -68,6 +68,22 @@ class LlmAdapter:
         """
         LangChain-style invoke: takes LC messages, returns an AIMessage.
         """
+        result = self.llm.chat(self._to_client_messages(messages))
+        return self._to_ai_message(result)
+
+    async def ainvoke(self, messages: List[BaseMessage]) -> AIMessage:
+        """
+        Like `invoke`, but awaits the client's `achat`, so the event loop is free while the provider answers.
+        """
+        result = await self.llm.achat(self._to_client_messages(messages))
+        return self._to_ai_message(result)
+
+    # Optional convenience so it can be used like a runnable
+    __call__ = invoke
+
+    # -- Internal mappers ----------------------------------------------------
+
+    def _to_client_messages(self, messages: List[BaseMessage]) -> List[Dict]:
         # Optionally prepend an auto system prompt describing tool protocol
         msgs_for_client = messages
         if self.auto_tool_system_prompt and self._bound_tools:
@@ -75,9 +91,9 @@ class LlmAdapter:
             sys_text = self.tool_call_template + f"\nAvailable tools: {tool_names}"
             msgs_for_client = [SystemMessage(content=sys_text), *messages]
 
-        client_msgs = self._lc_to_client_messages(msgs_for_client)
-        result = self.llm.chat(client_msgs)
+        return self._lc_to_client_messages(msgs_for_client)
 
+    def _to_ai_message(self, result: Dict) -> AIMessage:
         if self.verbose:
             print("[LlmAdapter] -> client text:", result.get("text", ""))
 
@@ -86,11 +102,6 @@ class LlmAdapter:
 
         return self._client_result_to_ai_message(result)
 
-    # Optional convenience so it can be used like a runnable
-    __call__ = invoke
-
-    # -- Internal mappers ----------------------------------------------------
-
     def _lc_to_client_messages(self, messages: List[BaseMessage]) -> List[Dict]:
         """
         Map LC messages -> [{role, content}] expected by LlmClient.
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from contextlib import aclosing, closing
+from typing import AsyncIterator, Iterator, List, Dict, Optional
+import asyncio
 import re
 import json
 
@@ -16,6 +18,9 @@ class LlmClient(ABC):
         "raw": dict,         # raw provider response
         "tool_call": dict|None  # parsed {"name":..., "args": {...}} if model requested a tool
       }
+      achat(messages_json) -> the same, as a coroutine
+      chat_stream(messages_json) -> yields {"type": "delta", "text": str} while the model
+        generates, then {"type": "done", **the chat() result}; achat_stream as an async iterator
 
     Subclasses must implement:
       - _build_payload(messages_json) -> provider request payload (dict)
@@ -23,6 +28,9 @@ class LlmClient(ABC):
       - _extract_text(resp) -> str
 
     Optionally override:
+      - _apost(payload) with a non-blocking HTTP call (the default runs _post on a worker thread)
+      - _build_stream_payload / _post_stream / _apost_stream / _extract_delta to stream from the
+        provider (by default the whole answer arrives as a single chunk)
       - _maybe_parse_tool_call(text) if you use a different protocol
     """
 
@@ -40,10 +48,40 @@ class LlmClient(ABC):
         Subclasses usually don't override this.
         """
         payload = self._build_payload(messages_json)
-        resp = self._post(payload)
-        text = self._extract_text(resp) or ""
-        tool_call = self._maybe_parse_tool_call(text)
-        return {"text": text, "raw": resp, "tool_call": tool_call}
+        return self._to_result(self._post(payload))
+
+    async def achat(self, messages_json: List[Dict]) -> Dict:
+        """
+        Like `chat`, but awaits the provider instead of blocking the calling thread,
+        so one event loop can keep many requests in flight.
+        """
+        payload = self._build_payload(messages_json)
+        return self._to_result(await self._apost(payload))
+
+    def chat_stream(self, messages_json: List[Dict]) -> Iterator[Dict]:
+        """
+        Like `chat`, but yields the text as it is generated. A reply that starts with TOOL_CALL:
+        is never yielded as text; the stream is closed as soon as the call's JSON is complete.
+        """
+        stream = StreamAssembler(self._maybe_parse_tool_call)
+        with closing(self._post_stream(self._build_stream_payload(messages_json))) as chunks:
+            for chunk in chunks:
+                yield from stream.feed(self._extract_delta(chunk) or "", chunk)
+                if stream.tool_call is not None: break
+        yield from stream.close()
+
+    async def achat_stream(self, messages_json: List[Dict]) -> AsyncIterator[Dict]:
+        """
+        Like `chat_stream`, as an async iterator.
+        """
+        stream = StreamAssembler(self._maybe_parse_tool_call)
+        async with aclosing(self._apost_stream(self._build_stream_payload(messages_json))) as chunks:
+            async for chunk in chunks:
+                for event in stream.feed(self._extract_delta(chunk) or "", chunk):
+                    yield event
+                if stream.tool_call is not None: break
+        for event in stream.close():
+            yield event
 
     # ---- Hooks to implement ------------------------------------------------
     @abstractmethod
@@ -58,7 +96,34 @@ class LlmClient(ABC):
     def _extract_text(self, resp: Dict) -> str:
         raise NotImplementedError
 
-    # ---- Optional hook -----------------------------------------------------
+    # ---- Optional hooks ----------------------------------------------------
+    async def _apost(self, payload: Dict) -> Dict:
+        return await asyncio.to_thread(self._post, payload)
+
+    def _build_stream_payload(self, messages_json: List[Dict]) -> Dict:
+        return self._build_payload(messages_json)
+
+    def _post_stream(self, payload: Dict) -> Iterator[Dict]:
+        yield self._post(payload)
+
+    async def _apost_stream(self, payload: Dict) -> AsyncIterator[Dict]:
+        yield await self._apost(payload)
+
+    def _extract_delta(self, chunk: Dict) -> str:
+        return self._extract_text(chunk)
+
+    def _maybe_parse_tool_call(self, text: str) -> Optional[Dict]:
+        if not text: return None
+
+        m = self._tool_call_re.match(text.strip())
+        if not m: return None
+
+        try:
+            return json.loads(m.group(1))
+
+        except Exception:
+            return None
+
     def parse_tool_call(self, text: str) -> Optional[Dict]:
         if not text: return None
 
@@ -75,3 +140,60 @@ class LlmClient(ABC):
 
         except Exception:
             return None
+
+    # ---- Internals ---------------------------------------------------------
+    def _to_result(self, resp: Dict) -> Dict:
+        text = self._extract_text(resp) or ""
+        return {"text": text, "raw": resp, "tool_call": self._maybe_parse_tool_call(text)}
+
+
+class StreamAssembler:
+    """
+    Turns a stream of text deltas into chat_stream events.
+
+    The first characters are held back while they could still be the start of "TOOL_CALL:".
+    Plain replies are then passed through delta by delta; a tool call is kept back whole and
+    parsed every time its braces balance, so the caller can stop reading once it is complete.
+    """
+
+    PREFIX = "TOOL_CALL:"
+
+    def __init__(self, parse_tool_call):
+        self.parse_tool_call = parse_tool_call
+        self.text = ""
+        self.raw: Optional[Dict] = None
+        self.tool_call: Optional[Dict] = None
+        self._mode: Optional[str] = None  # None until decided, then "text" or "tool"
+
+    def feed(self, delta: str, raw: Optional[Dict] = None) -> List[Dict]:
+        self.text += delta
+        self.raw = raw if raw is not None else self.raw
+        if not delta: return []
+
+        if self._mode == "text":
+            return [{"type": "delta", "text": delta}]
+
+        if self._mode is None:
+            head = self.text.lstrip()
+            if head.startswith(self.PREFIX):
+                self._mode = "tool"
+            elif self.PREFIX.startswith(head):
+                return []
+            else:
+                self._mode = "text"
+                return [{"type": "delta", "text": self.text}]
+
+        body = self.text[self.text.index(self.PREFIX) + len(self.PREFIX):]
+        if "{" in body and body.count("{") == body.count("}"):
+            self.tool_call = self.parse_tool_call(self.text)
+        return []
+
+    def close(self) -> List[Dict]:
+        events = []
+        # A short reply that never grew past a possible "TOOL_CALL:" prefix
+        if self._mode is None and self.text:
+            events.append({"type": "delta", "text": self.text})
+        if self._mode == "tool" and self.tool_call is None:
+            self.tool_call = self.parse_tool_call(self.text)
+        events.append({"type": "done", "text": self.text, "raw": self.raw, "tool_call": self.tool_call})
+        return events
@@ -1,11 +1,81 @@
+import os
+from typing import Union
+
 from llm.llm_models.gemma_based_models import Gemma, MedGemma
 from llm.core import Device
+from llm.core.devices import CpuPrecision
+from llm.core.model_tier import ModelTier
+from llm.core.model_registry import ModelRegistry, LeasedModel
+from llm.core.batch_scheduler import BatchScheduler
+
+# What the singleton hands out in place of a model: both forward every model attribute
+ModelHandle = Union[LeasedModel, BatchScheduler]
 
 
 class LlmSingleton:
+    """
+    Shared access point to the local models. Nothing is loaded at import time: each model is
+    built by the registry the first time its attribute is read, and may be evicted later to
+    respect LLM_MEMORY_BUDGET_GB (or moved to the CPU if LLM_OFFLOAD_TO_CPU=1).
+
+    LLM_DEVICE picks the device (default "cuda"; falls back to the CPU when CUDA is missing).
+    On the CPU, LLM_CPU_PRECISION ("float32" or "int8_dynamic") and LLM_NUM_THREADS apply.
+    LLM_PREFIX_CACHE_SIZE is the number of system prompts whose KV cache is kept per model (0 disables it).
+
+    With LLM_BATCHING=1 each model is served through a BatchScheduler, which batches the
+    give_prompt calls of concurrent sessions (LLM_MAX_BATCH_SIZE, LLM_BATCH_WAIT_MS).
+
+    Agents ask for a ModelTier rather than a model; LLM_TIER_SMALL / LLM_TIER_LARGE pick the
+    registered model of each tier.
+
+    What the attributes return is a ModelHandle: a LeasedModel, which leases the model for each
+    call so the registry never evicts or offloads a model while it is generating, or with
+    LLM_BATCHING=1 the BatchScheduler in front of it.
+    """
+
     def __init__(self):
-        self.gemma_3_1b_it = Gemma(False, model_variant=Gemma.Variant.GEMMA_3_1B_IT, device_map=Device.CUDA)
-        self.medgemma_27b_text_it = MedGemma(False, model_variant=MedGemma.Variant.MEDGEMMA_27B_TEXT_IT, device_map=Device.CUDA)
+        budget = os.getenv("LLM_MEMORY_BUDGET_GB")
+        self.registry = ModelRegistry(memory_budget_gb=float(budget) if budget else None,
+                                      offload_to_cpu=os.getenv("LLM_OFFLOAD_TO_CPU") == "1")
+
+        num_threads = os.getenv("LLM_NUM_THREADS")
+        model_profile = dict(device_map=Device(os.getenv("LLM_DEVICE", Device.CUDA.value)),
+                             cpu_precision=CpuPrecision(os.getenv("LLM_CPU_PRECISION", CpuPrecision.FLOAT32.value)),
+                             num_threads=int(num_threads) if num_threads else None,
+                             prefix_cache_size=int(os.getenv("LLM_PREFIX_CACHE_SIZE", 16)))
+
+        self.registry.register("gemma_3_1b_it", lambda: Gemma(
+            False, model_variant=Gemma.Variant.GEMMA_3_1B_IT, **model_profile))
+        self.registry.register("medgemma_27b_text_it", lambda: MedGemma(
+            False, model_variant=MedGemma.Variant.MEDGEMMA_27B_TEXT_IT, **model_profile))
+
+        # model name -> BatchScheduler in front of it (empty unless LLM_BATCHING=1)
+        self.schedulers: dict[str, BatchScheduler] = {}
+        if os.getenv("LLM_BATCHING") == "1":
+            for name in ("gemma_3_1b_it", "medgemma_27b_text_it"):
+                self.schedulers[name] = BatchScheduler(lambda name=name: self.registry.handle(name), name,
+                                                       max_batch_size=int(os.getenv("LLM_MAX_BATCH_SIZE", 8)),
+                                                       max_wait_ms=float(os.getenv("LLM_BATCH_WAIT_MS", 10)))
+
+    def for_tier(self, tier: ModelTier) -> ModelHandle:
+        """Returns the model serving `tier` (CANNED agents fall back to the SMALL model)."""
+        if tier == ModelTier.LARGE:
+            return self._get(os.getenv("LLM_TIER_LARGE", "medgemma_27b_text_it"))
+        return self._get(os.getenv("LLM_TIER_SMALL", "gemma_3_1b_it"))
+
+    @property
+    def gemma_3_1b_it(self) -> ModelHandle:
+        return self._get("gemma_3_1b_it")
+
+    @property
+    def medgemma_27b_text_it(self) -> ModelHandle:
+        return self._get("medgemma_27b_text_it")
+
+    def _get(self, name: str) -> ModelHandle:
+        # The scheduler loads the model lazily as well, on its first batch
+        if name in self.schedulers:
+            return self.schedulers[name]
+        return self.registry.handle(name)
 
 
 llmSingleton = LlmSingleton()
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import gc
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import torch
+
+from llm.llm_models import GemmaBasedModel
+
+
+class ModelRegistry:
+    """
+    Loads GemmaBasedModel instances on first use and keeps them within a memory budget.
+
+    Models are registered with a factory and only built when first needed. Loaded models are
+    kept in least-recently-used order; once the summed footprint exceeds `memory_budget_gb`,
+    the least recently used ones are unloaded (or moved to the CPU if `offload_to_cpu` is set)
+    until the budget fits again. The model being returned is never evicted, so a single model
+    larger than the budget still loads.
+
+    A model in use is never evicted either: `lease` pins it for a block, and the LeasedModel
+    returned by `handle` pins it for each call (for a stream, until the stream is closed). A
+    budget that could not be met because of a lease is enforced again when the lease ends.
+
+    Loading, restoring and evicting a model happen under that model's own lock, outside the
+    registry lock, so a long load never holds up the cache hits of the other models.
+    """
+
+    def __init__(self, memory_budget_gb: Optional[float] = None, offload_to_cpu: bool = False):
+        self.memory_budget_bytes = int(memory_budget_gb * 1024 ** 3) if memory_budget_gb else None
+        self.offload_to_cpu = offload_to_cpu
+
+        self._factories: Dict[str, Callable[[], GemmaBasedModel]] = {}
+        # name -> loaded model, in LRU order (most recently used last)
+        self._resident: OrderedDict[str, GemmaBasedModel] = OrderedDict()
+        # name -> model parked on the CPU (only used when offload_to_cpu is set)
+        self._offloaded: Dict[str, GemmaBasedModel] = {}
+        self._devices: Dict[str, str] = {}
+        self._stats: Dict[str, dict] = {}
+        # name -> lock held while the model is loaded, restored or evicted
+        self._model_locks: Dict[str, threading.Lock] = {}
+        # name -> number of callers currently using the model
+        self._leases: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    def register(self, name: str, factory: Callable[[], GemmaBasedModel]) -> None:
+        self._factories[name] = factory
+        self._model_locks[name] = threading.Lock()
+        self._leases[name] = 0
+        self._stats[name] = dict(loads=0, unloads=0, offloads=0, hits=0, load_seconds=0.0, footprint_bytes=0)
+
+    def get(self, name: str) -> GemmaBasedModel:
+        """
+        Returns the model, loading (or restoring from the CPU) it if needed. The model is not
+        leased, so it may be evicted while the caller still uses it; generate through `handle`.
+        """
+        model = self._acquire(name)
+        self._release(name)
+        return model
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[GemmaBasedModel]:
+        """The model, loaded if needed and neither evicted nor offloaded until the block exits."""
+        model = self._acquire(name)
+        try:
+            yield model
+        finally:
+            self._release(name)
+
+    def handle(self, name: str) -> LeasedModel:
+        """A stand-in for the model that leases it for every call (see LeasedModel)."""
+        return LeasedModel(self, name)
+
+    def unload(self, name: str) -> None:
+        with self._model_locks[name]:
+            with self._lock:
+                if self._leases[name]:
+                    print(f"-model registry: {name} is in use, not unloaded")
+                    return
+                model = self._resident.pop(name, None) or self._offloaded.pop(name, None)
+                if model is None: return
+                self._stats[name]["unloads"] += 1
+
+            del model
+            self._free_memory()
+            print(f"-model registry: {name} unloaded")
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._resident
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "resident_bytes": self._resident_bytes(),
+                "models": {
+                    name: {
+                        **stats,
+                        "load_seconds": round(stats["load_seconds"], 2),
+                        "in_use": self._leases[name],
+                        "state": "loaded" if name in self._resident
+                                 else "offloaded" if name in self._offloaded
+                                 else "unloaded",
+                    }
+                    for name, stats in self._stats.items()
+                },
+            }
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _acquire(self, name: str) -> GemmaBasedModel:
+        """Returns the model with one more lease on it, loading or restoring it if needed."""
+        with self._lock:
+            if name in self._resident:
+                return self._hit(name)
+
+        with self._model_locks[name]:
+            with self._lock:
+                # Another thread may have loaded it while this one waited for the model's lock
+                if name in self._resident:
+                    return self._hit(name)
+                model = self._offloaded.pop(name, None)
+
+            start = time.perf_counter()
+            restored = model is not None
+            if restored:
+                try:
+                    model.move_to(self._devices[name])
+                except BaseException:
+                    with self._lock:
+                        self._offloaded[name] = model
+                    raise
+                print(f"-model registry: {name} restored to {self._devices[name]}")
+            else:
+                print(f"-model registry: loading {name}...")
+                model = self._factories[name]()
+                self._devices[name] = str(getattr(model.model, "device", "cpu"))
+
+            with self._lock:
+                stats = self._stats[name]
+                stats["loads"] += 0 if restored else 1
+                stats["load_seconds"] += time.perf_counter() - start
+                stats["footprint_bytes"] = model.memory_footprint()
+                self._resident[name] = model
+                self._leases[name] += 1
+                victims = self._pick_victims(keep=name)
+
+        self._evict(victims)
+        return model
+
+    def _hit(self, name: str) -> GemmaBasedModel:
+        # Called with self._lock held
+        self._stats[name]["hits"] += 1
+        self._resident.move_to_end(name)
+        self._leases[name] += 1
+        return self._resident[name]
+
+    def _release(self, name: str) -> None:
+        with self._lock:
+            self._leases[name] -= 1
+            # The budget may have been left unmet because of this lease
+            victims = self._pick_victims(keep=name)
+        self._evict(victims)
+
+    def _resident_bytes(self) -> int:
+        return sum(self._stats[name]["footprint_bytes"] for name in self._resident)
+
+    def _pick_victims(self, keep: str) -> list:
+        """
+        Takes the least recently used models out of the resident set until the budget fits,
+        skipping `keep` and the leased ones. Called with self._lock held; each victim's own
+        lock is taken here and released by `_evict`, which does the slow part.
+        """
+        if self.memory_budget_bytes is None: return []
+
+        victims = []
+        for name in list(self._resident):
+            if self._resident_bytes() <= self.memory_budget_bytes: break
+            if name == keep or self._leases[name]: continue
+            # A model whose lock is taken is being loaded or evicted by another thread right now
+            if not self._model_locks[name].acquire(blocking=False): continue
+            victims.append((name, self._resident.pop(name)))
+        return victims
+
+    def _evict(self, victims: list) -> None:
+        while victims:
+            # Popped so that no reference is left behind once an unloaded model is dropped
+            name, model = victims.pop()
+            try:
+                if self.offload_to_cpu:
+                    model.move_to("cpu")
+                    with self._lock:
+                        self._offloaded[name] = model
+                        self._stats[name]["offloads"] += 1
+                    print(f"-model registry: {name} offloaded to cpu to stay within budget")
+                else:
+                    with self._lock:
+                        self._stats[name]["unloads"] += 1
+                    del model
+                    print(f"-model registry: {name} unloaded")
+                self._free_memory()
+            finally:
+                self._model_locks[name].release()
+
+    def _free_memory(self) -> None:
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+class LeasedModel:
+    """
+    Stands in for a registered model: every method call resolves the model through the
+    registry and leases it for the duration of the call, so it is loaded if needed and is
+    not evicted or offloaded while it generates. `stream_prompt` keeps its lease until the
+    stream is exhausted or closed.
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def stream_prompt(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        with self._registry.lease(self._name) as model:
+            yield from model.stream_prompt(messages)
+
+    def __getattr__(self, item):
+        # Only called for attributes the handle itself doesn't have
+        with self._registry.lease(self._name) as model:
+            attribute = getattr(model, item)
+        # Only the model's own methods are leased; attributes such as the tokenizer are callable too
+        if not inspect.ismethod(attribute): return attribute
+
+        def leased(*args, **kwargs):
+            with self._registry.lease(self._name) as model:
+                return getattr(model, item)(*args, **kwargs)
+        return leased
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class ModelTier(Enum):
+    """
+    Cost class of the model behind an agent. Each cluster agent declares one, and
+    LlmSingleton.for_tier resolves it to a concrete model.
+    """
+    CANNED = "canned"  # fixed replies for the most common messages; other turns run on the SMALL model
+    SMALL = "small"  # Gemma 3 1B: small talk, routing, tool calling
+    LARGE = "large"  # MedGemma 27B: clinical reasoning
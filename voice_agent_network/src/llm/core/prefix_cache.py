@@ -0,0 +1,116 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import List, Dict
+
+import torch
+from transformers import DynamicCache
+
+
+class PrefixCache:
+    """
+    Keeps the precomputed `past_key_values` of static system prompts so that only the
+    per-turn part of a prompt is prefilled.
+
+    The key is the rendered system prefix, so the entry is shared by every turn and every
+    session that uses the same system prompt. Entries are kept in least-recently-used order
+    and the oldest is dropped once `max_entries` is exceeded. Each call gets a deep copy of
+    the cached KV tensors, because `generate` appends to the cache it is given.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+
+        # rendered system prefix -> (prefix token ids, DynamicCache)
+        self._entries: OrderedDict[str, tuple[torch.Tensor, DynamicCache]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "reused_tokens": 0}
+
+    # ---- Public API --------------------------------------------------------------
+    def lookup(self, model, tokenizer, messages: List[Dict], input_ids: torch.Tensor):
+        """
+        Returns a private copy of the KV cache for the system prefix of `messages`, or None
+        when the prompt has no system message or its prefix can't be reused.
+
+        `input_ids` is the tokenized full prompt (batch of one) that will be passed to `generate`.
+        """
+        if self.max_entries <= 0: return None
+
+        system_messages = self._leading_system_messages(messages)
+        if not system_messages: return None
+
+        key = self._render_prefix(tokenizer, system_messages)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            entry = self._build(model, tokenizer, key, input_ids)
+            if entry is None: return None
+
+        prefix_ids, cache = entry
+        prefix_len = prefix_ids.shape[-1]
+        # generate() needs at least one uncached token, and the prompt must really start with the prefix
+        if input_ids.shape[-1] <= prefix_len or not torch.equal(input_ids[0, :prefix_len], prefix_ids):
+            return None
+
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["reused_tokens"] += prefix_len
+        return copy.deepcopy(cache)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}
+
+    # ---- Internal Methods --------------------------------------------------------
+    @staticmethod
+    def _leading_system_messages(messages: List[Dict]) -> List[Dict]:
+        system_messages = []
+        for message in messages:
+            if message["role"] != "system": break
+            system_messages.append(message)
+        return system_messages
+
+    @staticmethod
+    def _render_prefix(tokenizer, system_messages: List[Dict]) -> str:
+        # Some templates (Gemma) only print the system prompt in front of the first user turn,
+        # so a placeholder turn is rendered and everything before it is the static prefix.
+        sentinel = "\u2063PREFIX_END\u2063"
+        rendered = tokenizer.apply_chat_template(system_messages + [{"role": "user", "content": sentinel}],
+                                                 tokenize=False)
+        return rendered[:rendered.index(sentinel)]
+
+    def _build(self, model, tokenizer, key: str, input_ids: torch.Tensor):
+        prefix_ids = tokenizer(key, add_special_tokens=False, return_tensors="pt")["input_ids"][0]
+        prefix_ids = prefix_ids.to(input_ids.device)
+
+        # The last prefix token may merge with the text that follows it (e.g. "\n\n" + user turn),
+        # so only the part that the full prompt actually shares is cached.
+        limit = min(prefix_ids.shape[-1], input_ids.shape[-1] - 1)
+        mismatch = (prefix_ids[:limit] != input_ids[0, :limit]).nonzero()
+        shared = int(mismatch[0]) if mismatch.numel() else limit
+        # Keep one token of margin, since the boundary token may tokenize differently in later turns
+        shared -= 1
+        if shared <= 0: return None
+        prefix_ids = input_ids[0, :shared].clone()
+
+        cache = DynamicCache()
+        with torch.inference_mode():
+            model(input_ids=prefix_ids.unsqueeze(0), past_key_values=cache, use_cache=True)
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._entries[key] = (prefix_ids, cache)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        print(f"-prefix cache: cached {shared} system prompt tokens ({len(self._entries)} entries)")
+        return prefix_ids, cache
@@ -0,0 +1,184 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple
+
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, AIMessage, ToolMessage
+
+
+class PromptBudget(NamedTuple):
+    total: int  # tokens for the whole prompt, chat template markers included
+    tool_result: int  # tokens kept of any single tool result
+
+
+class PromptReport(NamedTuple):
+    agent: str
+    system: int
+    history: int
+    tool_results: int
+    total: int
+    budget: int
+    dropped: int  # history messages left out to fit the budget
+
+
+class PromptBuilder:
+    """
+    Fits an agent's messages into its token budget before they reach the model.
+
+    Tokens are counted with the model's own tokenizer, loaded once per model folder and kept
+    with a cache of per-text counts, so a long dialog is only tokenized as it grows. GGUF
+    models count with llama.cpp; anything else falls back to ~4 characters per token.
+
+    The prompt is split into sections: system (the instructions), tool results (ToolMessages
+    and the AIMessages carrying tool calls) and history (everything else). Tool results longer
+    than `tool_result` tokens are cut; then, while the prompt is over `total`, the oldest turns
+    are dropped a whole user turn at a time, so the kept history still starts with the user.
+    The latest turn is always kept. Compacting old turns into a summary is the DialogSummarizer's
+    job upstream, this is the hard limit behind it. Every call prints its per-section counts.
+
+    Budgets are declared per agent in BUDGETS; PROMPT_BUDGET_<AGENT> overrides the total.
+    """
+
+    BUDGETS: dict[str, PromptBudget] = {
+        "diagnosis": PromptBudget(total=6000, tool_result=1000),
+        "appointment": PromptBudget(total=3000, tool_result=600),
+        "small_talk": PromptBudget(total=1500, tool_result=300),
+        "out_of_topic": PromptBudget(total=1500, tool_result=300),
+        "topic_router": PromptBudget(total=3000, tool_result=300),
+    }
+    DEFAULT_BUDGET = PromptBudget(total=3000, tool_result=600)
+
+    # <start_of_turn>role\n ... <end_of_turn>\n around every message
+    TURN_OVERHEAD = 5
+
+    def __init__(self, max_cached_counts: int = 20_000):
+        self.max_cached_counts = max_cached_counts
+
+        # model folder -> token counting function
+        self._counters: dict[str, Callable[[str], int]] = {}
+        # (model folder, text) -> token count, in LRU order
+        self._counts: OrderedDict[tuple[str, str], int] = OrderedDict()
+        # agent -> report of its latest prompt
+        self._reports: dict[str, PromptReport] = {}
+        self._lock = threading.Lock()
+
+    # ---- Public API --------------------------------------------------------------
+    def budget_for(self, agent: str) -> PromptBudget:
+        budget = self.BUDGETS.get(agent, self.DEFAULT_BUDGET)
+        total = os.getenv(f"PROMPT_BUDGET_{agent.upper()}")
+        return budget._replace(total=int(total)) if total else budget
+
+    def build(self, agent: str, model, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Returns `messages` trimmed to the agent's budget, counting with `model`'s tokenizer."""
+        budget = self.budget_for(agent)
+        key, counter = self._counter_for(model)
+
+        def count(message: BaseMessage) -> int:
+            return self._count(key, counter, _text_of(message)) + self.TURN_OVERHEAD
+
+        messages = [self._cut_tool_result(m, budget.tool_result, key, counter) if isinstance(m, ToolMessage) else m
+                    for m in messages]
+        system = [m for m in messages if isinstance(m, SystemMessage)]
+        dialog = [m for m in messages if not isinstance(m, SystemMessage)]
+
+        counts = [count(m) for m in dialog]
+        total = sum(count(m) for m in system) + sum(counts)
+
+        # Drop whole user turns from the front while over budget, keeping the latest turn
+        start = 0
+        while total > budget.total:
+            end = next((i for i in range(start + 1, len(dialog)) if isinstance(dialog[i], HumanMessage)), None)
+            if end is None: break
+            total -= sum(counts[start:end])
+            start = end
+
+        kept = dialog[start:]
+        report = PromptReport(
+            agent=agent,
+            system=sum(count(m) for m in system),
+            history=sum(c for m, c in zip(kept, counts[start:]) if not _is_tool_traffic(m)),
+            tool_results=sum(c for m, c in zip(kept, counts[start:]) if _is_tool_traffic(m)),
+            total=total,
+            budget=budget.total,
+            dropped=start,
+        )
+        with self._lock:
+            self._reports[agent] = report
+
+        print(f"-prompt[{agent}]: system {report.system} + history {report.history} + tool results "
+              f"{report.tool_results} = {report.total}/{report.budget} tokens"
+              + (f" ({report.dropped} old messages dropped)" if report.dropped else ""))
+        if total > budget.total:
+            print(f"-prompt[{agent}]: the latest turn alone is over budget")
+
+        return system + kept
+
+    def reports(self) -> dict[str, PromptReport]:
+        with self._lock:
+            return dict(self._reports)
+
+    # ---- Internal Methods --------------------------------------------------------
+    def _counter_for(self, model) -> tuple[str, Callable[[str], int]]:
+        key = getattr(model, "folder_path", None) or type(model).__name__
+        with self._lock:
+            counter = self._counters.get(key)
+        if counter is not None:
+            return key, counter
+
+        counter = self._load_counter(model)
+        with self._lock:
+            self._counters[key] = counter
+        return key, counter
+
+    @staticmethod
+    def _load_counter(model) -> Callable[[str], int]:
+        tokenizer = getattr(model, "tokenizer", None) or getattr(model, "processor", None)
+        tokenizer = getattr(tokenizer, "tokenizer", tokenizer)  # multimodal processors wrap one
+        if tokenizer is not None:
+            return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+        tokenize = getattr(getattr(model, "model", None), "tokenize", None)  # llama.cpp
+        if tokenize is not None:
+            return lambda text: len(tokenize(text.encode("utf-8"), add_bos=False, special=True))
+
+        print(f"-prompt builder: no tokenizer for {type(model).__name__}, estimating token counts")
+        return lambda text: len(text) // 4
+
+    def _count(self, key: str, counter: Callable[[str], int], text: str) -> int:
+        with self._lock:
+            count = self._counts.get((key, text))
+            if count is not None:
+                self._counts.move_to_end((key, text))
+                return count
+
+        count = counter(text)
+        with self._lock:
+            self._counts[(key, text)] = count
+            if len(self._counts) > self.max_cached_counts:
+                self._counts.popitem(last=False)
+        return count
+
+    def _cut_tool_result(self, message: ToolMessage, limit: int, key: str, counter: Callable[[str], int]) -> ToolMessage:
+        text = _text_of(message)
+        tokens = self._count(key, counter, text)
+        if tokens <= limit: return message
+
+        # Proportional cut on characters; tool results are JSON, so this is close enough
+        cut = text[:len(text) * limit // tokens]
+        return message.model_copy(update={"content": f"{cut} ...[kısaltıldı]"})
+
+
+def _text_of(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, list):
+        content = "\n".join(item["text"] if isinstance(item, dict) and "text" in item else str(item) for item in content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        content = f"{content}{message.tool_calls}"
+    return content
+
+
+def _is_tool_traffic(message: BaseMessage) -> bool:
+    return isinstance(message, ToolMessage) or (isinstance(message, AIMessage) and bool(message.tool_calls))
+
+
+promptBuilder = PromptBuilder()
@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import List, Dict, Optional, Tuple
+from contextlib import aclosing, closing
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from llm.core import LlmClient
+from llm.core.http_pool import httpPool
+import json
 import os
-import requests
 import sys
 
 try:
@@ -17,6 +19,9 @@ class GeminiClient(LlmClient):
     """
     Minimal wrapper for Google Gemini (generateContent) REST API,
     implemented on top of AIClient.
+
+    chat_stream uses streamGenerateContent with alt=sse; its endpoint is GEMINI_STREAM_ENDPOINT,
+    or GEMINI_ENDPOINT with :generateContent replaced.
     """
 
     def __init__(self, api_key: Optional[str] = None, endpoint: Optional[str] = None, timeout: int = 30, **kwargs):
@@ -30,8 +35,9 @@ class GeminiClient(LlmClient):
 
         if not self.api_key or not self.url:
             raise ValueError("Missing GEMINI_KEY or GEMINI_ENDPOINT")
+        self.stream_url = os.getenv("GEMINI_STREAM_ENDPOINT") or self.url.replace(":generateContent", ":streamGenerateContent")
 
-        self.session = requests.Session()
+        # Requests go through the shared pool (keep-alive, HTTP/2, per-host limits, retries)
         self.headers = {"Content-Type": "application/json"}
 
     # --- AIClient hooks -----------------------------------------------------
@@ -51,15 +57,28 @@ class GeminiClient(LlmClient):
         return payload
 
     def _post(self, payload: Dict) -> Dict:
-        r = self.session.post(
-            self.url,
-            params={"key": self.api_key},
-            headers=self.headers,
-            json=payload,
-            timeout=self.timeout,
-        )
-        r.raise_for_status()
-        return r.json()
+        return httpPool.post_json(self.url, payload, params={"key": self.api_key},
+                                  headers=self.headers, timeout=self.timeout)
+
+    async def _apost(self, payload: Dict) -> Dict:
+        return await httpPool.apost_json(self.url, payload, params={"key": self.api_key},
+                                         headers=self.headers, timeout=self.timeout)
+
+    def _post_stream(self, payload: Dict) -> Iterator[Dict]:
+        lines = httpPool.post_lines(self.stream_url, payload, params={"key": self.api_key, "alt": "sse"},
+                                    headers=self.headers, timeout=self.timeout)
+        with closing(lines):
+            for line in lines:
+                chunk = self._parse_sse_line(line)
+                if chunk is not None: yield chunk
+
+    async def _apost_stream(self, payload: Dict) -> AsyncIterator[Dict]:
+        lines = httpPool.apost_lines(self.stream_url, payload, params={"key": self.api_key, "alt": "sse"},
+                                     headers=self.headers, timeout=self.timeout)
+        async with aclosing(lines):
+            async for line in lines:
+                chunk = self._parse_sse_line(line)
+                if chunk is not None: yield chunk
 
     def _extract_text(self, resp: Dict) -> str:
         """
@@ -79,6 +98,13 @@ class GeminiClient(LlmClient):
 
     # --- Internals ----------------------------------------------------------
 
+    @staticmethod
+    def _parse_sse_line(line: str) -> Optional[Dict]:
+        # Every event is a single "data: {GenerateContentResponse}" line; other fields are ignored
+        if not line.startswith("data:"): return None
+        data = line[len("data:"):].strip()
+        return json.loads(data) if data else None
+
     def _split_messages(self, messages_json: List[Dict]) -> Tuple[Optional[str], List[Dict]]:
         system_prompt = None
         contents: List[Dict] = []
@@ -1,9 +1,205 @@
 from __future__ import annotations
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from threading import Thread
+from typing import List, Dict, Iterator
+
+import torch
+from transformers import DynamicCache, TextIteratorStreamer
 
 
 class GemmaBasedModel:
+    # The loaded backend model (set by subclasses)
+    model = None
+    # {"new_tokens", "seconds", "tokens_per_second"} of the latest generation
+    last_generation_stats = None
+    # PrefixCache of the static system prompts (Hugging Face backends only)
+    prefix_cache = None
+
     @abstractmethod
     def give_prompt(self, messages: List[Dict[str, str]]) -> str:
         raise NotImplementedError
+
+    def give_prompt_batch(self, messages_batch: List[List[Dict[str, str]]]) -> List[str]:
+        """Answers several independent chats. Backends without batching answer them one by one."""
+        return [self.give_prompt(messages) for messages in messages_batch]
+
+    def give_choice(self, messages: List[Dict[str, str]], choices: List[str]) -> str:
+        """
+        Answers with exactly one of `choices`. Backends without constrained decoding generate
+        freely and return the first choice found in the response (or the raw response).
+        """
+        response = self.give_prompt(messages)
+        return next((choice for choice in choices if choice.upper() in response.upper()), response)
+
+    def score_choices(self, messages: List[Dict[str, str]], choices: List[str]) -> List[float]:
+        """
+        Returns the mean token log-probability of each choice being the response. Backends without
+        access to the logits pick one choice with `give_choice` and score it 0, the others -inf.
+        """
+        chosen = self.give_choice(messages, choices)
+        return [0.0 if choice == chosen else float("-inf") for choice in choices]
+
+    def stream_prompt(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Yields the response as text deltas. Backends without streaming yield it in one piece."""
+        yield self.give_prompt(messages)
+
+    def memory_footprint(self) -> int:
+        """Returns the bytes held by the loaded weights, or 0 if the backend cannot tell."""
+        get_memory_footprint = getattr(self.model, "get_memory_footprint", None)
+        return get_memory_footprint() if get_memory_footprint else 0
+
+    def move_to(self, device: str) -> None:
+        """Moves the weights to another device (e.g. "cpu" to offload, "cuda" to restore)."""
+        self.model.to(device)
+        if self.prefix_cache is not None:
+            # The cached KV tensors live on the old device
+            self.prefix_cache.clear()
+
+    def _generate_batch(self, tokenizer, messages_batch: List[List[Dict[str, str]]]) -> List[str]:
+        """One padded `generate` call for several chats; the tokenizer must pad on the left."""
+        inputs = tokenizer.apply_chat_template(
+            messages_batch,
+            add_generation_prompt=True,
+            tokenize=True,
+            padding=True,
+            return_dict=True,
+            return_tensors="pt",
+        ).to(self.model.device)
+
+        # With left padding every prompt ends at the same position
+        input_len = inputs["input_ids"].shape[-1]
+
+        with torch.inference_mode():
+            started_at = time.perf_counter()
+            generation = self.model.generate(**inputs, **self.model_settings)[:, input_len:]
+            self._record_generation(int((generation != tokenizer.pad_token_id).sum()), started_at)
+
+        return tokenizer.batch_decode(generation, skip_special_tokens=True)
+
+    def _generate_choice(self, tokenizer, inputs, choices: List[str], past_key_values=None) -> str:
+        """
+        Greedy decoding restricted to the token sequences of `choices`: a trie of the choices'
+        tokens decides which tokens may follow the ones generated so far, so the output is
+        always one of them and generation stops right after it.
+        """
+        eos_token_id = self.model.generation_config.eos_token_id
+        if isinstance(eos_token_id, list): eos_token_id = eos_token_id[0]
+
+        # token id -> child node; the None key marks the end of a choice
+        trie = {}
+        depth = 0
+        for choice in choices:
+            token_ids = tokenizer.encode(choice, add_special_tokens=False)
+            depth = max(depth, len(token_ids))
+            node = trie
+            for token_id in token_ids:
+                node = node.setdefault(token_id, {})
+            node[None] = choice
+
+        input_len = inputs["input_ids"].shape[-1]
+
+        def walk(token_ids):
+            node = trie
+            for token_id in token_ids:
+                node = node.get(token_id)
+                if node is None: return None
+            return node
+
+        def allowed_tokens(batch_id, input_ids):
+            node = walk(input_ids[input_len:].tolist())
+            if node is None: return [eos_token_id]
+            allowed = [token_id for token_id in node if token_id is not None]
+            return allowed + [eos_token_id] if None in node or not allowed else allowed
+
+        settings = dict(self.model_settings, max_new_tokens=depth + 1, do_sample=False,
+                        temperature=None, top_p=None, top_k=None)
+        with torch.inference_mode():
+            started_at = time.perf_counter()
+            generation = self.model.generate(**inputs, **settings, past_key_values=past_key_values,
+                                             prefix_allowed_tokens_fn=allowed_tokens)[0][input_len:]
+            self._record_generation(generation.shape[-1], started_at)
+
+        token_ids = [token_id for token_id in generation.tolist() if token_id != eos_token_id]
+        node = walk(token_ids)
+        if node is not None and None in node:
+            return node[None]
+        return tokenizer.decode(token_ids, skip_special_tokens=True)
+
+    def _score_choices(self, tokenizer, messages: List[Dict[str, str]], choices: List[str]) -> List[float]:
+        """
+        Scores every choice by the mean log-probability of its tokens as the response.
+
+        The prompt is prefilled once, on top of the prefix cache of its system prompt. Choices
+        of a single token (e.g. option letters) are scored from that pass alone; longer ones
+        get one batched pass over their own tokens against the prompt's KV cache, repeated per
+        choice. The mean rather than the sum keeps short choices from winning for being short.
+        """
+        input_ids = tokenizer.apply_chat_template(messages, add_generation_prompt=True, tokenize=True,
+                                                  return_dict=True, return_tensors="pt")["input_ids"].to(self.model.device)
+        choice_ids = [tokenizer.encode(choice, add_special_tokens=False) for choice in choices]
+        max_len = max(len(ids) for ids in choice_ids)
+
+        with torch.inference_mode():
+            cache = self.prefix_cache.lookup(self.model, tokenizer, messages, input_ids) if self.prefix_cache is not None else None
+            cache = cache if cache is not None else DynamicCache()
+            # Only the prompt tokens the cache doesn't hold yet are encoded
+            prefill = self.model(input_ids=input_ids[:, cache.get_seq_length():], past_key_values=cache,
+                                 use_cache=True, logits_to_keep=1)
+            first_log_probs = prefill.logits[0, -1].float().log_softmax(dim=-1).cpu()
+            if max_len == 1:
+                return [first_log_probs[ids[0]].item() for ids in choice_ids]
+
+            # Every choice but its last token, right padded: with causal attention the padding
+            # only follows the real tokens, so it changes none of their predictions
+            rest = torch.full((len(choices), max_len - 1), tokenizer.pad_token_id or 0, dtype=torch.long)
+            for i, ids in enumerate(choice_ids):
+                rest[i, :len(ids) - 1] = torch.tensor(ids[:-1], dtype=torch.long)
+            cache.batch_repeat_interleave(len(choices))
+            # logits[:, j] is the prediction for token j + 1 of the choice
+            logits = self.model(input_ids=rest.to(self.model.device), past_key_values=cache, use_cache=True).logits
+            log_probs = logits.float().log_softmax(dim=-1).cpu()
+
+        scores = []
+        for i, ids in enumerate(choice_ids):
+            total = first_log_probs[ids[0]].item() + sum(log_probs[i, j - 1, ids[j]].item() for j in range(1, len(ids)))
+            scores.append(total / len(ids))
+        return scores
+
+    def _stream_generate(self, tokenizer, inputs, generate_kwargs: dict) -> Iterator[str]:
+        """
+        Runs `model.generate` on a background thread and yields the decoded text as it is produced.
+        An exception raised by generate is re-raised here once the stream has been drained.
+        """
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        input_len = inputs["input_ids"].shape[-1]
+        result = {}
+
+        def generate():
+            try:
+                with torch.inference_mode():
+                    result["output"] = self.model.generate(**inputs, **generate_kwargs, streamer=streamer)
+            except BaseException as e:
+                result["error"] = e
+                streamer.end()  # unblocks the consumer
+
+        started_at = time.perf_counter()
+        thread = Thread(target=generate, daemon=True)
+        thread.start()
+
+        for delta in streamer:
+            if delta:
+                yield delta
+
+        thread.join()
+        if "error" in result:
+            raise result["error"]
+        self._record_generation(result["output"].shape[-1] - input_len, started_at)
+
+    def _record_generation(self, new_tokens: int, started_at: float) -> None:
+        seconds = time.perf_counter() - started_at
+        self.last_generation_stats = {
+            "new_tokens": new_tokens,
+            "seconds": round(seconds, 3),
+            "tokens_per_second": round(new_tokens / seconds, 2) if seconds > 0 else 0.0,
+        }
@@ -1,9 +1,12 @@
-from llm.core.devices import Device
+from llm.core.devices import Device, CpuPrecision, resolve_device, torch_dtype_for, prepare_for_cpu
+from llm.core.prefix_cache import PrefixCache
 from transformers import (BitsAndBytesConfig, AutoModelForCausalLM, AutoTokenizer)
 import torch
 import os
+import json
+import time
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 from llm.llm_models import GemmaBasedModel
 
@@ -44,11 +47,22 @@ class Gemma(GemmaBasedModel):
                  use_quantized: bool,
                  is_thinking: bool = False,
                  device_map: Device = Device.AUTO,
+                 cpu_precision: CpuPrecision = CpuPrecision.FLOAT32,
+                 num_threads: int = None,
+                 n_ctx: int = 4096,
+                 kv_cache_mb: int = 512,
+                 prefix_cache_size: int = 16,
                  model_variant: Variant = Variant.GEMMA_3_1B_IT):
 
         # Store the variant and device as instance variables
         self.model_variant = model_variant
-        self.device_map = device_map
+        # Falls back to the CPU on nodes without the requested accelerator
+        self.device_map = resolve_device(device_map)
+        self.cpu_precision = cpu_precision
+        self.num_threads = num_threads
+        # GGUF (llama.cpp) only: context window and size of the cross-call KV state cache
+        self.n_ctx = n_ctx
+        self.kv_cache_mb = kv_cache_mb
         self.use_quantized = use_quantized
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.folder_path = os.path.join(script_dir, self.model_variant._folder_name)
@@ -57,6 +71,7 @@ class Gemma(GemmaBasedModel):
         self.model = self._load_model(use_quantized)
         if not self.model_variant._is_gguf:
             self.tokenizer = self._load_tokenizer()
+            self.prefix_cache = PrefixCache(max_entries=prefix_cache_size)
         else:
             self.tokenizer = None  # GGUF models don't need a separate Hugging Face tokenizer
 
@@ -70,15 +85,14 @@ class Gemma(GemmaBasedModel):
     def _load_model(self, use_quantized: bool):
         """
         Loads the Gemma model from a local directory.
-        Quantizes the model to 4-bit if `use_quantized` is True.
+        Quantizes the model to 4-bit if `use_quantized` is True. On the CPU the weights are
+        loaded in float32 (bitsandbytes needs CUDA) and `cpu_precision` is applied instead.
         """
 
         if self.model_variant._is_gguf:
             # Dynamically find the .gguf file within the model directory.
             gguf_filename = None
 
-            # This will print the directory your script is currently running in
-            print(os.getcwd())
             for file in os.listdir(self.folder_path):
                 if file.endswith(".gguf"):
                     gguf_filename = file
@@ -87,21 +101,48 @@ class Gemma(GemmaBasedModel):
             if not gguf_filename:
                 raise FileNotFoundError(f"No .gguf file found in the directory: {self.folder_path}")
 
-            # model = Llama(self.folder_path + "/" + gguf_filename)
+            model = self._load_gguf(os.path.join(self.folder_path, gguf_filename))
 
         else:
             # For other Hugging Face models, use AutoModelForCausalLM.
-            quantization_config = BitsAndBytesConfig(load_in_4bit=True) if use_quantized else None
+            on_cpu = self.device_map == Device.CPU
+            quantization_config = BitsAndBytesConfig(load_in_4bit=True) if use_quantized and not on_cpu else None
 
             model = AutoModelForCausalLM.from_pretrained(
                 self.folder_path,
-                torch_dtype=torch.bfloat16,
+                torch_dtype=torch_dtype_for(self.device_map),
                 device_map=self.device_map.value,
                 quantization_config=quantization_config
             )
+            if on_cpu:
+                model = prepare_for_cpu(model, self.cpu_precision, self.num_threads)
 
         return model
 
+    def _load_gguf(self, model_path: str):
+        """
+        Loads a GGUF model with llama.cpp. The weights are memory-mapped, so several workers on
+        one host share the same pages. llama.cpp keeps the KV state of the last prompt and only
+        evaluates the tokens after the common prefix; the RAM cache additionally keeps the states
+        of earlier prompts, so alternating system prompts don't evict each other.
+        """
+        try:
+            from llama_cpp import Llama, LlamaRAMCache
+        except ImportError as e:
+            raise ImportError("GGUF variants need llama.cpp bindings: pip install llama-cpp-python") from e
+
+        model = Llama(model_path=model_path,
+                      n_ctx=self.n_ctx,
+                      n_threads=self.num_threads,
+                      n_gpu_layers=0 if self.device_map == Device.CPU else -1,
+                      use_mmap=True,
+                      verbose=False)
+        if self.kv_cache_mb:
+            model.set_cache(LlamaRAMCache(capacity_bytes=self.kv_cache_mb << 20))
+
+        print(f"-gguf: {os.path.basename(model_path)} loaded (n_ctx={self.n_ctx}, n_threads={model.n_threads})")
+        return model
+
     def _load_tokenizer(self):
         """
         Loads the tokenizer for the non-GGUF model variants.
@@ -112,6 +153,8 @@ class Gemma(GemmaBasedModel):
 
         # Use .folder_name to get the string from the Enum
         tokenizer = AutoTokenizer.from_pretrained(self.folder_path)
+        # Batched prompts must end at the same position for generation, so pad on the left
+        tokenizer.padding_side = "left"
         return tokenizer
 
     def set_model_settings(self,
@@ -150,17 +193,121 @@ class Gemma(GemmaBasedModel):
         if self.model_variant._is_gguf:
             # For GGUF models, use the create_chat_completion method.
             # The response is a dictionary, so we extract the text content.
-            response = self.model.create_chat_completion(
-                messages=messages,
-                max_tokens=self.model_settings.get('max_new_tokens'),
-                temperature=self.model_settings.get('temp') or 0.2,
-                top_p=self.model_settings.get('top_p') or 0.95,
-                top_k=self.model_settings.get('top_k') or 40
-            )
+            started_at = time.perf_counter()
+            response = self.model.create_chat_completion(messages=self._to_plain_messages(messages),
+                                                         **self._gguf_settings())
+            self._record_generation(response['usage']['completion_tokens'], started_at)
             return response['choices'][0]['message']['content']
 
+        inputs = self._tokenize(messages)
+        input_len = inputs["input_ids"].shape[-1]
+
+        # Disables gradient calculations for faster inference
+        with torch.inference_mode():
+            started_at = time.perf_counter()
+            # Reuses the prefilled KV cache of the system prompt, so only the rest of the prompt is encoded
+            past_key_values = self.prefix_cache.lookup(self.model, self.tokenizer, messages, inputs["input_ids"])
+            # **self.model_settings dynamically unpacks the dictionary for model generation
+            generation = self.model.generate(**inputs, **self.model_settings, past_key_values=past_key_values)
+            generation = generation[0][input_len:]
+            self._record_generation(generation.shape[-1], started_at)
+
+        # Decodes the generated token IDs back into a readable string
+        response = self.tokenizer.decode(generation, skip_special_tokens=True)
+        return response
+
+    def give_prompt_batch(self, messages_batch: List[List[Dict[str, str]]]) -> List[str]:
+        """
+        Generates responses for several independent chats in one padded forward pass.
+
+        Args:
+            messages_batch (List[List[Dict[str, str]]]): One chat history per request.
+
+        Returns:
+            List[str]: The generated responses, in the order of `messages_batch`.
+        """
+        # llama.cpp serves one sequence at a time; a single chat keeps the prefix cache
+        if self.model_variant._is_gguf or len(messages_batch) == 1:
+            return super().give_prompt_batch(messages_batch)
+
+        return self._generate_batch(self.tokenizer, messages_batch)
+
+    def give_choice(self, messages: List[Dict[str, str]], choices: List[str]) -> str:
+        """
+        Generates a response that is exactly one of `choices` (constrained decoding).
+
+        Args:
+            messages (List[Dict[str, str]]): A list of dictionaries representing the chat history.
+            choices (List[str]): The allowed answers.
+
+        Returns:
+            str: The chosen answer.
+        """
+        if self.model_variant._is_gguf:
+            from llama_cpp import LlamaGrammar
+
+            # GBNF grammar whose only sentences are the choices
+            grammar = LlamaGrammar.from_string(
+                "root ::= " + " | ".join(json.dumps(choice, ensure_ascii=False) for choice in choices), verbose=False)
+            started_at = time.perf_counter()
+            response = self.model.create_chat_completion(messages=self._to_plain_messages(messages), grammar=grammar,
+                                                         **dict(self._gguf_settings(), temperature=0.0))
+            self._record_generation(response['usage']['completion_tokens'], started_at)
+            return response['choices'][0]['message']['content']
+
+        inputs = self._tokenize(messages)
+        with torch.inference_mode():
+            past_key_values = self.prefix_cache.lookup(self.model, self.tokenizer, messages, inputs["input_ids"])
+        return self._generate_choice(self.tokenizer, inputs, choices, past_key_values)
+
+    def score_choices(self, messages: List[Dict[str, str]], choices: List[str]) -> List[float]:
+        """
+        Scores how likely each choice is as the response, prefilling the prompt only once.
+
+        Args:
+            messages (List[Dict[str, str]]): A list of dictionaries representing the chat history.
+            choices (List[str]): The candidate responses.
+
+        Returns:
+            List[float]: The mean token log-probability of each choice.
+        """
+        # llama.cpp has no batched scoring; the grammar-constrained choice is used instead
+        if self.model_variant._is_gguf:
+            return super().score_choices(messages, choices)
+
+        return self._score_choices(self.tokenizer, messages, choices)
+
+    def stream_prompt(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Same as `give_prompt`, but yields the response as text deltas while it is being generated.
+
+        Args:
+            messages (List[Dict[str, str]]): A list of dictionaries representing the chat history.
+
+        Yields:
+            str: The next piece of the generated text.
+        """
+        if self.model_variant._is_gguf:
+            started_at = time.perf_counter()
+            new_tokens = 0
+            for chunk in self.model.create_chat_completion(messages=self._to_plain_messages(messages),
+                                                           stream=True, **self._gguf_settings()):
+                delta = chunk['choices'][0]['delta'].get('content')
+                if delta:
+                    new_tokens += 1  # llama.cpp streams one token per chunk
+                    yield delta
+            self._record_generation(new_tokens, started_at)
+            return
+
+        inputs = self._tokenize(messages)
+        with torch.inference_mode():
+            past_key_values = self.prefix_cache.lookup(self.model, self.tokenizer, messages, inputs["input_ids"])
+        yield from self._stream_generate(self.tokenizer, inputs,
+                                         dict(self.model_settings, past_key_values=past_key_values))
+
+    def _tokenize(self, messages: List[Dict[str, str]]):
         # Prepares the messages into a format the Hugging Face model understands
-        inputs = self.tokenizer.apply_chat_template(
+        return self.tokenizer.apply_chat_template(
             messages,
             add_generation_prompt=True,
             tokenize=True,
@@ -168,14 +315,32 @@ class Gemma(GemmaBasedModel):
             return_tensors="pt",
         ).to(self.model.device)
 
-        input_len = inputs["input_ids"].shape[-1]
+    def _gguf_settings(self) -> dict:
+        # model_settings translated to llama.cpp's sampling arguments
+        return dict(max_tokens=self.model_settings.get('max_new_tokens'),
+                    # do_sample=False means greedy decoding, as on the Hugging Face path
+                    temperature=(self.model_settings.get('temperature') or 0.2) if self.model_settings.get('do_sample') else 0.0,
+                    top_p=self.model_settings.get('top_p') or 0.95,
+                    top_k=self.model_settings.get('top_k') or 40)
 
-        # Disables gradient calculations for faster inference
-        with torch.inference_mode():
-            # **self.model_settings dynamically unpacks the dictionary for model generation
-            generation = self.model.generate(**inputs, **self.model_settings)
-            generation = generation[0][input_len:]
+    def memory_footprint(self) -> int:
+        if self.model_variant._is_gguf:
+            # The mapped file is what the weights occupy once every page has been touched
+            return os.path.getsize(self.model.model_path)
+        return super().memory_footprint()
 
-        # Decodes the generated token IDs back into a readable string
-        response = self.tokenizer.decode(generation, skip_special_tokens=True)
-        return response
\ No newline at end of file
+    def move_to(self, device: str) -> None:
+        # llama.cpp weights are memory-mapped and can't be moved; the OS pages them out instead
+        if not self.model_variant._is_gguf:
+            super().move_to(device)
+
+    @staticmethod
+    def _to_plain_messages(messages: List[Dict]) -> List[Dict[str, str]]:
+        """Flattens Hugging Face style content lists ([{"type": "text", ...}]) into plain strings for llama.cpp."""
+        plain = []
+        for message in messages:
+            content = message["content"]
+            if isinstance(content, list):
+                content = "".join(part.get("text", "") for part in content if part.get("type") == "text")
+            plain.append({"role": message["role"], "content": content})
+        return plain
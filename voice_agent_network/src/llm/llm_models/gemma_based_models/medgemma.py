@@ -1,11 +1,13 @@
 from llm.llm_models import GemmaBasedModel
-from llm.core.devices import Device
+from llm.core.devices import Device, CpuPrecision, resolve_device, torch_dtype_for, prepare_for_cpu
+from llm.core.prefix_cache import PrefixCache
 from transformers import (AutoProcessor, AutoModelForImageTextToText, BitsAndBytesConfig,
                           AutoModelForCausalLM, AutoTokenizer)
 import torch
 import os
+import time
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 
 class MedGemma(GemmaBasedModel):
@@ -28,17 +30,25 @@ class MedGemma(GemmaBasedModel):
                  use_quantized: bool,
                  is_thinking: bool = False,
                  device_map: Device = Device.AUTO,
+                 cpu_precision: CpuPrecision = CpuPrecision.FLOAT32,
+                 num_threads: int = None,
+                 prefix_cache_size: int = 16,
                  model_variant: Variant = Variant.MEDGEMMA_4B_IT):
 
         # We store the variant and device as instance variables
         self.model_variant = model_variant
-        self.device_map = device_map
+        # Falls back to the CPU on nodes without the requested accelerator
+        self.device_map = resolve_device(device_map)
+        self.cpu_precision = cpu_precision
+        self.num_threads = num_threads
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.folder_path = os.path.join(script_dir, model_variant.value)
         self.folder_path = os.path.normpath(self.folder_path)
 
         self.model = self._load_model(use_quantized)
         self.processor = self._load_processor()
+        # Image-text variants take pixel values along with the prompt, so only text variants reuse prefixes
+        self.prefix_cache = PrefixCache(max_entries=prefix_cache_size if "text" in model_variant.value else 0)
 
         # A dictionary to hold generation parameters, which can be easily updated.
         self.model_settings = dict(max_new_tokens=300,
@@ -50,26 +60,31 @@ class MedGemma(GemmaBasedModel):
     def _load_model(self, use_quantized: bool):
         """
         Loads the MedGemma model from a local directory.
-        Quantizes the model to 4-bit if `use_quantized` is True.
+        Quantizes the model to 4-bit if `use_quantized` is True. On the CPU the weights are
+        loaded in float32 (bitsandbytes needs CUDA) and `cpu_precision` is applied instead.
         """
-        quantization_config = BitsAndBytesConfig(load_in_4bit=True) if use_quantized else None
+        on_cpu = self.device_map == Device.CPU
+        quantization_config = BitsAndBytesConfig(load_in_4bit=True) if use_quantized and not on_cpu else None
 
         # Determine which model class to use based on the model variant name
         if "text" in self.model_variant.value:
             model = AutoModelForCausalLM.from_pretrained(
                 self.folder_path,
-                torch_dtype=torch.bfloat16,
+                torch_dtype=torch_dtype_for(self.device_map),
                 device_map=self.device_map.value,
                 quantization_config=quantization_config
             )
         else:
             model = AutoModelForImageTextToText.from_pretrained(
                 self.folder_path,
-                torch_dtype=torch.bfloat16,
+                torch_dtype=torch_dtype_for(self.device_map),
                 device_map=self.device_map.value,
                 quantization_config=quantization_config
             )
 
+        if on_cpu:
+            model = prepare_for_cpu(model, self.cpu_precision, self.num_threads)
+
         return model
 
     def _load_processor(self):
@@ -79,6 +94,8 @@ class MedGemma(GemmaBasedModel):
         # Use .value to get the string from the Enum
         if "text" in self.model_variant.value:
             processor = AutoTokenizer.from_pretrained(self.folder_path)
+            # Batched prompts must end at the same position for generation, so pad on the left
+            processor.padding_side = "left"
         else:
             processor = AutoProcessor.from_pretrained(self.folder_path)
 
@@ -118,23 +135,90 @@ class MedGemma(GemmaBasedModel):
         Returns:
             str: The generated text response.
         """
-        # Prepares the messages into a format the model understands
-        inputs = self.processor.apply_chat_template(
-            messages,
-            add_generation_prompt=True,
-            tokenize=True,
-            return_dict=True,
-            return_tensors="pt",
-        ).to(self.model.device)
-
+        inputs = self._tokenize(messages)
         input_len = inputs["input_ids"].shape[-1]
 
         # Disables gradient calculations for faster inference
         with torch.inference_mode():
+            started_at = time.perf_counter()
+            # Reuses the prefilled KV cache of the system prompt, so only the rest of the prompt is encoded
+            past_key_values = self.prefix_cache.lookup(self.model, self.processor, messages, inputs["input_ids"])
             # **self.model_settings dynamically unpacks the dictionary for model generation
-            generation = self.model.generate(**inputs, **self.model_settings)
+            generation = self.model.generate(**inputs, **self.model_settings, past_key_values=past_key_values)
             generation = generation[0][input_len:]
+            self._record_generation(generation.shape[-1], started_at)
 
         # Decodes the generated token IDs back into a readable string
         response = self.processor.decode(generation, skip_special_tokens=True)
-        return response
\ No newline at end of file
+        return response
+
+    def give_prompt_batch(self, messages_batch: List[List[Dict[str, str]]]) -> List[str]:
+        """
+        Generates responses for several independent chats in one padded forward pass.
+
+        Args:
+            messages_batch (List[List[Dict[str, str]]]): One chat history per request.
+
+        Returns:
+            List[str]: The generated responses, in the order of `messages_batch`.
+        """
+        # Image-text variants are answered one by one; a single chat keeps the prefix cache
+        if "text" not in self.model_variant.value or len(messages_batch) == 1:
+            return super().give_prompt_batch(messages_batch)
+
+        return self._generate_batch(self.processor, messages_batch)
+
+    def give_choice(self, messages: List[Dict[str, str]], choices: List[str]) -> str:
+        """
+        Generates a response that is exactly one of `choices` (constrained decoding).
+
+        Args:
+            messages (List[Dict[str, str]]): A list of dictionaries representing the chat history.
+            choices (List[str]): The allowed answers.
+
+        Returns:
+            str: The chosen answer.
+        """
+        inputs = self._tokenize(messages)
+        with torch.inference_mode():
+            past_key_values = self.prefix_cache.lookup(self.model, self.processor, messages, inputs["input_ids"])
+        return self._generate_choice(self.processor, inputs, choices, past_key_values)
+
+    def score_choices(self, messages: List[Dict[str, str]], choices: List[str]) -> List[float]:
+        """
+        Scores how likely each choice is as the response, prefilling the prompt only once.
+
+        Args:
+            messages (List[Dict[str, str]]): A list of dictionaries representing the chat history.
+            choices (List[str]): The candidate responses.
+
+        Returns:
+            List[float]: The mean token log-probability of each choice.
+        """
+        return self._score_choices(self.processor, messages, choices)
+
+    def stream_prompt(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Same as `give_prompt`, but yields the response as text deltas while it is being generated.
+
+        Args:
+            messages (List[Dict[str, str]]): A list of dictionaries representing the chat history.
+
+        Yields:
+            str: The next piece of the generated text.
+        """
+        inputs = self._tokenize(messages)
+        with torch.inference_mode():
+            past_key_values = self.prefix_cache.lookup(self.model, self.processor, messages, inputs["input_ids"])
+        yield from self._stream_generate(self.processor, inputs,
+                                         dict(self.model_settings, past_key_values=past_key_values))
+
+    def _tokenize(self, messages: List[Dict[str, str]]):
+        # Prepares the messages into a format the model understands
+        return self.processor.apply_chat_template(
+            messages,
+            add_generation_prompt=True,
+            tokenize=True,
+            return_dict=True,
+            return_tensors="pt",
+        ).to(self.model.device)
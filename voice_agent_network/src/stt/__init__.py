@@ -2,4 +2,5 @@
 from .base_stt import BaseSTT
 from .file_stt import FileSTT
 from .mic_stt import MicSTT
-from .phone_stt import PhoneSTT
\ No newline at end of file
+from .phone_stt import PhoneSTT
+from .stream_stt import StreamSTT
@@ -10,12 +10,13 @@ max_speech_duration: bir segmentin max süresi, ses eğer bu süreden büyükse
 json formatı döner
 """
 class BaseSTT:
-    def __init__(self):
+    def __init__(self, model: WhisperModel = None):
         MODEL_SIZE="large"              #medium görece çok hızlı ama doğruluğu düşük
         DEVICE="cpu"
         COMPUTE_TYPE="int8"
-    
-        self.model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
+
+        # zaten yüklü bir model verilirse (ör. sunucudaki) ikinci kopya yüklenmez
+        self.model = model or WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
 
     def transcribe(self, audio_source):
         segments, info = self.model.transcribe(
@@ -0,0 +1,99 @@
+import numpy as np
+from .base_stt import BaseSTT
+
+"""
+İstemci konuşurken gelen 16 kHz mono int16 PCM frame'lerini işler.
+push: frame'i ekler, ucuzdur; ne yapılması gerektiğini (PARTIAL / FINAL / None) döner
+partial: mevcut sözcenin kayan penceresini hızlıca (beam_size=1) çözer, ara transkript döner
+finalize: sözce bitince kalan sesi tam doğrulukla çözer ve durumu sıfırlar
+window_s: kayan pencerenin uzunluğu; aşılırsa o ana kadarki metin kesinleştirilir, ses atılır
+end_silence_ms: konuşmadan sonra bu kadar sessizlik gelirse sözce bitmiş sayılır
+"""
+
+
+class StreamSTT(BaseSTT):
+    PARTIAL = "partial"
+    FINAL = "final"
+
+    def __init__(self, model=None, sample_rate=16000, window_s=10, partial_every_s=0.6,
+                 silence_threshold=0.01, end_silence_ms=700):
+        super().__init__(model)
+        self.sample_rate = sample_rate
+        self.window_samples = int(window_s * sample_rate)
+        self.partial_every_samples = int(partial_every_s * sample_rate)
+        self.silence_threshold = silence_threshold
+        self.end_silence_samples = int(end_silence_ms * sample_rate / 1000)
+        self._reset()
+
+    def _reset(self):
+        self.frames = []
+        self.buffered_samples = 0
+        self.committed_text = ""
+        self.heard_speech = False
+        self.silent_samples = 0
+        self.samples_since_partial = 0
+
+    def _is_silent(self, data):
+        rms = np.sqrt(np.mean(data**2))  # Sesin enerjisi (RMS)
+        return rms < self.silence_threshold
+
+    def _window(self):
+        return np.concatenate(self.frames) if self.frames else np.zeros(0, dtype=np.float32)
+
+    def _decode(self, audio, beam_size):
+        segments, _ = self.model.transcribe(
+            audio,
+            beam_size=beam_size,
+            language="tr",
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=300)
+        )
+        return "".join([segment.text for segment in segments]).strip()
+
+    def _join(self, text):
+        return " ".join(t for t in (self.committed_text, text) if t)
+
+    def push(self, pcm16: bytes):
+        frame = np.frombuffer(pcm16, dtype="<i2").astype(np.float32) / 32768.0
+        if frame.size == 0: return None
+
+        self.frames.append(frame)
+        self.buffered_samples += frame.size
+        self.samples_since_partial += frame.size
+
+        if self._is_silent(frame):
+            self.silent_samples += frame.size
+        else:
+            self.silent_samples = 0
+            self.heard_speech = True
+
+        if not self.heard_speech:
+            # sözce başlamadan önceki sessizliği tutmaya gerek yok
+            self.frames.clear()
+            self.buffered_samples = 0
+            return None
+
+        if self.silent_samples >= self.end_silence_samples:
+            return self.FINAL
+
+        if self.samples_since_partial >= self.partial_every_samples:
+            return self.PARTIAL
+
+        return None
+
+    def partial(self):
+        self.samples_since_partial = 0
+
+        if self.buffered_samples >= self.window_samples:
+            # pencere doldu: metni kesinleştir, sesi at ve yeni pencereye başla
+            self.committed_text = self._join(self._decode(self._window(), beam_size=5))
+            self.frames.clear()
+            self.buffered_samples = 0
+            return self.committed_text
+
+        return self._join(self._decode(self._window(), beam_size=1))
+
+    def finalize(self):
+        text = self._join(self._decode(self._window(), beam_size=10)) if self.frames else self.committed_text
+        self._reset()
+        return text
@@ -1,2 +1,2 @@
-from .run_tts import RunTTS
 from .synthesizer import CoquiTRTTS
+from .run_tts import RunTTS
@@ -17,6 +17,7 @@ class CoquiTRTTS:
     Sentence splitting for faster perceived response
     Output caching to avoid regenerating identical sentences
     Optional per-chunk callback for streaming use cases
+    In-memory sentence-by-sentence generator for streaming responses
     WAV concatenation with silence between chunks
     """
 
@@ -38,6 +39,10 @@ class CoquiTRTTS:
         self.tts = TTS(model_name=model_name)
         self.tts.to(device)
 
+    @property
+    def output_sample_rate(self) -> int:
+        return self.tts.synthesizer.output_sample_rate
+
     def _normalize_text(self, t: str) -> str:
         t = re.sub(r"\s+", " ", t).strip()
         return t
@@ -74,6 +79,18 @@ class CoquiTRTTS:
         if on_ready: on_ready(str(out))
         return out
 
+    # Yield (sentence, waveform) pairs as soon as each sentence is ready, without touching the output file.
+    def synthesize_stream(self, text: str):
+        for s in self._split_sentences(text):
+            out = self._cache_path(self._cache_key(s))
+            if out.is_file():
+                audio, _ = sf.read(out, dtype="float32")
+            else:
+                audio = np.asarray(self.tts.tts(text=s, speaker_wav=self.speaker_wav, language=self.language),
+                                   dtype=np.float32)
+                sf.write(out, audio, self.output_sample_rate)
+            yield s, audio
+
     def synthesize_chunked(self, text: str, filename: str = "output.wav",
                            silence_ms: int = 120, return_base64: bool = False,
                            on_chunk=None):
@@ -1 +1,26 @@
 # TTS utility functions
+import struct
+import numpy as np
+
+# Placeholder RIFF/data sizes for WAV streams whose final length is unknown upfront.
+_UNKNOWN_WAV_SIZE = 0xFFFFFFFF
+
+
+def streaming_wav_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """
+    Build a 44-byte PCM WAV header for a stream of unknown length.
+    Players start decoding right after the header and keep reading until the connection closes.
+    """
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    return b"".join([
+        b"RIFF", struct.pack("<I", _UNKNOWN_WAV_SIZE), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample),
+        b"data", struct.pack("<I", _UNKNOWN_WAV_SIZE),
+    ])
+
+
+def float_to_pcm16(waveform) -> bytes:
+    """Convert a float waveform in [-1, 1] to little-endian 16-bit PCM bytes."""
+    audio = np.clip(np.asarray(waveform, dtype=np.float32), -1.0, 1.0)
+    return (audio * 32767.0).astype("<i2").tobytes()
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The packages live under src/ (see [tool.poetry] packages)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Manual scripts: they load the real models, microphones or remote APIs when imported and are run by hand
+collect_ignore = [
+    "gemma_adapter_test.py",
+    "gemma_test.py",
+    "graph_builder_test.py",
+    "medgemma_adapter_test.py",
+    "medgemma_test.py",
+    "test_agents.py",
+    "test_stt.py",
+    "test_tts.py",
+    "topic_manager_test",
+    "trial_of_anything",
+]
+
+
+class ScriptedRouter:
+    """
+    Stands in for the local models: `give_choice` answers with the first line of `script` that is
+    one of the choices, `give_prompt` with `reply`.
+    """
+
+    model = None
+
+    def __init__(self):
+        self.script = []
+        self.reply = "cevap"
+        # The prompts of the give_choice calls, as chat-template messages
+        self.prompts = []
+
+    def memory_footprint(self) -> int:
+        return 0
+
+    def give_choice(self, messages, choices):
+        self.prompts.append(messages)
+        return next((line for line in self.script if line in choices), choices[-1])
+
+    def give_prompt(self, messages, **kwargs):
+        return self.reply
+
+
+@pytest.fixture
+def scripted_router(monkeypatch):
+    """Serves a ScriptedRouter as every local model for the duration of the test."""
+    import llm.core  # noqa: F401  (before llm.llm_models, which would otherwise import it half-initialized)
+    from llm.core.llm_singletons import llmSingleton
+
+    router = ScriptedRouter()
+    registry = llmSingleton.registry
+    for name in ("gemma_3_1b_it", "medgemma_27b_text_it"):
+        registry.unload(name)
+        monkeypatch.setitem(registry._factories, name, lambda: router)
+    yield router
+    for name in ("gemma_3_1b_it", "medgemma_27b_text_it"):
+        registry.unload(name)
@@ -0,0 +1,61 @@
+from langgraph.checkpoint.memory import InMemorySaver
+
+from agentic_network.agent_graph import AgentGraph
+from agentic_network.agents.topic_manager_cluster.agents import NewTopicAgent, TopicChangeCheckerAgent
+from agentic_network.core.agent_state import TopicSummary
+
+INITIAL_STATE = {"current_message": "", "all_dialog": [], "thoughts": [], "topic_stack": [], "disclosed_topics": [],
+                 "topic_index": {}}
+
+
+def _saved(graph: AgentGraph, session_id: str):
+    return graph.graph.get_state({"configurable": {"thread_id": session_id}})
+
+
+def test_a_finished_summary_is_saved_with_the_next_turn(scripted_router):
+    graph = AgentGraph(InMemorySaver())
+    scripted_router.script = ["FINAL ANSWER: DIFFERENT TOPIC", "FINAL ANSWER: NEW TOPIC", "FINAL ANSWER: SMALL_TALK_AGENT"]
+    topic_id = graph.invoke({**INITIAL_STATE, "current_message": "merhaba, nasılsın?"}, "s1")["topic_stack"][-1]["id"]
+
+    # As the summarizer's thread would, between two turns
+    graph._queue_summary("s1", topic_id, TopicSummary(text="selamlaştılar", message_count=2))
+    assert "summary" not in _saved(graph, "s1").values["topic_stack"][-1]
+
+    scripted_router.script = ["FINAL ANSWER: SAME TOPIC"]
+    result = graph.invoke({**INITIAL_STATE, "current_message": "ben de iyiyim"}, "s1")
+
+    saved = _saved(graph, "s1")
+    assert result["topic_stack"][-1]["summary"] == {"text": "selamlaştılar", "message_count": 2}
+    assert saved.values["topic_stack"][-1]["summary"] == {"text": "selamlaştılar", "message_count": 2}
+    assert saved.next == ()
+    assert len(saved.values["all_dialog"]) == 4
+
+
+def test_routing_thoughts_do_not_outlive_their_turn(scripted_router):
+    graph = AgentGraph(InMemorySaver())
+    turns = [
+        ("merhaba, nasılsın?", ["FINAL ANSWER: DIFFERENT TOPIC", "FINAL ANSWER: NEW TOPIC", "FINAL ANSWER: SMALL_TALK_AGENT"]),
+        ("bir şey daha soracağım", ["FINAL ANSWER: DIFFERENT TOPIC", "FINAL ANSWER: NEW TOPIC", "FINAL ANSWER: OUT_OF_TOPIC_AGENT"]),
+    ]
+    for message, script in turns:
+        scripted_router.script = script
+        result = graph.invoke({**INITIAL_STATE, "current_message": message}, "s1")
+        assert result["thoughts"] == []
+        assert _saved(graph, "s1").values["thoughts"] == []
+
+    # Back to the first topic through the previous topics checker
+    first = result["topic_stack"][0]["id"]
+    scripted_router.script = ["FINAL ANSWER: DIFFERENT TOPIC", f"FINAL ANSWER: {first}"]
+    result = graph.invoke({**INITIAL_STATE, "current_message": "ilk konuya dönelim"}, "s1")
+
+    assert result["topic_stack"][-1]["id"] == first
+    assert result["topic_index"][first] == [0, 1, 4, 5]
+    assert _saved(graph, "s1").values["thoughts"] == []
+
+
+def test_a_routing_agent_only_sees_its_own_thoughts():
+    checker, new_topic = TopicChangeCheckerAgent(), NewTopicAgent()
+    state = {"thoughts": [checker._thought("FINAL ANSWER: DIFFERENT TOPIC"), new_topic._thought("THOUGHT: belirsiz")]}
+
+    assert [thought.content for thought in new_topic._own_thoughts(state)] == ["THOUGHT: belirsiz"]
+    assert [thought.content for thought in checker._own_thoughts(state)] == ["FINAL ANSWER: DIFFERENT TOPIC"]
@@ -0,0 +1,38 @@
+import llm.core  # noqa: F401  (imported before the agents, which import llm.llm_models through it)
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agentic_network.agents.appointment_agent.main import AppointmentAgent
+from agentic_network.core.topic_manager_util import add_message_to_dialogue, get_compacted_messages_for_current_topic
+
+
+class ScriptedModel:
+    """Answers each prompt with the next scripted reply and keeps the prompts it was given."""
+
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def give_prompt(self, messages):
+        self.prompts.append(messages)
+        return self.replies.pop(0)
+
+
+def _state(message: str) -> dict:
+    state = {"current_message": message, "all_dialog": [], "thoughts": [], "disclosed_topics": [], "topic_index": {},
+             "topic_stack": [{"id": "t", "agent": "appointment_agent", "appointment_data": {}}]}
+    patch = add_message_to_dialogue(state, HumanMessage(message))
+    return {**state, **patch}
+
+
+def test_tool_results_are_filed_under_the_current_topic(monkeypatch):
+    model = ScriptedModel('TOOL_CALL: {"name": "get_my_appointments", "args": {}}', "İki randevunuz var.")
+    monkeypatch.setattr(AppointmentAgent, "_model", lambda self: model)
+
+    result = AppointmentAgent().graph.invoke(_state("randevularım neler?"))
+
+    assert result["topic_index"] == {"t": [0, 1, 2, 3]}
+    messages = get_compacted_messages_for_current_topic(result)
+    assert [type(m) for m in messages] == [HumanMessage, AIMessage, ToolMessage, AIMessage]
+    assert messages[2].metadata["topic_id"] == "t"
+    # The second call sees the tool's answer
+    assert model.prompts[1][-1]["content"][0]["text"].startswith("TOOL_RESULT: ")
@@ -0,0 +1,62 @@
+import struct
+
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+from external import audio_ingest  # noqa: E402
+from external.audio_ingest import _parse_wav, _read_wav_pcm, load_audio  # noqa: E402
+
+
+def _wav(samples: np.ndarray, channels: int = 1, sample_rate: int = 16000, format_tag: int = 1,
+         bits: int = 16, fmt_size: int = 16) -> bytes:
+    """A RIFF/WAVE file with one fmt and one data chunk; `samples` is written as is."""
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", format_tag, channels, sample_rate, sample_rate * block_align, block_align, bits)
+    fmt = fmt.ljust(fmt_size, b"\0")[:fmt_size]
+    body = samples.tobytes()
+    chunks = b"fmt " + struct.pack("<I", fmt_size) + fmt + b"data" + struct.pack("<I", len(body)) + body
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def test_pcm16_mono_is_read_without_librosa(monkeypatch):
+    monkeypatch.setattr(audio_ingest.librosa, "load", pytest.fail)
+    samples = np.array([0, 16384, -16384, 32767], dtype="<i2")
+
+    waveform = load_audio(_wav(samples))
+
+    assert waveform.dtype == np.float32
+    np.testing.assert_allclose(waveform, [0.0, 0.5, -0.5, 32767 / 32768])
+
+
+def test_pcm16_stereo_is_mixed_down_to_mono():
+    frames = np.array([[16384, 0], [-16384, -16384]], dtype="<i2")
+
+    waveform, sample_rate, audio_format = _read_wav_pcm(_wav(frames, channels=2, sample_rate=8000))
+
+    np.testing.assert_allclose(waveform, [0.25, -0.5])
+    assert (sample_rate, audio_format) == (8000, "wav/pcm16/8k/multi")
+
+
+@pytest.mark.parametrize("fmt_size", [0, 8, 15])
+def test_a_truncated_fmt_chunk_is_not_parsed(fmt_size):
+    assert _parse_wav(_wav(np.zeros(4, dtype="<i2"), fmt_size=fmt_size)) is None
+
+
+def test_a_file_cut_inside_the_fmt_chunk_is_not_parsed():
+    assert _parse_wav(_wav(np.zeros(4, dtype="<i2"))[:30]) is None
+
+
+def test_zero_channels_is_not_parsed():
+    assert _parse_wav(_wav(np.zeros(4, dtype="<i2"), channels=0)) is None
+
+
+def test_non_pcm_wavs_fall_back_to_librosa(monkeypatch):
+    mulaw = _wav(np.zeros(4, dtype="u1"), format_tag=7, bits=8)
+    decoded = np.zeros(8000, dtype=np.float32)
+    monkeypatch.setattr(audio_ingest.librosa, "load", lambda *args, **kwargs: (decoded, 8000))
+
+    assert _read_wav_pcm(mulaw) is None
+    assert load_audio(mulaw).shape == (16000,)
+    assert "librosa/8k" in audio_ingest.decode_stats.snapshot()
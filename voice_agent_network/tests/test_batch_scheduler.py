@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import llm.core  # noqa: F401  (before llm.llm_models, which would otherwise import it half-initialized)
+from llm.core.batch_scheduler import BatchScheduler
+
+
+class FakeModel:
+    """Answers each chat of a batch with its last message; `error` makes the next batch fail."""
+
+    temperature = 0.2
+
+    def __init__(self):
+        self.batches = []
+        self.error = None
+        # Held by a test to keep the worker busy while requests queue up
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def give_prompt_batch(self, chats: list) -> list:
+        self.gate.wait()
+        self.batches.append(len(chats))
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return [f"cevap: {chat[-1]['content']}" for chat in chats]
+
+
+def _chat(text: str) -> list:
+    return [{"role": "user", "content": text}]
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+def test_concurrent_requests_are_answered_in_one_batch(model):
+    scheduler = BatchScheduler(lambda: model, "fake", max_batch_size=3, max_wait_ms=1000)
+
+    futures = [scheduler.submit(_chat(f"soru {i}")) for i in range(3)]
+
+    assert [future.result(timeout=5) for future in futures] == ["cevap: soru 0", "cevap: soru 1", "cevap: soru 2"]
+    assert model.batches == [3]
+    stats = scheduler.stats()
+    assert (stats["requests"], stats["batches"], stats["max_batch"], stats["avg_batch"]) == (3, 1, 3, 3.0)
+
+
+def test_a_lone_request_waits_at_most_max_wait(model):
+    scheduler = BatchScheduler(lambda: model, "fake", max_batch_size=8, max_wait_ms=10)
+
+    assert scheduler.give_prompt(_chat("merhaba")) == "cevap: merhaba"
+    assert asyncio.run(scheduler.agive_prompt(_chat("selam"))) == "cevap: selam"
+    assert model.batches == [1, 1]
+
+
+def test_a_failed_batch_raises_in_every_caller(model):
+    scheduler = BatchScheduler(lambda: model, "fake", max_batch_size=2, max_wait_ms=200)
+    model.error = RuntimeError("CUDA out of memory")
+
+    futures = [scheduler.submit(_chat("a")), scheduler.submit(_chat("b"))]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=5)
+    assert scheduler.stats()["failed_batches"] == 1
+
+    # The worker goes on with the next batch
+    assert scheduler.give_prompt(_chat("c")) == "cevap: c"
+
+
+def test_cancelled_requests_are_not_generated(model):
+    scheduler = BatchScheduler(lambda: model, "fake", max_batch_size=2, max_wait_ms=200)
+    model.gate.clear()
+    busy = scheduler.submit(_chat("meşgul"))
+    while not busy.running():
+        time.sleep(0.001)
+
+    cancelled, kept = scheduler.submit(_chat("vazgeçildi")), scheduler.submit(_chat("bekleyen"))
+    assert cancelled.cancel()
+    model.gate.set()
+
+    assert kept.result(timeout=5) == "cevap: bekleyen"
+    assert model.batches == [1, 1]
+
+
+def test_other_attributes_are_forwarded_to_the_model(model):
+    scheduler = BatchScheduler(lambda: model, "fake")
+
+    assert scheduler.temperature == 0.2
@@ -0,0 +1,76 @@
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from agentic_network.checkpoint import DeltaCheckpointSaver, FileCheckpointSaver, SQLiteCheckpointSaver
+
+
+class EchoState(TypedDict):
+    current_message: str
+    all_dialog: Annotated[list[AnyMessage], add_messages]
+
+
+def _echo(state: EchoState) -> dict:
+    return {"all_dialog": [HumanMessage(state["current_message"]), AIMessage(f"yankı: {state['current_message']}")]}
+
+
+def _graph(saver: DeltaCheckpointSaver):
+    graph = StateGraph(EchoState)
+    graph.add_node("echo", _echo)
+    graph.add_edge(START, "echo")
+    graph.add_edge("echo", END)
+    return graph.compile(checkpointer=saver)
+
+
+def _turn(saver: DeltaCheckpointSaver, i: int) -> dict:
+    return _graph(saver).invoke({"current_message": f"mesaj {i}"}, {"configurable": {"thread_id": "s1"}})
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def open_saver(request, tmp_path):
+    """Opens a new saver on the same storage every time it is called, like another worker would."""
+    if request.param == "sqlite":
+        return lambda: SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    return lambda: FileCheckpointSaver(str(tmp_path / "checkpoints"))
+
+
+def _chain_length(saver: DeltaCheckpointSaver) -> int:
+    """Number of blobs read to load the latest all_dialog: 1 for a full value, more for deltas."""
+    checkpoint = saver.get_tuple({"configurable": {"thread_id": "s1"}}).checkpoint
+    version, length = checkpoint["channel_versions"]["all_dialog"], 0
+    while version is not None:
+        _, _, version = saver._read_blob("s1", "", "all_dialog", version)
+        length += 1
+    return length
+
+
+def test_a_new_saver_resumes_the_session_past_the_delta_chain(open_saver):
+    turns = DeltaCheckpointSaver.MAX_DELTA_CHAIN + 4
+
+    first = open_saver()
+    for i in range(turns):
+        _turn(first, i)
+    assert 1 < _chain_length(first) <= DeltaCheckpointSaver.MAX_DELTA_CHAIN + 1
+
+    second = open_saver()
+    for i in range(turns, 2 * turns):
+        _turn(second, i)
+    assert 1 < _chain_length(second) <= DeltaCheckpointSaver.MAX_DELTA_CHAIN + 1
+
+    state = _graph(open_saver()).get_state({"configurable": {"thread_id": "s1"}}).values
+    assert [m.content for m in state["all_dialog"][::2]] == [f"mesaj {i}" for i in range(2 * turns)]
+    assert state["all_dialog"][-1].content == f"yankı: mesaj {2 * turns - 1}"
+
+
+def test_workers_taking_turns_on_one_session_see_each_others_messages(open_saver):
+    workers = [open_saver(), open_saver()]
+
+    for i in range(DeltaCheckpointSaver.MAX_DELTA_CHAIN + 2):
+        state = _turn(workers[i % 2], i)
+        assert len(state["all_dialog"]) == 2 * (i + 1)
+
+    reopened = _graph(open_saver()).get_state({"configurable": {"thread_id": "s1"}}).values
+    assert reopened["all_dialog"] == state["all_dialog"]
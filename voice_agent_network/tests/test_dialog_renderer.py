@@ -0,0 +1,63 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agentic_network.core.dialog_renderer import DialogRenderer
+
+
+class _CountingRender:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, message) -> str:
+        self.calls.append(message.id)
+        return f"{message.type}: {message.content}"
+
+
+def _dialog(count: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(f"message {i}", id=f"m{i}") for i in range(count)]
+
+
+def test_a_grown_dialog_only_renders_the_new_messages():
+    renderer, render = DialogRenderer(), _CountingRender()
+    dialog = _dialog(5)
+
+    first = renderer.render("plain", dialog[:3], render)
+    second = renderer.render("plain", dialog, render)
+
+    assert second == "\n".join(f"{m.type}: {m.content}" for m in dialog)
+    assert first == "\n".join(f"{m.type}: {m.content}" for m in dialog[:3])
+    assert render.calls == ["m0", "m1", "m2", "m3", "m4"]
+
+    # Rendering the same dialog again costs nothing
+    assert renderer.render("plain", dialog, render) == second
+    assert len(render.calls) == 5
+
+
+def test_formats_are_cached_separately():
+    renderer, render = DialogRenderer(), _CountingRender()
+    dialog = _dialog(2)
+
+    renderer.render("plain", dialog, render)
+    upper = renderer.render("upper", dialog, lambda m: m.content.upper())
+
+    assert upper == "MESSAGE 0\nMESSAGE 1"
+
+
+def test_a_message_replaced_under_the_same_id_is_rendered_again():
+    renderer, render = DialogRenderer(), _CountingRender()
+    dialog = _dialog(3)
+    renderer.render("plain", dialog, render)
+
+    dialog[-1] = AIMessage("rewritten", id="m2")
+    text = renderer.render("plain", dialog, render)
+
+    assert text.endswith("ai: rewritten")
+    assert render.calls == ["m0", "m1", "m2", "m2"]
+
+
+def test_messages_without_ids_are_not_cached():
+    renderer, render = DialogRenderer(), _CountingRender()
+    dialog = [HumanMessage("no id"), AIMessage("no id either")]
+
+    assert renderer.render("plain", dialog, render) == "human: no id\nai: no id either"
+    renderer.render("plain", dialog, render)
+    assert len(render.calls) == 4
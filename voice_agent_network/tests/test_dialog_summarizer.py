@@ -0,0 +1,27 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agentic_network.core.dialog_summarizer import DialogSummarizer
+
+
+def _dialog(turns: int) -> list:
+    return [message for i in range(turns) for message in (HumanMessage(f"soru {i}"), AIMessage(f"cevap {i}"))]
+
+
+def test_the_summary_ends_right_before_a_user_turn():
+    messages = _dialog(5)
+
+    cut = DialogSummarizer(keep_last=3)._cut_point(messages, covered=0)
+
+    assert cut == 6
+    assert isinstance(messages[cut], HumanMessage)
+
+
+def test_keep_last_of_zero_still_keeps_the_latest_user_turn():
+    messages = _dialog(3) + [HumanMessage("son soru")]
+
+    assert DialogSummarizer(keep_last=0)._cut_point(messages, covered=0) == 6
+    assert DialogSummarizer(keep_last=0)._cut_point(_dialog(3), covered=0) == 4
+
+
+def test_nothing_to_cut_after_the_covered_messages():
+    assert DialogSummarizer(keep_last=2)._cut_point(_dialog(2), covered=2) is None
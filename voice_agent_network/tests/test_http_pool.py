@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from llm.core.http_pool import HttpPool
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers each POST with the next (status, headers, body) of the server's script, 200 once it runs out."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+            status, headers, body = self.server.script.pop(0) if self.server.script else (200, {}, '{"ok": true}')
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body.encode())))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.script, server.requests, server.lock = [], 0, threading.Lock()
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_port}/generate"
+    server.host = f"127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _pool(**kwargs) -> HttpPool:
+    return HttpPool(backoff_base=0.01, backoff_max=0.05, http2=False, **kwargs)
+
+
+def test_post_json_retries_server_errors_until_it_succeeds(server):
+    server.script = [(503, {}, ""), (502, {}, "")]
+    pool = _pool()
+
+    assert pool.post_json(server.url, {"prompt": "merhaba"}) == {"ok": True}
+
+    assert server.requests == 3
+    stats = pool.stats()["hosts"][server.host]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (3, 2, 2)
+
+
+def test_post_json_gives_up_after_max_retries(server):
+    server.script = [(503, {}, "")] * 5
+    pool = _pool(max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        pool.post_json(server.url, {})
+
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried(server):
+    server.script = [(400, {}, '{"error": "bad request"}')]
+
+    with pytest.raises(requests.HTTPError):
+        _pool().post_json(server.url, {})
+
+    assert server.requests == 1
+
+
+def test_apost_json_honours_retry_after(server):
+    server.script = [(429, {"Retry-After": "0"}, "")]
+    pool = _pool()
+
+    assert asyncio.run(pool.apost_json(server.url, {})) == {"ok": True}
+
+    assert server.requests == 2
+    assert pool.stats()["hosts"][server.host]["retries"] == 1
+
+
+def test_backoff_grows_with_the_attempt_and_stays_under_the_cap():
+    pool = HttpPool(backoff_base=0.5, backoff_max=2.0)
+    pool._record("host", 0.1, ok=False)
+
+    assert all(0 <= pool._backoff(1, None, "host") <= 0.5 for _ in range(50))
+    assert all(0 <= pool._backoff(6, None, "host") <= 2.0 for _ in range(50))
+    assert pool.stats()["hosts"]["host"]["retries"] == 100
+
+
+def test_post_lines_retries_before_streaming(server):
+    server.script = [(503, {}, ""), (200, {}, "\n".join(json.dumps({"token": t}) for t in ("mer", "haba")))]
+
+    lines = list(_pool().post_lines(server.url, {}))
+
+    assert [json.loads(line)["token"] for line in lines] == ["mer", "haba"]
+    assert server.requests == 2
+
+
+def test_a_new_event_loop_closes_the_client_of_the_old_one(server):
+    pool = _pool()
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(pool.apost_json(server.url, {}), other_loop).result(timeout=5)
+        old_client = pool._client
+
+        assert asyncio.run(pool.apost_json(server.url, {})) == {"ok": True}
+
+        assert pool._client is not old_client
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), other_loop).result(timeout=5)
+        assert old_client.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(timeout=5)
+        other_loop.close()
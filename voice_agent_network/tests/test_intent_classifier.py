@@ -0,0 +1,68 @@
+import pytest
+
+from agentic_network.agents.topic_manager_cluster.routing.fast_path_condition import FAST_PATH_THRESHOLD
+from agentic_network.core.graph_routes import GraphRoutes
+from agentic_network.core.intent_classifier import IntentClassifier, normalize
+
+classifier = IntentClassifier()
+
+
+def test_normalize_folds_turkish_casing_and_diacritics():
+    assert normalize("İğne BAŞIM ağrıyor!") == ["igne", "basim", "agriyor"]
+
+
+@pytest.mark.parametrize("text, route", [
+    ("Başım çok ağrıyor", GraphRoutes.DIAGNOSIS_AGENT),
+    ("Bacağım şişmiş", GraphRoutes.DIAGNOSIS_AGENT),
+    ("Dizimde bir sızı var", GraphRoutes.DIAGNOSIS_AGENT),
+    ("Randevumu iptal etmek istiyorum", GraphRoutes.APPOINTMENT_AGENT),
+    ("Merhaba, nasılsın?", GraphRoutes.SMALL_TALK_AGENT),
+])
+def test_stems_match_suffixed_words(text, route):
+    prediction = classifier.classify(text)
+
+    assert prediction.route == route
+    assert prediction.confidence >= FAST_PATH_THRESHOLD
+
+
+@pytest.mark.parametrize("text", ["Sistemde kaydım var mı?", "Sizi aradım"])
+def test_short_stems_do_not_match_unrelated_words(text):
+    assert classifier.classify(text).route is None
+
+
+def test_a_single_weak_hit_is_not_confident():
+    prediction = classifier.classify("hastane")
+
+    assert prediction.route == GraphRoutes.APPOINTMENT_AGENT
+    assert prediction.confidence < FAST_PATH_THRESHOLD
+
+
+def test_mixed_evidence_lowers_the_confidence():
+    mixed = classifier.classify("başım ağrıyor, yarın doktora randevu alabilir miyim")
+    single = classifier.classify("yarın doktora randevu alabilir miyim")
+
+    assert mixed.confidence < single.confidence
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("evet", True),
+    ("tamam, olur", True),
+    ("peki anladım", True),
+    ("bu çok iyi var", False),
+    ("evet ama başım ağrıyor", False),
+    ("evet evet evet evet evet", False),
+    ("", False),
+])
+def test_acknowledgments(text, expected):
+    assert classifier.classify(text).is_acknowledgment is expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Bir de başka bir şey soracağım", True),
+    ("Yeni bir randevu istiyorum", True),
+    ("Onun dışında ilaç önerir misin", True),
+    ("Yeniden söyler misiniz", False),
+    ("Diğerleri nasıl", False),
+])
+def test_change_cues_are_whole_words(text, expected):
+    assert classifier.classify(text).has_change_cue is expected
@@ -0,0 +1,93 @@
+import asyncio
+
+import llm.core  # noqa: F401  (before llm.llm_models, which would otherwise import it half-initialized)
+from agentic_network.agents.appointment_agent.llm_client import GeneralLlmClient
+from llm.core.llm_client import LlmClient, StreamAssembler
+
+TOOL_CALL = 'TOOL_CALL: {"name": "get_my_appointments", "args": {}}'
+
+
+class ScriptedClient(LlmClient):
+    """Streams its chunks one by one and counts how many the caller read."""
+
+    def __init__(self, chunks: list):
+        super().__init__()
+        self.chunks = chunks
+        self.read = 0
+
+    def _build_payload(self, messages_json):
+        return {"messages": messages_json}
+
+    def _post(self, payload):
+        return {"text": "".join(self.chunks)}
+
+    def _extract_text(self, resp):
+        return resp["text"]
+
+    def _post_stream(self, payload):
+        for chunk in self.chunks:
+            self.read += 1
+            yield {"text": chunk}
+
+    async def _apost_stream(self, payload):
+        for chunk in self.chunks:
+            self.read += 1
+            yield {"text": chunk}
+
+
+def _feed(deltas: list) -> list:
+    stream = StreamAssembler(ScriptedClient([])._maybe_parse_tool_call)
+    events = [event for delta in deltas for event in stream.feed(delta)]
+    return events + stream.close()
+
+
+def test_plain_text_is_passed_through_once_it_cannot_be_a_tool_call():
+    events = _feed(["TO", "DAY ", "is fine"])
+
+    assert events[:-1] == [{"type": "delta", "text": "TODAY "}, {"type": "delta", "text": "is fine"}]
+    assert events[-1]["text"] == "TODAY is fine"
+    assert events[-1]["tool_call"] is None
+
+
+def test_a_reply_shorter_than_the_prefix_is_flushed_on_close():
+    events = _feed(["TOOL"])
+
+    assert events == [{"type": "delta", "text": "TOOL"},
+                      {"type": "done", "text": "TOOL", "raw": None, "tool_call": None}]
+
+
+def test_a_tool_call_split_across_deltas_is_never_yielded_as_text():
+    events = _feed(["TOOL_", "CALL: {\"name\": \"get_my_app", "ointments\", \"args\": {}}"])
+
+    assert [event["type"] for event in events] == ["done"]
+    assert events[0]["tool_call"] == {"name": "get_my_appointments", "args": {}}
+
+
+def test_chat_stream_stops_reading_once_the_tool_call_is_complete():
+    client = ScriptedClient([TOOL_CALL[:20], TOOL_CALL[20:], " trailing", " chunks"])
+
+    events = list(client.chat_stream([]))
+
+    assert client.read == 2
+    assert events == [{"type": "done", "text": TOOL_CALL, "raw": {"text": TOOL_CALL[20:]},
+                       "tool_call": {"name": "get_my_appointments", "args": {}}}]
+
+
+def test_achat_stream_yields_the_same_events():
+    client = ScriptedClient(["Merhaba", ", size nasıl yardımcı olabilirim?"])
+
+    async def collect():
+        return [event async for event in client.achat_stream([])]
+
+    events = asyncio.run(collect())
+
+    assert [event["type"] for event in events] == ["delta", "delta", "done"]
+    assert events[-1]["text"] == "Merhaba, size nasıl yardımcı olabilirim?"
+
+
+def test_the_appointment_client_accepts_markdown_around_the_tool_call():
+    client = GeneralLlmClient(model="llama3")
+
+    assert client._maybe_parse_tool_call('Bakıyorum. TOOL_CALL: **{"name": "get_my_appointments"}**') == \
+        {"name": "get_my_appointments"}
+    assert client._maybe_parse_tool_call(TOOL_CALL) == {"name": "get_my_appointments", "args": {}}
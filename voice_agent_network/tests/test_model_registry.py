@@ -0,0 +1,98 @@
+import llm.core  # noqa: F401  (before llm.llm_models, which would otherwise import it half-initialized)
+from llm.core.model_registry import ModelRegistry
+
+MB = 1024 ** 2
+
+
+class FakeModel:
+    """A loaded model of `footprint` bytes that only records where it was moved."""
+
+    model = None
+
+    def __init__(self, footprint: int):
+        self.footprint = footprint
+        self.moves = []
+
+    def memory_footprint(self) -> int:
+        return self.footprint
+
+    def move_to(self, device: str) -> None:
+        self.moves.append(device)
+
+    def give_prompt(self, messages) -> str:
+        return "cevap"
+
+
+def _registry(offload_to_cpu: bool = False) -> ModelRegistry:
+    """A 1 GB registry with two 600 MB models: only one of them fits."""
+    registry = ModelRegistry(memory_budget_gb=1, offload_to_cpu=offload_to_cpu)
+    registry.register("small", lambda: FakeModel(600 * MB))
+    registry.register("large", lambda: FakeModel(600 * MB))
+    return registry
+
+
+def test_models_are_loaded_on_first_use_and_then_reused():
+    registry = _registry()
+    assert not registry.is_loaded("small")
+
+    first = registry.get("small")
+    assert registry.get("small") is first
+
+    stats = registry.stats()["models"]["small"]
+    assert (stats["loads"], stats["hits"], stats["in_use"], stats["state"]) == (1, 1, 0, "loaded")
+
+
+def test_the_least_recently_used_model_is_evicted_over_budget():
+    registry = _registry()
+    registry.get("small")
+    registry.get("large")
+
+    assert not registry.is_loaded("small")
+    assert registry.is_loaded("large")
+    assert registry.stats()["models"]["small"]["unloads"] == 1
+    assert registry.stats()["resident_bytes"] == 600 * MB
+
+
+def test_a_leased_model_is_not_evicted_until_the_lease_ends():
+    registry = _registry()
+    with registry.lease("small") as small:
+        registry.get("large")
+        # Over budget, but "small" is in use and "large" was just returned
+        assert registry.is_loaded("small") and registry.is_loaded("large")
+        assert registry.stats()["models"]["small"]["in_use"] == 1
+        assert small.give_prompt([]) == "cevap"
+
+    # The budget is enforced again once the lease ends
+    assert registry.stats()["resident_bytes"] <= registry.memory_budget_bytes
+    assert registry.stats()["models"]["small"]["in_use"] == 0
+
+
+def test_a_handle_leases_the_model_for_each_call():
+    registry = _registry()
+    handle = registry.handle("small")
+
+    assert handle.give_prompt([]) == "cevap"
+    assert handle.footprint == 600 * MB
+    assert registry.stats()["models"]["small"]["in_use"] == 0
+
+
+def test_unload_skips_a_model_in_use():
+    registry = _registry()
+    with registry.lease("small"):
+        registry.unload("small")
+        assert registry.is_loaded("small")
+
+    registry.unload("small")
+    assert registry.stats()["models"]["small"]["state"] == "unloaded"
+
+
+def test_offloaded_models_are_restored_instead_of_reloaded():
+    registry = _registry(offload_to_cpu=True)
+    small = registry.get("small")
+    registry.get("large")
+    assert registry.stats()["models"]["small"]["state"] == "offloaded"
+
+    assert registry.get("small") is small
+    assert small.moves == ["cpu", "cpu"]  # parked on the CPU, then back to the device it was loaded on
+    stats = registry.stats()["models"]
+    assert (stats["small"]["loads"], stats["small"]["offloads"], stats["large"]["state"]) == (1, 1, "offloaded")
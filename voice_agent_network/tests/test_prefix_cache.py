@@ -0,0 +1,93 @@
+import torch
+
+from llm.core.prefix_cache import PrefixCache
+
+SYSTEM = [{"role": "system", "content": "Sen bir sağlık asistanısın."}]
+
+
+class CharTokenizer:
+    """One token per character, with a plain-text chat template."""
+
+    def apply_chat_template(self, messages, tokenize=False):
+        return "".join(f"<{message['role']}>{message['content']}\n" for message in messages)
+
+    def __call__(self, text, add_special_tokens=False, return_tensors="pt"):
+        return {"input_ids": self.encode(text)}
+
+    def encode(self, text) -> torch.Tensor:
+        return torch.tensor([[ord(char) for char in text]])
+
+
+class FakeModel:
+    """Appends one KV entry per input token to the cache, as a forward pass would."""
+
+    def __init__(self):
+        self.prefilled = []
+
+    def __call__(self, input_ids, past_key_values, use_cache):
+        self.prefilled.append(input_ids.shape[-1])
+        states = input_ids.float().reshape(1, 1, -1, 1)
+        past_key_values.update(states, states, 0)
+
+
+tokenizer = CharTokenizer()
+
+
+def _prompt(user_text: str):
+    messages = SYSTEM + [{"role": "user", "content": user_text}]
+    return messages, tokenizer.encode(tokenizer.apply_chat_template(messages))
+
+
+def test_the_system_prefix_is_prefilled_once_and_reused():
+    cache, model = PrefixCache(), FakeModel()
+
+    messages, input_ids = _prompt("başım ağrıyor")
+    first = cache.lookup(model, tokenizer, messages, input_ids)
+    messages, input_ids = _prompt("randevu almak istiyorum")
+    second = cache.lookup(model, tokenizer, messages, input_ids)
+
+    assert len(model.prefilled) == 1
+    assert first.get_seq_length() == second.get_seq_length() == model.prefilled[0]
+    stats = cache.stats()
+    assert (stats["entries"], stats["misses"], stats["hits"]) == (1, 1, 2)
+    assert stats["reused_tokens"] == 2 * model.prefilled[0]
+
+
+def test_each_lookup_gets_a_private_copy():
+    cache, model = PrefixCache(), FakeModel()
+    messages, input_ids = _prompt("merhaba")
+
+    first = cache.lookup(model, tokenizer, messages, input_ids)
+    prefix_len = first.get_seq_length()
+    # generate() appends the rest of the prompt to the cache it is given
+    first.update(torch.ones(1, 1, 5, 1), torch.ones(1, 1, 5, 1), 0)
+
+    assert cache.lookup(model, tokenizer, messages, input_ids).get_seq_length() == prefix_len
+
+
+def test_prompts_without_a_system_message_are_not_cached():
+    cache, model = PrefixCache(), FakeModel()
+    messages = [{"role": "user", "content": "merhaba"}]
+
+    assert cache.lookup(model, tokenizer, messages, tokenizer.encode(tokenizer.apply_chat_template(messages))) is None
+    assert model.prefilled == []
+    assert cache.stats()["misses"] == 0
+
+
+def test_a_prompt_that_does_not_start_with_the_prefix_misses():
+    cache, model = PrefixCache(), FakeModel()
+    messages, input_ids = _prompt("merhaba")
+    cache.lookup(model, tokenizer, messages, input_ids)
+
+    assert cache.lookup(model, tokenizer, messages, tokenizer.encode("başka bir şablon " * 5)) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_the_least_recently_used_prefix_is_dropped():
+    cache, model = PrefixCache(max_entries=1), FakeModel()
+    for system in ("Birinci sistem mesajı.", "İkinci sistem mesajı.", "Birinci sistem mesajı."):
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": "merhaba"}]
+        cache.lookup(model, tokenizer, messages, tokenizer.encode(tokenizer.apply_chat_template(messages)))
+
+    assert len(model.prefilled) == 3
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,48 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph.message import add_messages
+
+from agentic_network.agents.topic_manager_cluster.agents import FusedTopicRouterAgent, PreTopicsCheckerAgent
+from agentic_network.core.agent_state import merge_topic_index
+from agentic_network.core.topic_manager_util import add_message_to_dialogue
+
+SUMMARY = {"text": "Hasta iki gündür baş ağrısından şikayetçi.", "message_count": 4}
+
+
+def _state() -> dict:
+    """A summarized diagnosis topic (disclosed) with two verbatim turns after the summary, then a current topic."""
+    state = {"current_message": "ilk konuya dönelim", "all_dialog": [], "thoughts": [], "topic_index": {},
+             "topic_stack": [{"id": "a", "agent": "diagnosis_agent", "appointment_data": {}, "summary": SUMMARY}],
+             "disclosed_topics": []}
+    for i in range(3):
+        for message in (HumanMessage(f"eski soru {i}"), AIMessage(f"eski cevap {i}")):
+            patch = add_message_to_dialogue(state, message)
+            state = {**state, "all_dialog": add_messages(state["all_dialog"], patch["all_dialog"]),
+                     "topic_index": merge_topic_index(state["topic_index"], patch["topic_index"])}
+
+    state["disclosed_topics"] = state["topic_stack"]
+    state["topic_stack"] = [{"id": "b", "agent": "small_talk_agent", "appointment_data": {}}]
+    return state
+
+
+def _assert_compacted(prompt: str):
+    assert SUMMARY["text"] in prompt
+    assert "eski soru 0" not in prompt and "eski cevap 1" not in prompt
+    assert "eski soru 2" in prompt and "eski cevap 2" in prompt
+
+
+def test_the_previous_topics_checker_lists_summaries_instead_of_old_turns(scripted_router):
+    state = _state()
+    scripted_router.script = ["FINAL ANSWER: a"]
+
+    PreTopicsCheckerAgent()(state)
+
+    _assert_compacted(scripted_router.prompts[-1][-1]["content"][0]["text"])
+
+
+def test_the_fused_router_lists_summaries_instead_of_old_turns():
+    state = _state()
+
+    message = FusedTopicRouterAgent()._build_input_message(state, state["topic_stack"][-1], state["disclosed_topics"],
+                                                           {"A": "SAME TOPIC"})
+
+    _assert_compacted(message.content)
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from external.session_store import SessionStore, create_agent_state
+
+
+def test_expired_sessions_are_evicted_with_their_turn_lock():
+    store = SessionStore(ttl_seconds=0.05)
+    store.save("s1", create_agent_state())
+    lock = store.turn_lock("s1")
+    time.sleep(0.1)
+
+    assert store.evict_expired() == 1
+    assert len(store) == 0
+    assert store.turn_lock("s1") is not lock
+
+
+def test_a_session_is_not_evicted_while_its_turn_runs():
+    store = SessionStore(ttl_seconds=0)
+
+    async def scenario():
+        lock = store.turn_lock("busy")
+        async with lock:
+            state = store.get("busy")
+            store.save("idle", create_agent_state())
+
+            # "idle" expired at once, "busy" is kept with its lock until the turn ends
+            assert len(store) == 1
+            assert store.turn_lock("busy") is lock
+            store.save("busy", state)
+
+        assert store.evict_expired() == 1
+
+    asyncio.run(scenario())
+    assert len(store) == 0
+
+
+def test_the_oldest_sessions_are_dropped_over_max_sessions():
+    store = SessionStore(max_sessions=2)
+    for session_id in ("s1", "s2", "s3"):
+        store.save(session_id, create_agent_state())
+    store.get("s2")
+    store.save("s4", create_agent_state())
+
+    assert list(store._sessions) == ["s2", "s4"]
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from agentic_network.agent_graph import AgentGraph
+from agentic_network.core import GraphRoutes
+from agentic_network.core.speculative_executor import SpeculativeExecutor
+from agentic_network.core.topic_manager_util import add_message_to_dialogue
+
+TOPIC = {"id": "t1", "agent": GraphRoutes.SMALL_TALK_AGENT.value, "appointment_data": None}
+
+
+class FakeAgent:
+    """A speculative cluster agent that answers with the message count it saw; `fail` raises on its first run."""
+
+    SPECULATIVE = True
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, agent_state: dict) -> dict:
+        with self.lock:
+            self.calls += 1
+            if self.fail and self.calls == 1:
+                raise RuntimeError("model unavailable")
+        return add_message_to_dialogue(agent_state, AIMessage(f"{len(agent_state['all_dialog'])} mesaj"))
+
+    async def acall(self, agent_state: dict) -> dict:
+        return self(agent_state)
+
+
+@pytest.fixture
+def speculator():
+    return SpeculativeExecutor(max_workers=1)
+
+
+def _turn_start(message: str = "nasılsın?") -> dict:
+    return {"current_message": message, "all_dialog": [HumanMessage("merhaba"), AIMessage("merhaba!")],
+            "thoughts": [], "topic_stack": [dict(TOPIC)], "disclosed_topics": [], "topic_index": {"t1": [0, 1]}}
+
+
+def _same_topic(state: dict, speculative_topic: str) -> dict:
+    """The state the Topic Manager hands to the agent when it keeps the topic."""
+    attach = add_message_to_dialogue(state, HumanMessage(state["current_message"]))
+    return {**state, "all_dialog": state["all_dialog"] + attach["all_dialog"], "speculative_topic": speculative_topic}
+
+
+def test_a_kept_topic_commits_the_speculation(speculator):
+    agent, state = FakeAgent(), _turn_start()
+    patch = speculator.start(state, {GraphRoutes.SMALL_TALK_AGENT: agent})
+
+    result = speculator.node(GraphRoutes.SMALL_TALK_AGENT, agent).invoke(_same_topic(state, patch["speculative_topic"]))
+
+    assert agent.calls == 1
+    assert result["all_dialog"][0].content == "3 mesaj"
+    stats = speculator.stats()
+    assert (stats["started"], stats["hits"], stats["misses"], stats["pending"]) == (1, 1, 0, 0)
+
+
+def test_the_async_node_commits_the_speculation(speculator):
+    agent, state = FakeAgent(), _turn_start()
+    patch = speculator.start(state, {GraphRoutes.SMALL_TALK_AGENT: agent})
+
+    node = speculator.node(GraphRoutes.SMALL_TALK_AGENT, agent)
+    result = asyncio.run(node.ainvoke(_same_topic(state, patch["speculative_topic"])))
+
+    assert agent.calls == 1
+    assert result["all_dialog"][0].content == "3 mesaj"
+
+
+def test_a_route_not_taken_discards_the_speculation(speculator):
+    agent, state = FakeAgent(), _turn_start()
+    patch = speculator.start(state, {GraphRoutes.SMALL_TALK_AGENT: agent})
+
+    router = speculator.route(lambda agent_state: GraphRoutes.OUT_OF_TOPIC_AGENT)
+    assert router(_same_topic(state, patch["speculative_topic"])) == GraphRoutes.OUT_OF_TOPIC_AGENT
+
+    stats = speculator.stats()
+    assert (stats["hits"], stats["misses"], stats["pending"]) == (0, 1, 0)
+
+
+def test_a_state_other_than_the_predicted_one_runs_the_agent_again(speculator):
+    agent, state = FakeAgent(), _turn_start()
+    patch = speculator.start(state, {GraphRoutes.SMALL_TALK_AGENT: agent})
+
+    # The Topic Manager went back to the topic through another path, with one more message in the dialog
+    routed = _same_topic(state, patch["speculative_topic"])
+    routed["all_dialog"] = [AIMessage("araya giren")] + routed["all_dialog"]
+    result = speculator.node(GraphRoutes.SMALL_TALK_AGENT, agent).invoke(routed)
+
+    assert agent.calls == 2
+    assert result["all_dialog"][0].content == "4 mesaj"
+    stats = speculator.stats()
+    assert (stats["hits"], stats["misses"], stats["pending"]) == (0, 1, 0)
+
+
+def test_a_failed_speculation_falls_back_to_the_agent(speculator):
+    agent, state = FakeAgent(fail=True), _turn_start()
+    patch = speculator.start(state, {GraphRoutes.SMALL_TALK_AGENT: agent})
+
+    result = speculator.node(GraphRoutes.SMALL_TALK_AGENT, agent).invoke(_same_topic(state, patch["speculative_topic"]))
+
+    assert agent.calls == 2
+    assert result["all_dialog"][0].content == "3 mesaj"
+    stats = speculator.stats()
+    assert (stats["failed"], stats["hits"], stats["pending"]) == (1, 0, 0)
+
+
+def test_an_agent_that_is_not_speculative_is_not_started(speculator):
+    patch = speculator.start(_turn_start(), {GraphRoutes.OUT_OF_TOPIC_AGENT: FakeAgent()})
+
+    assert patch == {"speculative_topic": None}
+    assert speculator.stats()["started"] == 0
+
+
+def test_an_abandoned_turn_leaves_nothing_pending(speculator):
+    agent = FakeAgent()
+    speculator.start(_turn_start(), {GraphRoutes.SMALL_TALK_AGENT: agent})
+    assert speculator.stats()["pending"] == 1
+
+    speculator.abandon(TOPIC["id"])
+
+    stats = speculator.stats()
+    assert (stats["misses"], stats["pending"]) == (1, 0)
+
+
+def test_a_failed_turn_drops_its_speculation(scripted_router, monkeypatch):
+    monkeypatch.setattr(AgentGraph, "SPECULATIVE_EXECUTION", True)
+    graph = AgentGraph(InMemorySaver())
+    scripted_router.script = ["FINAL ANSWER: DIFFERENT TOPIC", "FINAL ANSWER: NEW TOPIC", "FINAL ANSWER: SMALL_TALK_AGENT"]
+    graph.invoke({**_turn_start("merhaba, nasılsın?"), "all_dialog": [], "topic_stack": [], "topic_index": {}}, "s1")
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+    monkeypatch.setattr(scripted_router, "give_choice", unavailable)
+    with pytest.raises(RuntimeError):
+        graph.invoke({"current_message": "başka bir şey soracağım"}, "s1")
+
+    stats = graph.speculator.stats()
+    assert (stats["started"], stats["pending"]) == (1, 0)
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+
+from external.stage_executor import StageExecutor, StageSaturatedError
+
+
+@pytest.fixture
+def stage():
+    stage = StageExecutor("llm", max_workers=1, max_queue=1)
+    yield stage
+    stage.shutdown()
+
+
+def test_a_saturated_stage_rejects_at_once(stage):
+    release = threading.Event()
+
+    async def scenario():
+        # One running and one queued job fill the stage
+        jobs = [asyncio.create_task(stage.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(StageSaturatedError) as error:
+            await stage.run(lambda: "reddedilmeli")
+        assert error.value.stage == "llm"
+        assert stage.stats()["queued"] == 1
+
+        release.set()
+        return await asyncio.gather(*jobs)
+
+    assert asyncio.run(scenario()) == [True, True]
+    stats = stage.stats()
+    assert (stats["in_flight"], stats["completed"], stats["rejected"]) == (0, 2, 1)
+
+
+def test_run_async_shares_the_limits(stage):
+    async def scenario():
+        release = asyncio.Event()
+        jobs = [asyncio.create_task(stage.run_async(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(StageSaturatedError):
+            await stage.run_async(release.wait)
+
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(scenario())
+    assert (stage.stats()["completed"], stage.stats()["rejected"]) == (2, 1)
+
+
+def test_a_reserved_slot_holds_its_place_until_released(stage):
+    async def scenario():
+        slot = stage.reserve()
+        stage.reserve()
+        with pytest.raises(StageSaturatedError):
+            stage.reserve()
+
+        # Jobs of a reserved slot are not admitted again
+        assert await slot.run(lambda: "cümle") == "cümle"
+        slot.release()
+        slot.release()
+
+    asyncio.run(scenario())
+    stats = stage.stats()
+    assert (stats["in_flight"], stats["completed"], stats["rejected"]) == (1, 1, 1)
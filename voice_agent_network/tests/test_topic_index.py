@@ -0,0 +1,57 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph.message import add_messages
+
+from agentic_network.core.agent_state import merge_topic_index
+from agentic_network.core.topic_manager_util import add_message_to_dialogue, get_messages_for_topic
+
+
+def _state(*topic_ids: str) -> dict:
+    return {"all_dialog": [], "topic_index": {}, "disclosed_topics": [],
+            "topic_stack": [{"id": topic_id, "agent": "diagnosis_agent", "appointment_data": {}} for topic_id in topic_ids]}
+
+
+def _apply(state: dict, patch: dict) -> dict:
+    """Applies a node's patch the way the graph's reducers do."""
+    return {**state,
+            "all_dialog": add_messages(state["all_dialog"], patch["all_dialog"]),
+            "topic_index": merge_topic_index(state["topic_index"], patch["topic_index"])}
+
+
+def test_merge_topic_index_appends_new_offsets_per_topic():
+    left = {"a": [0, 1]}
+    merged = merge_topic_index(left, {"a": [3], "b": [2]})
+
+    assert merged == {"a": [0, 1, 3], "b": [2]}
+    assert left == {"a": [0, 1]}
+
+
+def test_merge_topic_index_ignores_offsets_it_already_has():
+    assert merge_topic_index({"a": [0, 4]}, {"a": [4, 2]}) == {"a": [0, 4]}
+    assert merge_topic_index(None, {"a": [0]}) == {"a": [0]}
+    assert merge_topic_index({"a": [0]}, None) == {"a": [0]}
+
+
+def test_messages_of_interleaved_topics_come_back_in_dialog_order():
+    state = _state("a")
+    state = _apply(state, add_message_to_dialogue(state, HumanMessage("baş ağrısı")))
+    state = _apply(state, add_message_to_dialogue(state, AIMessage("ne zamandır?")))
+    state["topic_stack"].append({"id": "b", "agent": "appointment_agent", "appointment_data": {}})
+    state = _apply(state, add_message_to_dialogue(state, HumanMessage("randevu alalım")))
+    state["topic_stack"].reverse()  # back to topic a
+    state = _apply(state, add_message_to_dialogue(state, HumanMessage("iki gündür")))
+
+    assert state["topic_index"] == {"a": [0, 1, 3], "b": [2]}
+    assert [m.content for m in get_messages_for_topic(state, "a")] == ["baş ağrısı", "ne zamandır?", "iki gündür"]
+    assert [m.content for m in get_messages_for_topic(state, "b")] == ["randevu alalım"]
+    assert get_messages_for_topic(state, "unknown") == []
+
+
+def test_a_stale_index_falls_back_to_scanning_the_dialog():
+    state = _state("a")
+    state = _apply(state, add_message_to_dialogue(state, HumanMessage("first")))
+    state = _apply(state, add_message_to_dialogue(state, HumanMessage("second")))
+    # e.g. a state restored from before the index existed, or a rewritten dialog
+    state["topic_index"] = {"a": [5]}
+
+    assert [m.content for m in get_messages_for_topic(state, "a")] == ["first", "second"]
+    assert [m.content for m in get_messages_for_topic({**state, "topic_index": None}, "a")] == ["first", "second"]